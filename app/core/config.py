@@ -5,11 +5,13 @@
 
 from pathlib import Path
 from pydantic_settings import BaseSettings
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 import os
 import yaml
 import time
+import weakref
 from threading import Lock
+from functools import lru_cache
 
 
 class Settings(BaseSettings):
@@ -39,6 +41,9 @@ class Settings(BaseSettings):
     
     # 数据库配置（可选，用于扩展）
     DATABASE_URL: Optional[str] = None
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_PRE_PING: bool = True
     
     # 速率限制配置
     RATE_LIMIT_PER_MINUTE: int = 60
@@ -47,6 +52,8 @@ class Settings(BaseSettings):
     # 采集配置
     COLLECTION_TIMEOUT: int = 10
     COLLECTION_MAX_RETRIES: int = 3
+    ROBOTS_CACHE_TTL: int = 3600  # robots.txt解析规则缓存时间（秒）
+    ROBOTS_NEGATIVE_CACHE_TTL: int = 300  # robots.txt获取失败时的缓存时间（秒）
     
     # 发布配置
     PUBLICATION_TIMEOUT: int = 15
@@ -94,6 +101,32 @@ class ConfigManager:
         self._platforms_config = None
         self._last_modified = {}
         self._lock = Lock()
+        # 配置文件重新加载后调用的回调，用于清除依赖配置的缓存
+        # 保存返回回调的引用对象，弱引用的回调在所属对象被回收后返回None
+        self._reload_listeners: List[Callable[[], Optional[Callable[[], None]]]] = []
+    
+    def add_reload_listener(self, listener: Callable[[], None], weak: bool = False):
+        """
+        注册配置重载回调，任一配置文件重新加载后调用
+        
+        Args:
+            listener: 回调函数
+            weak: 为True时以弱引用保存绑定方法，所属对象被回收后自动移除，避免实例常驻内存
+        """
+        self._reload_listeners.append(weakref.WeakMethod(listener) if weak else (lambda: listener))
+    
+    def _notify_reload(self):
+        """通知配置已重新加载（在锁外调用，回调中可以再次读取配置）"""
+        for ref in list(self._reload_listeners):
+            listener = ref()
+            if listener is None:
+                # 所属对象已被回收，移除失效的弱引用
+                self._reload_listeners.remove(ref)
+                continue
+            try:
+                listener()
+            except Exception as e:
+                print(f"配置重载回调执行失败: {e}")
         
     def load_yaml_config(self, file_path: Path) -> Dict[str, Any]:
         """加载YAML配置文件"""
@@ -111,26 +144,38 @@ class ConfigManager:
     def get_sites_config(self, force_reload: bool = False) -> Dict[str, Any]:
         """获取站点配置，支持热重载"""
         with self._lock:
-            if force_reload or self._should_reload(settings.SITES_CONFIG_FILE):
+            reloaded = force_reload or self._should_reload(settings.SITES_CONFIG_FILE)
+            if reloaded:
                 self._sites_config = self.load_yaml_config(settings.SITES_CONFIG_FILE)
                 self._update_last_modified(settings.SITES_CONFIG_FILE)
-            return self._sites_config or {}
+            config = self._sites_config or {}
+        if reloaded:
+            self._notify_reload()
+        return config
     
     def get_platforms_config(self, force_reload: bool = False) -> Dict[str, Any]:
         """获取平台配置，支持热重载"""
         with self._lock:
-            if force_reload or self._should_reload(settings.PLATFORMS_CONFIG_FILE):
+            reloaded = force_reload or self._should_reload(settings.PLATFORMS_CONFIG_FILE)
+            if reloaded:
                 self._platforms_config = self.load_yaml_config(settings.PLATFORMS_CONFIG_FILE)
                 self._update_last_modified(settings.PLATFORMS_CONFIG_FILE)
-            return self._platforms_config or {}
+            config = self._platforms_config or {}
+        if reloaded:
+            self._notify_reload()
+        return config
 
     def get_credentials(self, force_reload: bool = False) -> Dict[str, Any]:
         """获取凭证配置，支持热重载"""
         with self._lock:
-            if force_reload or self._should_reload(settings.CREDENTIALS_CONFIG_FILE):
+            reloaded = force_reload or self._should_reload(settings.CREDENTIALS_CONFIG_FILE)
+            if reloaded:
                 self._credentials_config = self.load_yaml_config(settings.CREDENTIALS_CONFIG_FILE)
                 self._update_last_modified(settings.CREDENTIALS_CONFIG_FILE)
-            return self._credentials_config or {}
+            config = self._credentials_config or {}
+        if reloaded:
+            self._notify_reload()
+        return config
     
     def _should_reload(self, file_path: Path) -> bool:
         """检查是否需要重新加载配置"""
@@ -149,4 +194,13 @@ class ConfigManager:
 
 
 # 全局配置管理器实例
-config_manager = ConfigManager()
\ No newline at end of file
+config_manager = ConfigManager()
+
+
+@lru_cache(maxsize=1)
+def get_feature_analysis_config() -> Dict[str, Any]:
+    """获取热点特征分析配置（进程内缓存，配置文件重新加载时自动清除）"""
+    return config_manager.get_config().get('feature_analysis', {})
+
+
+config_manager.add_reload_listener(get_feature_analysis_config.cache_clear)
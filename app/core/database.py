@@ -0,0 +1,44 @@
+"""
+数据库连接管理
+基于SQLAlchemy异步引擎 + asyncpg驱动，使用连接池
+"""
+
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+
+
+def _to_async_url(database_url: str) -> str:
+    """将PostgreSQL连接串转换为asyncpg驱动格式"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if database_url.startswith(prefix):
+            return "postgresql+asyncpg://" + database_url[len(prefix):]
+    return database_url
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """获取全局异步数据库引擎（首次调用时创建连接池）"""
+    if not settings.DATABASE_URL:
+        raise RuntimeError("未配置DATABASE_URL")
+
+    return create_async_engine(
+        _to_async_url(settings.DATABASE_URL),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker:
+    """获取全局异步会话工厂，提交后不过期实例以便返回给调用方"""
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False)
+
+
+async def close_async_engine():
+    """关闭数据库连接池，在应用关闭时调用"""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
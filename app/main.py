@@ -9,6 +9,10 @@ from contextlib import asynccontextmanager
 import aiohttp
 
 from app.core.config import settings
+from app.core.database import close_async_engine
+from app.services.collection.robots_checker import robots_checker
+from app.services.collection.sites.base import BaseSite
+from app.services.collection.browser_pool import browser_pool
 from app.api.v1.api import api_router
 from app.middleware.rate_limiter import RateLimitMiddleware
 from app.middleware.exception_handler import ExceptionHandlingMiddleware
@@ -32,7 +36,12 @@ async def lifespan(app: FastAPI):
     # 关闭时清理资源
     logger.info("正在关闭智能体工作流API服务...")
     await app.state.http_session.close()
+    await robots_checker.close()
+    await BaseSite.close_shared()
+    await browser_pool.close()
     logger.info("HTTP会话池已关闭")
+    await close_async_engine()
+    logger.info("数据库连接池已关闭")
 
 
 # 创建FastAPI应用实例
@@ -157,5 +166,6 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
-        workers=settings.WORKERS
+        workers=settings.WORKERS,
+        loop="uvloop"
     )
\ No newline at end of file
@@ -2,7 +2,7 @@ from typing import Dict, Any, List, Tuple, Optional
 import logging
 from datetime import datetime
 
-from ....core.config import config_manager
+from ....core.config import get_feature_analysis_config
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ class HotspotClassifier:
         logger.info("初始化热点分类器")
         
         # 从配置中读取分类相关信息
-        self.config = config_manager.get_config().get('feature_analysis', {})
+        self.config = get_feature_analysis_config()
         self.classification_config = self.config.get('classification', {})
         
         # 预定义的分类体系
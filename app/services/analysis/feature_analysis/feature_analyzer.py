@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
+from functools import lru_cache
 
 from .feishu_data_loader import FeishuDataLoader
 from .llm_processor import LLMProcessor
@@ -10,6 +11,30 @@ from ...storage.analysis_storage import AnalysisStorage
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def get_feishu_data_loader() -> FeishuDataLoader:
+    """获取进程级飞书数据加载器单例"""
+    return FeishuDataLoader()
+
+
+@lru_cache(maxsize=None)
+def get_content_extractor() -> ContentExtractor:
+    """获取进程级内容提取器单例"""
+    return ContentExtractor()
+
+
+@lru_cache(maxsize=None)
+def get_analysis_storage() -> AnalysisStorage:
+    """获取进程级分析结果存储单例"""
+    return AnalysisStorage()
+
+
+@lru_cache(maxsize=None)
+def get_llm_processor() -> LLMProcessor:
+    """获取进程级大模型处理器单例"""
+    return LLMProcessor(analysis_storage=get_analysis_storage())
+
+
 class FeatureAnalyzer:
     """
     热点特征分析器，负责协调数据加载、内容提取和特征分析过程
@@ -18,11 +43,11 @@ class FeatureAnalyzer:
     def __init__(self):
         logger.info("初始化热点特征分析器")
         
-        # 初始化各个组件
-        self.feishu_data_loader = FeishuDataLoader()
-        self.llm_processor = LLMProcessor()
-        self.content_extractor = ContentExtractor()
-        self.analysis_storage = AnalysisStorage()
+        # 引用进程级共享组件，避免每次实例化时重复初始化
+        self.feishu_data_loader = get_feishu_data_loader()
+        self.content_extractor = get_content_extractor()
+        self.analysis_storage = get_analysis_storage()
+        self.llm_processor = get_llm_processor()
     
     async def analyze_top_hotspots(self, date: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -214,11 +239,9 @@ class FeatureAnalyzer:
         Args:
             analysis_results: 分析结果列表
         """
-        for result in analysis_results:
-            try:
-                await self.analysis_storage.save_analysis_result(result)
-            except Exception as e:
-                logger.error(f"保存分析结果失败: {result.get('hotspot_id')}, 错误: {str(e)}")
+        errors = await self.analysis_storage.save_analysis_results_bulk(analysis_results)
+        for error in errors:
+            logger.error(f"保存分析结果失败: {error.get('hotspot_id')}, 错误: {error.get('error')}")
     
     async def analyze_single_hotspot(self, hotspot: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -1,9 +1,10 @@
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, date
+from bisect import bisect_left, bisect_right
 import logging
 
 from ...feishu.feishu_service import FeishuService
-from ....core.config import config_manager
+from ....core.config import config_manager, get_feature_analysis_config
 
 logger = logging.getLogger(__name__)
 
@@ -11,17 +12,75 @@ logger = logging.getLogger(__name__)
 class FeishuDataLoader:
     """飞书表格数据加载器，用于从飞书表格读取热点数据"""
     
+    # 各类关键字段可能使用的字段名，按优先级排列
+    DATE_FIELD_CANDIDATES = ('date', '日期', 'collected_at', '采集时间', 'hot_date')
+    RANK_FIELD_CANDIDATES = ('rank', '排名', 'hot_rank', '序号')
+    URL_FIELD_CANDIDATES = ('url', '链接', 'hot_url', '热点链接')
+    TITLE_FIELD_CANDIDATES = ('title', '标题', 'hot_title', '热点标题')
+    
+    # 中文字段名到英文键名的映射
+    ENGLISH_KEY_MAPPING = {
+        '热度': 'hot_value',
+        '来源': 'source',
+        '平台': 'platform',
+        '发布时间': 'publish_time',
+        '采集时间': 'collected_at',
+        '摘要': 'summary',
+        '关键词': 'keywords'
+    }
+    
     def __init__(self):
         # 从配置中读取飞书表格信息
-        self.config = config_manager.get_config().get('feature_analysis', {})
+        self.config = get_feature_analysis_config()
         self.app_token = self.config.get('feishu', {}).get('app_token', 'EhSmbB0x0aujxXsNgPncjIyLntc')
         self.table_id = self.config.get('feishu', {}).get('table_id', 'tblOkYEu3bc87Tuo')
         self.timeout = self.config.get('feishu', {}).get('timeout', 30)
         self.retry_count = self.config.get('feishu', {}).get('retry_count', 3)
+        # 是否在热点数据中保留原始字段（仅用于调试，会使内存占用翻倍）
+        self.keep_raw_fields = self.config.get('keep_raw_fields', False)
+        
+        # 按日期排序的记录索引，用于二分查找日期范围
+        self._sorted_dates: List[str] = []
+        self._sorted_positions: List[int] = []
+        self._date_index_signature: Optional[int] = None
+        
+        # 已解析出的实际字段名，同一表格内稳定，首次识别后固定；配置重新加载时清除
+        self.reset_detected_fields()
+        # 以弱引用注册，加载器被回收后回调随之失效
+        config_manager.add_reload_listener(self.reset_detected_fields, weak=True)
         
         # 初始化飞书客户端
         self.feishu_service = FeishuService()
     
+    def reset_detected_fields(self):
+        """
+        清除已识别的字段名及依赖日期字段的索引，配置重载或切换表格后调用
+        """
+        self._date_field = None
+        self._rank_field = None
+        self._url_field = None
+        self._title_field = None
+        self._date_index_signature = None
+    
+    def _detect_fields(self, fields: Dict[str, Any]):
+        """
+        从记录字段中识别日期、排名、链接、标题的实际字段名
+        
+        Args:
+            fields: 飞书表格记录的字段字典
+        """
+        if not fields:
+            return
+        
+        if self._date_field is None:
+            self._date_field = next((f for f in self.DATE_FIELD_CANDIDATES if f in fields), None)
+        if self._rank_field is None:
+            self._rank_field = next((f for f in self.RANK_FIELD_CANDIDATES if f in fields), None)
+        if self._url_field is None:
+            self._url_field = next((f for f in self.URL_FIELD_CANDIDATES if f in fields), None)
+        if self._title_field is None:
+            self._title_field = next((f for f in self.TITLE_FIELD_CANDIDATES if f in fields), None)
+    
     async def get_top_hotspots(self, date: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
         从飞书表格获取排名靠前的热点数据
@@ -80,16 +139,9 @@ class FeishuDataLoader:
             all_records = await self._get_all_records()
             
             # 过滤日期范围内的数据
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-            
-            range_records = []
-            for record in all_records:
-                record_date_str = self._get_record_date(record)
-                if record_date_str:
-                    record_date = datetime.strptime(record_date_str, '%Y-%m-%d')
-                    if start_date_obj <= record_date <= end_date_obj:
-                        range_records.append(record)
+            start = date.fromisoformat(start_date).isoformat()
+            end = date.fromisoformat(end_date).isoformat()
+            range_records = self._select_by_date_range(all_records, start, end)
             
             # 转换为标准格式
             hotspots = [self._convert_to_hotspot_format(record) for record in range_records]
@@ -142,12 +194,46 @@ class FeishuDataLoader:
         Returns:
             过滤后的记录列表
         """
-        filtered = []
-        for record in records:
-            record_date = self._get_record_date(record)
-            if record_date == date:
-                filtered.append(record)
-        return filtered
+        return self._select_by_date_range(records, date, date)
+    
+    def _select_by_date_range(self, records: List[Dict[str, Any]], start: str, end: str) -> List[Dict[str, Any]]:
+        """
+        使用二分查找选取日期范围内的记录
+        
+        Args:
+            records: 记录列表
+            start: 开始日期，格式YYYY-MM-DD
+            end: 结束日期，格式YYYY-MM-DD
+            
+        Returns:
+            日期范围内的记录列表，保持表格中的原始顺序
+        """
+        self._build_date_index(records)
+        lo = bisect_left(self._sorted_dates, start)
+        hi = bisect_right(self._sorted_dates, end)
+        # 命中的记录按其在表格中的位置还原顺序，并取自本次传入的记录列表
+        return [records[position] for position in sorted(self._sorted_positions[lo:hi])]
+    
+    def _build_date_index(self, records: List[Dict[str, Any]]):
+        """
+        构建按日期排序的记录位置索引，记录的(record_id, 日期)未变化时复用已有排序
+        
+        Args:
+            records: 记录列表
+        """
+        record_dates = [self._get_record_date(record) for record in records]
+        signature = hash(tuple(zip((record.get('record_id') for record in records), record_dates)))
+        if signature == self._date_index_signature:
+            return
+        
+        # 日期相同时按表格位置排序
+        dated_positions = sorted(
+            (record_date, position) for position, record_date in enumerate(record_dates) if record_date
+        )
+        
+        self._sorted_dates = [item[0] for item in dated_positions]
+        self._sorted_positions = [item[1] for item in dated_positions]
+        self._date_index_signature = signature
     
     def _get_record_date(self, record: Dict[str, Any]) -> Optional[str]:
         """
@@ -161,27 +247,43 @@ class FeishuDataLoader:
         """
         fields = record.get('fields', {})
         
-        # 尝试不同可能的日期字段名
-        date_fields = ['date', '日期', 'collected_at', '采集时间', 'hot_date']
-        
-        for field in date_fields:
-            if field in fields:
-                date_value = fields[field]
-                # 处理不同格式的日期
-                if isinstance(date_value, str):
-                    # 尝试解析不同的日期格式
-                    try:
-                        # 尝试ISO格式 YYYY-MM-DD
-                        if len(date_value) >= 10 and date_value[4] == '-' and date_value[7] == '-':
-                            return date_value[:10]
-                        # 尝试其他格式
-                        parsed_date = datetime.strptime(date_value[:10], '%Y-%m-%d')
-                        return parsed_date.strftime('%Y-%m-%d')
-                    except:
-                        continue
-                elif isinstance(date_value, dict) and 'date' in date_value:
-                    # 处理飞书日期对象格式
-                    return date_value['date']
+        if self._date_field is None:
+            self._detect_fields(fields)
+        
+        # 优先使用已识别的日期字段，其值无法解析时依次尝试其他候选字段
+        record_date = self._parse_date_value(fields.get(self._date_field))
+        if record_date is None:
+            for field in self.DATE_FIELD_CANDIDATES:
+                if field != self._date_field and field in fields:
+                    record_date = self._parse_date_value(fields[field])
+                    if record_date is not None:
+                        break
+        return record_date
+    
+    @staticmethod
+    def _parse_date_value(date_value: Any) -> Optional[str]:
+        """
+        将日期字段的值转换为日期字符串
+        
+        Args:
+            date_value: 日期字段的值
+            
+        Returns:
+            日期字符串，格式YYYY-MM-DD，无法解析时返回None
+        """
+        # 处理不同格式的日期
+        if isinstance(date_value, str):
+            # 尝试ISO格式 YYYY-MM-DD
+            if len(date_value) >= 10 and date_value[4] == '-' and date_value[7] == '-':
+                return date_value[:10]
+            # 尝试其他格式
+            try:
+                return date.fromisoformat(date_value[:10]).isoformat()
+            except ValueError:
+                return None
+        elif isinstance(date_value, dict) and 'date' in date_value:
+            # 处理飞书日期对象格式，统一为字符串以便排序和二分查找
+            return str(date_value['date'])
         
         return None
     
@@ -197,18 +299,30 @@ class FeishuDataLoader:
         """
         fields = record.get('fields', {})
         
-        # 尝试不同可能的排名字段名
-        rank_fields = ['rank', '排名', 'hot_rank', '序号']
+        if self._rank_field is None:
+            self._detect_fields(fields)
         
-        for field in rank_fields:
-            if field in fields:
-                try:
-                    return int(fields[field])
-                except:
-                    continue
+        # 优先使用已识别的排名字段，其值缺失或无法解析时依次尝试其他候选字段
+        rank = self._parse_rank_value(fields.get(self._rank_field))
+        if rank is None:
+            for field in self.RANK_FIELD_CANDIDATES:
+                if field != self._rank_field and field in fields:
+                    rank = self._parse_rank_value(fields[field])
+                    if rank is not None:
+                        break
         
         # 如果找不到排名，返回一个较大的数
-        return 999
+        return 999 if rank is None else rank
+    
+    @staticmethod
+    def _parse_rank_value(rank_value: Any) -> Optional[int]:
+        """
+        将排名字段的值转换为整数，无法转换时返回None
+        """
+        try:
+            return int(rank_value)
+        except (TypeError, ValueError):
+            return None
     
     def _convert_to_hotspot_format(self, record: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -222,20 +336,11 @@ class FeishuDataLoader:
         """
         fields = record.get('fields', {})
         
-        # 提取关键字段，尝试不同的可能字段名
-        url = None
-        url_fields = ['url', '链接', 'hot_url', '热点链接']
-        for field in url_fields:
-            if field in fields:
-                url = fields[field]
-                break
-        
-        title = None
-        title_fields = ['title', '标题', 'hot_title', '热点标题']
-        for field in title_fields:
-            if field in fields:
-                title = fields[field]
-                break
+        # 提取关键字段，字段名在首次识别后固定
+        if self._url_field is None or self._title_field is None:
+            self._detect_fields(fields)
+        url = fields.get(self._url_field)
+        title = fields.get(self._title_field)
         
         # 构建标准格式
         hotspot = {
@@ -243,9 +348,10 @@ class FeishuDataLoader:
             'url': url,
             'title': title,
             'rank': self._get_rank(record),
-            'date': self._get_record_date(record),
-            'raw_fields': fields  # 保留原始字段，以便后续处理
+            'date': self._get_record_date(record)
         }
+        if self.keep_raw_fields:
+            hotspot['raw_fields'] = fields
         
         # 尝试提取其他可能有用的字段
         for key, value in fields.items():
@@ -266,14 +372,4 @@ class FeishuDataLoader:
         Returns:
             英文键名
         """
-        key_mapping = {
-            '热度': 'hot_value',
-            '来源': 'source',
-            '平台': 'platform',
-            '发布时间': 'publish_time',
-            '采集时间': 'collected_at',
-            '摘要': 'summary',
-            '关键词': 'keywords'
-        }
-        
-        return key_mapping.get(chinese_key, chinese_key.lower())
\ No newline at end of file
+        return self.ENGLISH_KEY_MAPPING.get(chinese_key, chinese_key.lower())
\ No newline at end of file
@@ -1,26 +1,105 @@
 from typing import Dict, Any, List, Optional
 import logging
 import json
+import os
+import time
 import asyncio
+import copy
+import hashlib
+import re
+from collections import OrderedDict
 from datetime import datetime
 
-from ....core.config import config_manager
+from ....core.config import get_feature_analysis_config
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import json_repair
+    JSON_REPAIR_AVAILABLE = True
+except ImportError:
+    JSON_REPAIR_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# 预编译正则：提取响应中的JSON对象（支持嵌套）、提取评分数字、提取模拟提示中的标题
+_JSON_OBJ_RE = re.compile(r'\{.*\}', re.DOTALL)
+_SCORE_RE = re.compile(r'\d+')
+_PROMPT_TITLE_RE = re.compile(r'【热点标题】\n(.*?)\n')
+
+# 热点分析结果的JSON Schema，用于要求大模型以结构化JSON输出
+ANALYSIS_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "entities": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "type": {"type": "string"},
+                    "importance": {"type": "string"}
+                },
+                "required": ["name", "type"]
+            }
+        },
+        "keywords": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "word": {"type": "string"},
+                    "relevance": {"type": ["integer", "string"]}
+                },
+                "required": ["word"]
+            }
+        },
+        "sentiment": {"type": "string"},
+        "title_attractiveness": {"type": ["integer", "string"]},
+        "virality_score": {"type": ["integer", "string"]},
+        "topic_category": {"type": "string"},
+        "sub_category": {"type": "string"},
+        "summary": {"type": "string"},
+        "potential_impact": {"type": "string"}
+    },
+    "required": ["entities", "keywords", "sentiment", "topic_category"]
+}
+
 
 class LLMProcessor:
     """大模型处理器，用于使用大模型分析热点特征"""
     
-    def __init__(self):
+    def __init__(self, analysis_storage=None):
         # 从配置中读取大模型相关信息
-        self.config = config_manager.get_config().get('feature_analysis', {})
+        self.config = get_feature_analysis_config()
         self.llm_config = self.config.get('llm', {})
         self.provider = self.llm_config.get('provider', 'openai')
         self.model_name = self.llm_config.get('model_name', 'gpt-4-turbo')
         self.temperature = self.llm_config.get('temperature', 0.3)
         self.max_tokens = self.llm_config.get('max_tokens', 2000)
         
+        # 提示词输入长度上限，避免超长摘要导致预填充开销不可控
+        self.max_summary_chars = self.config.get('max_summary_chars', 1500)
+        self.max_summary_tokens = self.config.get('max_summary_tokens', 512)
+        self.max_title_chars = self.config.get('max_title_chars', 200)
+        self.max_url_chars = self.config.get('max_url_chars', 500)
+        self._encoding = None
+        
+        # 分析结果缓存：L1为进程内LRU，L2为分析结果存储（可选）
+        self.result_cache_size = self.config.get('result_cache_size', 2048)
+        self._result_cache: OrderedDict = OrderedDict()
+        self.analysis_storage = analysis_storage
+        
         # 初始化大模型客户端
         self.llm_client = self._initialize_llm_client()
     
@@ -48,15 +127,27 @@ class LLMProcessor:
         """
         logger.info(f"正在分析热点: {hotspot.get('title', 'Unknown')}")
         
+        cache_key = self._get_cache_key(hotspot)
+        cached_result = await self._get_cached_result(cache_key, hotspot)
+        if cached_result is not None:
+            logger.info(f"命中分析结果缓存: {hotspot.get('title', 'Unknown')}")
+            return cached_result
+        
         try:
             # 准备分析提示
             prompt = self._prepare_analysis_prompt(hotspot)
             
             # 调用大模型
-            response = await self.llm_client.generate(prompt, self.temperature, self.max_tokens)
+            response = await self.llm_client.generate(
+                prompt, self.temperature, self.max_tokens, schema=ANALYSIS_RESULT_SCHEMA
+            )
             
-            # 解析结果
-            analysis_result = self._parse_analysis_result(response)
+            # 解析结果，仅缓存成功解析的结果，避免一次异常响应在淘汰前被反复返回
+            analysis_result = self._try_parse_analysis_result(response)
+            if analysis_result is not None:
+                self._store_cached_result(cache_key, analysis_result)
+            else:
+                analysis_result = self._default_analysis_result()
             
             # 合并结果
             full_result = {
@@ -118,6 +209,65 @@ class LLMProcessor:
         logger.info(f"批量分析完成，成功分析{sum(1 for r in processed_results if 'error' not in r)}个热点")
         return processed_results
     
+    def _get_cache_key(self, hotspot: Dict[str, Any]) -> tuple:
+        """
+        根据标题、链接和摘要计算缓存键
+        
+        Args:
+            hotspot: 热点数据
+            
+        Returns:
+            (内容哈希, 模型名称)
+        """
+        content = f"{hotspot.get('title') or ''}|{hotspot.get('url') or ''}|{hotspot.get('summary') or ''}"
+        digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+        return digest, self.model_name
+    
+    async def _get_cached_result(self, cache_key: tuple, hotspot: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存的分析结果，依次查询进程内LRU和分析结果存储
+        
+        Args:
+            cache_key: 缓存键
+            hotspot: 热点数据
+            
+        Returns:
+            带有最新分析时间的分析结果，未命中时返回None
+        """
+        analysis_result = self._result_cache.get(cache_key)
+        if analysis_result is not None:
+            self._result_cache.move_to_end(cache_key)
+        elif self.analysis_storage is not None and hotspot.get('id'):
+            try:
+                stored = await self.analysis_storage.get_analysis_result(hotspot.get('id'))
+            except Exception as e:
+                logger.warning(f"查询已存储的分析结果失败: {str(e)}")
+                stored = None
+            if stored and stored.get('analysis_result'):
+                analysis_result = stored['analysis_result']
+                self._store_cached_result(cache_key, analysis_result)
+        
+        if analysis_result is None:
+            return None
+        
+        return {
+            'hotspot_id': hotspot.get('id'),
+            'url': hotspot.get('url'),
+            'title': hotspot.get('title'),
+            'analysis_time': datetime.now().isoformat(),
+            # 返回副本，调用方修改结果不影响缓存
+            'analysis_result': copy.deepcopy(analysis_result)
+        }
+    
+    def _store_cached_result(self, cache_key: tuple, analysis_result: Dict[str, Any]):
+        """
+        写入进程内LRU缓存（保存副本），超出容量时淘汰最久未使用的条目
+        """
+        self._result_cache[cache_key] = copy.deepcopy(analysis_result)
+        self._result_cache.move_to_end(cache_key)
+        if len(self._result_cache) > self.result_cache_size:
+            self._result_cache.popitem(last=False)
+    
     def _prepare_analysis_prompt(self, hotspot: Dict[str, Any]) -> str:
         """
         准备分析提示词
@@ -128,9 +278,9 @@ class LLMProcessor:
         Returns:
             格式化的提示词
         """
-        title = hotspot.get('title', '')
-        url = hotspot.get('url', '')
-        summary = hotspot.get('summary', '')
+        title = (hotspot.get('title') or '')[:self.max_title_chars]
+        url = (hotspot.get('url') or '')[:self.max_url_chars]
+        summary = self._truncate_summary(hotspot.get('summary') or '')
         
         prompt = f"""
         请对以下新闻热点进行全面分析，并以JSON格式返回分析结果。
@@ -175,6 +325,40 @@ class LLMProcessor:
         
         return prompt.strip()
     
+    def _truncate_summary(self, summary: str) -> str:
+        """
+        按字符数（及可用时的token数）截断摘要
+        
+        Args:
+            summary: 原始摘要
+            
+        Returns:
+            截断后的摘要
+        """
+        summary = summary[:self.max_summary_chars]
+        
+        encoding = self._get_encoding()
+        if encoding is not None:
+            tokens = encoding.encode(summary)
+            if len(tokens) > self.max_summary_tokens:
+                summary = encoding.decode(tokens[:self.max_summary_tokens])
+        
+        return summary
+    
+    def _get_encoding(self):
+        """
+        获取并缓存tiktoken编码器，未安装tiktoken时返回None
+        """
+        if not TIKTOKEN_AVAILABLE:
+            return None
+        
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model_name)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding('cl100k_base')
+        return self._encoding
+    
     def _parse_analysis_result(self, response: str) -> Dict[str, Any]:
         """
         解析大模型返回的分析结果
@@ -183,40 +367,66 @@ class LLMProcessor:
             response: 大模型返回的文本
             
         Returns:
-            解析后的结果字典
+            解析后的结果字典，无法解析时返回默认结果
         """
-        try:
-            # 尝试直接解析JSON
-            result = json.loads(response)
-            return result
-        except json.JSONDecodeError:
-            # 如果JSON解析失败，尝试提取JSON部分
-            logger.warning(f"JSON解析失败，尝试提取JSON部分: {response[:100]}...")
+        result = self._try_parse_analysis_result(response)
+        return result if result is not None else self._default_analysis_result()
+    
+    def _try_parse_analysis_result(self, response: str) -> Optional[Dict[str, Any]]:
+        """
+        尝试解析大模型返回的分析结果
+        
+        Args:
+            response: 大模型返回的文本
             
-            # 尝试查找JSON格式的部分
-            import re
-            json_match = re.search(r'\{[^}]*\}', response)
-            if json_match:
-                try:
-                    result = json.loads(json_match.group())
+        Returns:
+            解析后的结果字典，无法解析为JSON对象时返回None
+        """
+        # 大模型以JSON模式输出，正常情况下整体即为合法的JSON对象
+        try:
+            result = orjson.loads(response) if ORJSON_AVAILABLE else json.loads(response)
+            if isinstance(result, dict):
+                return result
+        except ValueError:
+            pass
+        logger.warning(f"JSON解析失败，尝试修复JSON: {response[:100]}...")
+        
+        if JSON_REPAIR_AVAILABLE:
+            try:
+                result = json_repair.loads(response)
+                if isinstance(result, dict) and result:
                     return result
-                except:
-                    pass
-            
-            # 返回默认结果
-            return {
-                'entities': [],
-                'keywords': [],
-                'sentiment': '中性',
-                'title_attractiveness': 5,
-                'virality_score': 5,
-                'topic_category': '未分类',
-                'sub_category': '未分类',
-                'summary': '无法解析分析结果',
-                'potential_impact': '中'
-            }
+            except Exception:
+                pass
+        
+        # 最后尝试提取响应中最外层的JSON对象
+        json_match = _JSON_OBJ_RE.search(response)
+        if json_match:
+            try:
+                return json.loads(json_match.group())
+            except ValueError:
+                pass
+        
+        return None
     
-    def extract_entities(self, text: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _default_analysis_result() -> Dict[str, Any]:
+        """
+        无法解析大模型响应时使用的默认分析结果
+        """
+        return {
+            'entities': [],
+            'keywords': [],
+            'sentiment': '中性',
+            'title_attractiveness': 5,
+            'virality_score': 5,
+            'topic_category': '未分类',
+            'sub_category': '未分类',
+            'summary': '无法解析分析结果',
+            'potential_impact': '中'
+        }
+    
+    async def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """
         提取文本中的实体
         
@@ -247,15 +457,14 @@ class LLMProcessor:
         请确保返回的是有效的JSON格式。
         """
         
-        # 同步调用，这里仅作为示例
-        response = self.llm_client.generate_sync(prompt, 0.1, 1000)
+        response = await self.llm_client.generate(prompt, 0.1, 1000)
         try:
             result = json.loads(response)
             return result.get('entities', [])
         except:
             return []
     
-    def analyze_title_attractiveness(self, title: str) -> int:
+    async def analyze_title_attractiveness(self, title: str) -> int:
         """
         分析标题吸引力
         
@@ -279,10 +488,9 @@ class LLMProcessor:
         """
         
         try:
-            response = self.llm_client.generate_sync(prompt, 0.1, 10)
+            response = await self.llm_client.generate(prompt, 0.1, 10)
             # 提取数字
-            import re
-            score_match = re.search(r'\d+', response)
+            score_match = _SCORE_RE.search(response)
             if score_match:
                 score = int(score_match.group())
                 return max(1, min(10, score))  # 限制在1-10范围内
@@ -301,14 +509,24 @@ class LLMMockClient:
     def __init__(self, provider: str = 'openai', model_name: str = 'gpt-4-turbo'):
         self.provider = provider
         self.model_name = model_name
+        # 模拟延迟（秒），默认不延迟，可通过环境变量LLM_MOCK_LATENCY_S开启
+        self.simulated_latency_s = float(os.getenv('LLM_MOCK_LATENCY_S', '0'))
         logger.info(f"创建模拟大模型客户端: {provider} - {model_name}")
     
-    async def generate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000) -> str:
+    async def generate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1000,
+                       schema: Optional[Dict[str, Any]] = None) -> str:
         """
         异步生成文本
+        
+        传入schema时以JSON模式生成，真实客户端需将其转换为对应提供方的参数：
+        OpenAI使用response_format={'type': 'json_object'}，vLLM使用guided_json=schema
         """
+        request_options = self._build_request_options(schema)
+        logger.debug(f"模拟大模型调用参数: {list(request_options.keys())}")
+        
         # 模拟延迟
-        await asyncio.sleep(1)
+        if self.simulated_latency_s:
+            await asyncio.sleep(self.simulated_latency_s)
         
         # 模拟返回结果
         return self._mock_response(prompt)
@@ -318,12 +536,22 @@ class LLMMockClient:
         同步生成文本
         """
         # 模拟延迟
-        import time
-        time.sleep(0.5)
+        if self.simulated_latency_s:
+            time.sleep(self.simulated_latency_s)
         
         # 模拟返回结果
         return self._mock_response(prompt)
     
+    def _build_request_options(self, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        根据provider构建结构化输出参数
+        """
+        if not schema:
+            return {}
+        if self.provider == 'vllm':
+            return {'extra_body': {'guided_json': schema}}
+        return {'response_format': {'type': 'json_object'}}
+    
     def _mock_response(self, prompt: str) -> str:
         """
         生成模拟响应
@@ -331,8 +559,7 @@ class LLMMockClient:
         # 根据提示内容生成不同的模拟响应
         if '请对以下新闻热点进行全面分析' in prompt:
             # 提取标题信息
-            import re
-            title_match = re.search(r'【热点标题】\n(.*?)\n', prompt)
+            title_match = _PROMPT_TITLE_RE.search(prompt)
             title = title_match.group(1) if title_match else '未知标题'
             
             # 模拟分析结果
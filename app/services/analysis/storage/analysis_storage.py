@@ -1,15 +1,61 @@
 from typing import Dict, Any, List, Optional
 import logging
 from datetime import datetime
+import asyncio
 import json
+import time
+from collections import OrderedDict
 
-from ....core.config import config_manager
-from ....models.base import SessionLocal
+from sqlalchemy import String, column, func, select, text, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ....core.config import get_feature_analysis_config
+from ....core.database import get_async_sessionmaker
 from ....models.hotspot_analysis import HotspotAnalysisResult, HotspotClassification
 from ....models.hotspot import Hotspot
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# 批量写入条数达到该阈值时先COPY到临时表再合并，否则使用多行INSERT ... ON CONFLICT
+COPY_THRESHOLD = 100
+
+# 分析结果表与分类结果表写入的字段
+_ANALYSIS_COLUMNS = (
+    'hotspot_id', 'title', 'url', 'raw_content', 'analysis_result', 'entities', 'keywords',
+    'sentiment_score', 'title_attractiveness_score', 'processing_time_ms', 'analysis_time'
+)
+_CLASSIFICATION_COLUMNS = (
+    'hotspot_id', 'primary_category', 'secondary_category', 'confidence',
+    'classification_method', 'classification_time'
+)
+
+
+def _dumps(value: Any) -> str:
+    """序列化为JSON字符串，保留中文字符"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _copy_value(value: Any) -> Any:
+    """COPY写入时将dict/list序列化为JSON字符串，其他值原样返回"""
+    if isinstance(value, (dict, list)):
+        return _dumps(value)
+    return value
+
+
+def _loads_legacy(value: Any) -> Any:
+    """JSONB列读出即为原生对象；迁移前遗留的TEXT字符串值才需要解析"""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
 
 class AnalysisStorage:
     """
@@ -20,30 +66,72 @@ class AnalysisStorage:
         logger.info("初始化分析结果存储管理器")
         
         # 从配置中读取存储相关信息
-        self.config = config_manager.get_config().get('feature_analysis', {})
+        self.config = get_feature_analysis_config()
         self.storage_config = self.config.get('storage', {})
         
-        # 数据库会话
-        self.db = None
+        # 每次调用从异步连接池获取独立会话（begin()自动提交/回滚），不在实例上共享会话
+        self.session_factory = None
+        
+        # 读取结果的进程内TTL LRU缓存，以及进行中的查询（同一热点并发查询只访问一次数据库）
+        self.cache_ttl = self.storage_config.get('cache_ttl', 300)
+        self.cache_size = self.storage_config.get('cache_size', 10000)
+        self._analysis_cache: OrderedDict = OrderedDict()
+        self._classification_cache: OrderedDict = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Future] = {}
     
-    def _get_db_session(self):
+    async def _cached_get(self, cache: OrderedDict, kind: str, hotspot_id: str, loader) -> Optional[Dict[str, Any]]:
         """
-        获取数据库会话
+        带TTL的LRU缓存读取，未命中时合并并发请求，只调用一次loader
         
+        Args:
+            cache: 缓存字典
+            kind: 缓存类别，用于区分进行中的查询
+            hotspot_id: 热点ID
+            loader: 未命中时从数据库加载的协程函数
+            
         Returns:
-            数据库会话对象
+            查询结果，不存在时返回None
         """
-        if not self.db:
-            self.db = SessionLocal()
-        return self.db
+        entry = cache.get(hotspot_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                cache.move_to_end(hotspot_id)
+                return entry[1]
+            del cache[hotspot_id]
+        
+        key = (kind, hotspot_id)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await inflight
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        value = None
+        try:
+            value = await loader(hotspot_id)
+            if value is not None:
+                cache[hotspot_id] = (time.monotonic() + self.cache_ttl, value)
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+        finally:
+            del self._inflight[key]
+            future.set_result(value)
+        return value
     
-    def _close_db_session(self):
+    def _invalidate_cache(self, cache: OrderedDict, hotspot_ids):
         """
-        关闭数据库会话
+        保存成功后使对应热点的缓存失效
         """
-        if self.db:
-            self.db.close()
-            self.db = None
+        for hotspot_id in hotspot_ids:
+            cache.pop(hotspot_id, None)
+    
+    def _sessions(self):
+        """
+        获取异步会话工厂（首次使用时创建连接池）
+        """
+        if self.session_factory is None:
+            self.session_factory = get_async_sessionmaker()
+        return self.session_factory
     
     async def save_analysis_result(self, hotspot: Dict[str, Any], analysis_result: Dict[str, Any]) -> Optional[HotspotAnalysisResult]:
         """
@@ -59,53 +147,100 @@ class AnalysisStorage:
         logger.info(f"保存热点分析结果: {hotspot.get('title')}")
         
         try:
-            db = self._get_db_session()
-            
-            # 查找是否已存在该热点的分析结果
-            existing = db.query(HotspotAnalysisResult).filter(
-                HotspotAnalysisResult.hotspot_id == hotspot.get('id')
-            ).first()
-            
             # 准备数据
-            analysis_data = {
-                'hotspot_id': hotspot.get('id'),
-                'title': hotspot.get('title'),
-                'url': hotspot.get('url'),
-                'raw_content': hotspot.get('extracted_content', ''),
-                'analysis_result': json.dumps(analysis_result['analysis_result'], ensure_ascii=False),
-                'entities': json.dumps(analysis_result.get('entities', []), ensure_ascii=False),
-                'keywords': json.dumps(analysis_result.get('keywords', []), ensure_ascii=False),
-                'sentiment_score': analysis_result.get('sentiment_score', 0),
-                'title_attractiveness_score': analysis_result.get('title_attractiveness_score', 0),
-                'processing_time_ms': analysis_result.get('processing_time_ms', 0),
-                'analysis_time': datetime.now()
-            }
-            
-            if existing:
-                # 更新现有记录
-                for key, value in analysis_data.items():
-                    setattr(existing, key, value)
-                existing.update_time = datetime.now()
-                db.commit()
-                db.refresh(existing)
-                saved_result = existing
-            else:
-                # 创建新记录
-                new_result = HotspotAnalysisResult(**analysis_data)
-                db.add(new_result)
-                db.commit()
-                db.refresh(new_result)
-                saved_result = new_result
+            analysis_data = self._build_analysis_data(hotspot, analysis_result)
+            
+            # 单条语句完成新增或更新，并通过RETURNING直接取回写入后的行
+            stmt = self._build_upsert(HotspotAnalysisResult, analysis_data, _ANALYSIS_COLUMNS).returning(HotspotAnalysisResult)
+            async with self._sessions().begin() as db:
+                saved_result = (await db.scalars(stmt, execution_options={'populate_existing': True})).one()
             
+            self._invalidate_cache(self._analysis_cache, [hotspot.get('id')])
             logger.info(f"热点分析结果保存成功: {hotspot.get('title')}")
             return saved_result
             
         except Exception as e:
             logger.error(f"保存热点分析结果失败: {str(e)}")
-            if self.db:
-                self.db.rollback()
             return None
     
+    def _build_analysis_data(self, hotspot: Dict[str, Any], analysis_result: Dict[str, Any],
+                             now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        构建分析结果表的字段数据
+        
+        Args:
+            hotspot: 热点原始数据
+            analysis_result: 分析结果
+            now: 分析时间，批量保存时整批复用同一时间
+            
+        Returns:
+            字段数据字典
+        """
+        # analysis_result/entities/keywords为JSONB列，直接写入原生对象，由驱动序列化
+        return {
+            'hotspot_id': hotspot.get('id'),
+            'title': hotspot.get('title'),
+            'url': hotspot.get('url'),
+            'raw_content': hotspot.get('extracted_content', ''),
+            'analysis_result': analysis_result['analysis_result'],
+            'entities': analysis_result.get('entities', []),
+            'keywords': analysis_result.get('keywords', []),
+            'sentiment_score': analysis_result.get('sentiment_score', 0),
+            'title_attractiveness_score': analysis_result.get('title_attractiveness_score', 0),
+            'processing_time_ms': analysis_result.get('processing_time_ms', 0),
+            'analysis_time': now or datetime.now()
+        }
+    
+    async def save_analysis_results_bulk(self, analysis_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量保存大模型分析结果，一次查询已有记录并在单个事务中提交
+        
+        Args:
+            analysis_results: 大模型分析结果列表，包含hotspot_id、title、url、analysis_result
+            
+        Returns:
+            保存失败的记录列表，每项包含hotspot_id和error
+        """
+        logger.info(f"批量保存{len(analysis_results)}个热点分析结果")
+        
+        errors = []
+        valid_results = []
+        for result in analysis_results:
+            if not result.get('hotspot_id'):
+                errors.append({'hotspot_id': None, 'error': '缺少热点ID'})
+            elif result.get('analysis_result') is None:
+                errors.append({'hotspot_id': result.get('hotspot_id'), 'error': result.get('error') or '缺少分析结果'})
+            else:
+                valid_results.append(result)
+        
+        if not valid_results:
+            return errors
+        
+        try:
+            now = datetime.now()
+            records = [
+                self._build_analysis_data(
+                    {'id': result['hotspot_id'], 'title': result.get('title'), 'url': result.get('url')},
+                    result, now
+                )
+                for result in valid_results
+            ]
+            async with self._sessions().begin() as db:
+                saved_ids = await self._bulk_upsert(db, HotspotAnalysisResult, records, _ANALYSIS_COLUMNS)
+            
+            errors.extend(
+                {'hotspot_id': record['hotspot_id'], 'error': '未写入数据库'}
+                for record in records if record['hotspot_id'] not in saved_ids
+            )
+            self._invalidate_cache(self._analysis_cache, saved_ids)
+            logger.info(f"批量保存完成，成功保存{len(saved_ids)}个分析结果")
+            
+        except Exception as e:
+            logger.error(f"批量保存分析结果失败: {str(e)}")
+            errors.extend({'hotspot_id': result['hotspot_id'], 'error': str(e)} for result in valid_results)
+        
+        return errors
+    
     async def save_classification_result(self, hotspot: Dict[str, Any], classification_result: Dict[str, Any]) -> Optional[HotspotClassification]:
         """
         保存热点分类结果
@@ -120,73 +255,161 @@ class AnalysisStorage:
         logger.info(f"保存热点分类结果: {hotspot.get('title')}")
         
         try:
-            db = self._get_db_session()
-            
-            # 查找是否已存在该热点的分类结果
-            existing = db.query(HotspotClassification).filter(
-                HotspotClassification.hotspot_id == hotspot.get('id')
-            ).first()
-            
             # 准备数据
-            classification_data = {
-                'hotspot_id': hotspot.get('id'),
-                'primary_category': classification_result.get('primary_category', '其他'),
-                'secondary_category': classification_result.get('secondary_category', ''),
-                'confidence': classification_result.get('confidence', 0.0),
-                'classification_method': classification_result.get('classification_method', 'unknown'),
-                'classification_time': datetime.fromisoformat(classification_result.get('classification_time')) if classification_result.get('classification_time') else datetime.now()
-            }
-            
-            if existing:
-                # 更新现有记录
-                for key, value in classification_data.items():
-                    setattr(existing, key, value)
-                existing.update_time = datetime.now()
-                db.commit()
-                db.refresh(existing)
-                saved_classification = existing
-            else:
-                # 创建新记录
-                new_classification = HotspotClassification(**classification_data)
-                db.add(new_classification)
-                db.commit()
-                db.refresh(new_classification)
-                saved_classification = new_classification
+            classification_data = self._build_classification_data(hotspot, classification_result)
+            
+            # 单条语句完成新增或更新，并通过RETURNING直接取回写入后的行
+            stmt = self._build_upsert(HotspotClassification, classification_data, _CLASSIFICATION_COLUMNS).returning(HotspotClassification)
+            async with self._sessions().begin() as db:
+                saved_classification = (await db.scalars(stmt, execution_options={'populate_existing': True})).one()
             
             # 同时更新热点表中的分类信息（如果需要）
-            self._update_hotspot_category(hotspot.get('id'), classification_data)
+            await self._update_hotspot_categories([classification_data])
             
+            self._invalidate_cache(self._classification_cache, [hotspot.get('id')])
             logger.info(f"热点分类结果保存成功: {hotspot.get('title')} -> {classification_data['primary_category']}")
             return saved_classification
             
         except Exception as e:
             logger.error(f"保存热点分类结果失败: {str(e)}")
-            if self.db:
-                self.db.rollback()
             return None
     
-    def _update_hotspot_category(self, hotspot_id: str, classification_data: Dict[str, Any]):
+    def _build_classification_data(self, hotspot: Dict[str, Any], classification_result: Dict[str, Any],
+                                   now: Optional[datetime] = None) -> Dict[str, Any]:
         """
-        更新热点表中的分类信息
+        构建分类结果表的字段数据
         
         Args:
-            hotspot_id: 热点ID
-            classification_data: 分类数据
+            hotspot: 热点原始数据
+            classification_result: 分类结果
+            now: 分类结果未带时间时使用的时间，批量保存时整批复用
+            
+        Returns:
+            字段数据字典
         """
-        try:
-            db = self._get_db_session()
-            hotspot = db.query(Hotspot).filter(Hotspot.id == hotspot_id).first()
+        return {
+            'hotspot_id': hotspot.get('id'),
+            'primary_category': classification_result.get('primary_category', '其他'),
+            'secondary_category': classification_result.get('secondary_category', ''),
+            'confidence': classification_result.get('confidence', 0.0),
+            'classification_method': classification_result.get('classification_method', 'unknown'),
+            'classification_time': datetime.fromisoformat(classification_result.get('classification_time')) if classification_result.get('classification_time') else (now or datetime.now())
+        }
+    
+    def _build_upsert(self, model, values, columns: tuple):
+        """
+        构建按hotspot_id冲突更新的INSERT ... ON CONFLICT DO UPDATE语句
+        
+        Args:
+            model: 数据库模型类，hotspot_id需有唯一索引
+            values: 单条字段数据字典，或字段一致的字典列表
+            columns: 写入的字段名
+            
+        Returns:
+            upsert语句
+        """
+        stmt = pg_insert(model).values(values)
+        set_ = {column: stmt.excluded[column] for column in columns if column != 'hotspot_id'}
+        set_['update_time'] = func.now()
+        return stmt.on_conflict_do_update(index_elements=['hotspot_id'], set_=set_)
+    
+    async def _bulk_upsert(self, db, model, records: List[Dict[str, Any]], columns: tuple):
+        """
+        批量写入记录：小批量使用单条多行upsert，大批量COPY到临时表后一次合并
+        调用方负责提交事务
+        
+        Args:
+            db: 数据库会话
+            model: 数据库模型类，hotspot_id需有唯一索引
+            records: 字段数据字典列表
+            columns: 写入的字段名
             
-            if hotspot:
-                hotspot.primary_category = classification_data.get('primary_category', '其他')
-                hotspot.secondary_category = classification_data.get('secondary_category', '')
-                db.commit()
-                logger.debug(f"热点表分类信息更新成功: {hotspot_id}")
+        Returns:
+            由RETURNING得到的已写入热点ID集合
+        """
+        # 同一批次内同一热点只保留最后一条，避免ON CONFLICT重复更新同一行
+        records = list({record['hotspot_id']: record for record in records}.values())
+        if not records:
+            return set()
+        
+        if len(records) >= COPY_THRESHOLD:
+            return await self._copy_upsert(db, model, records, columns)
+        
+        result = await db.execute(self._build_upsert(model, records, columns).returning(model.id, model.hotspot_id))
+        return {row.hotspot_id for row in result}
+    
+    async def _copy_upsert(self, db, model, records: List[Dict[str, Any]], columns: tuple):
+        """
+        使用asyncpg COPY写入临时表，再以INSERT ... SELECT ... ON CONFLICT合并到目标表
+        复用会话当前事务的连接，临时表在提交时删除
+        
+        Args:
+            db: 异步数据库会话
+            model: 数据库模型类
+            records: 字段数据字典列表
+            columns: 写入的字段名
+            
+        Returns:
+            已写入的热点ID集合
+        """
+        # 原始连接上的jsonb编解码器只接受字符串，COPY前自行序列化JSON列
+        table = model.__tablename__
+        staging = f"{table}_staging"
+        column_list = ', '.join(columns)
+        update_list = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns if column != 'hotspot_id')
+        
+        await db.execute(text(f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"))
+        
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            staging,
+            records=[tuple(_copy_value(record[column]) for column in columns) for record in records],
+            columns=columns
+        )
+        
+        result = await db.execute(text(
+            f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT (hotspot_id) DO UPDATE SET {update_list}, update_time = now() "
+            f"RETURNING id, hotspot_id"
+        ))
+        return {row.hotspot_id for row in result}
+    
+    async def _update_hotspot_categories(self, classification_records: List[Dict[str, Any]]):
+        """
+        批量更新热点表中的分类信息，单条UPDATE ... FROM (VALUES ...)语句完成
+        
+        Args:
+            classification_records: 分类数据列表，包含hotspot_id、primary_category、secondary_category
+        """
+        if not classification_records:
+            return
+        
+        try:
+            rows = values(
+                column('id', Hotspot.__table__.c.id.type),
+                column('primary_category', String),
+                column('secondary_category', String),
+                name='v'
+            ).data([
+                (
+                    record['hotspot_id'],
+                    record.get('primary_category', '其他'),
+                    record.get('secondary_category', '')
+                )
+                for record in classification_records
+            ])
+            stmt = (
+                update(Hotspot)
+                .where(Hotspot.id == rows.c.id)
+                .values(primary_category=rows.c.primary_category, secondary_category=rows.c.secondary_category)
+            )
+            async with self._sessions().begin() as db:
+                result = await db.execute(stmt, execution_options={'synchronize_session': False})
+            logger.debug(f"热点表分类信息更新成功: {result.rowcount}条")
         
         except Exception as e:
             logger.warning(f"更新热点表分类信息失败: {str(e)}")
-            if self.db:
-                self.db.rollback()
     
     async def save_complete_analysis(self, hotspot: Dict[str, Any], analysis_result: Dict[str, Any], 
                                    classification_result: Dict[str, Any]) -> Dict[str, Any]:
@@ -210,98 +433,147 @@ class AnalysisStorage:
         saved_classification = await self.save_classification_result(hotspot, classification_result)
         
         # 组装返回结果
-        result = {
+        return {
             'hotspot_id': hotspot.get('id'),
             'analysis_saved': saved_analysis is not None,
             'classification_saved': saved_classification is not None,
             'total_success': saved_analysis is not None and saved_classification is not None
         }
-        
-        # 如果有任一部分保存失败，关闭数据库会话
-        if not result['total_success']:
-            self._close_db_session()
-        
-        return result
     
     async def batch_save_analysis_results(self, hotspots: List[Dict[str, Any]], 
                                         analysis_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        批量保存分析结果
+        批量保存分析结果，数据无效的条目单独记录失败，不影响其他条目
         
         Args:
             hotspots: 热点列表
             analysis_results: 分析结果列表
             
         Returns:
-            保存结果列表
+            保存结果列表，与hotspots顺序一致
         """
         logger.info(f"批量保存{len(hotspots)}个热点分析结果")
         
-        results = []
-        try:
-            for i, hotspot in enumerate(hotspots):
-                if i < len(analysis_results):
-                    result = await self.save_analysis_result(hotspot, analysis_results[i])
-                    results.append({
-                        'hotspot_id': hotspot.get('id'),
-                        'saved': result is not None
-                    })
-                else:
-                    results.append({
-                        'hotspot_id': hotspot.get('id'),
-                        'saved': False,
-                        'error': 'No analysis result provided'
-                    })
-            
-            logger.info(f"批量保存完成，成功保存{sum(1 for r in results if r['saved'])}个分析结果")
-            return results
-            
-        except Exception as e:
-            logger.error(f"批量保存分析结果失败: {str(e)}")
-            self._close_db_session()
-            raise
+        now = datetime.now()
+        records, statuses = self._prepare_batch(
+            hotspots, analysis_results,
+            lambda hotspot, analysis_result: self._build_analysis_data(hotspot, analysis_result, now),
+            'No analysis result provided'
+        )
+        
+        saved_ids = set()
+        error = None
+        if records:
+            try:
+                async with self._sessions().begin() as db:
+                    saved_ids = await self._bulk_upsert(db, HotspotAnalysisResult, records, _ANALYSIS_COLUMNS)
+            except Exception as e:
+                logger.error(f"批量保存分析结果失败: {str(e)}")
+                error = str(e)
+        
+        self._invalidate_cache(self._analysis_cache, saved_ids)
+        logger.info(f"批量保存完成，成功保存{len(saved_ids)}个分析结果")
+        return self._finish_batch(hotspots, statuses, saved_ids, error)
     
     async def batch_save_classification_results(self, hotspots: List[Dict[str, Any]], 
                                               classification_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        批量保存分类结果
+        批量保存分类结果，数据无效的条目单独记录失败，不影响其他条目
         
         Args:
             hotspots: 热点列表
             classification_results: 分类结果列表
             
         Returns:
-            保存结果列表
+            保存结果列表，与hotspots顺序一致
         """
         logger.info(f"批量保存{len(hotspots)}个热点分类结果")
         
-        results = []
-        try:
-            for i, hotspot in enumerate(hotspots):
-                if i < len(classification_results):
-                    result = await self.save_classification_result(hotspot, classification_results[i])
-                    results.append({
-                        'hotspot_id': hotspot.get('id'),
-                        'saved': result is not None
-                    })
-                else:
-                    results.append({
-                        'hotspot_id': hotspot.get('id'),
-                        'saved': False,
-                        'error': 'No classification result provided'
-                    })
-            
-            logger.info(f"批量保存完成，成功保存{sum(1 for r in results if r['saved'])}个分类结果")
-            return results
+        now = datetime.now()
+        records, statuses = self._prepare_batch(
+            hotspots, classification_results,
+            lambda hotspot, classification_result: self._build_classification_data(hotspot, classification_result, now),
+            'No classification result provided'
+        )
+        
+        saved_ids = set()
+        error = None
+        if records:
+            try:
+                async with self._sessions().begin() as db:
+                    saved_ids = await self._bulk_upsert(db, HotspotClassification, records, _CLASSIFICATION_COLUMNS)
+            except Exception as e:
+                logger.error(f"批量保存分类结果失败: {str(e)}")
+                error = str(e)
+        
+        if saved_ids:
+            # 同时更新热点表中的分类信息，整批一次提交
+            await self._update_hotspot_categories([record for record in records if record['hotspot_id'] in saved_ids])
+        
+        self._invalidate_cache(self._classification_cache, saved_ids)
+        logger.info(f"批量保存完成，成功保存{len(saved_ids)}个分类结果")
+        return self._finish_batch(hotspots, statuses, saved_ids, error)
+    
+    @staticmethod
+    def _prepare_batch(hotspots: List[Dict[str, Any]], item_results: List[Dict[str, Any]],
+                       build, missing_error: str):
+        """
+        在事务外逐条构建批量写入的记录，没有结果、热点ID为空或字段无效的条目直接记录失败
+        
+        Args:
+            hotspots: 热点列表
+            item_results: 与热点一一对应的分析/分类结果列表
+            build: 由(热点, 结果)构建字段数据字典的函数
+            missing_error: 没有对应结果时的错误信息
             
-        except Exception as e:
-            logger.error(f"批量保存分类结果失败: {str(e)}")
-            self._close_db_session()
-            raise
+        Returns:
+            (待写入的记录列表, 状态列表)，状态列表中待写入的条目为None，写入后由_finish_batch填充
+        """
+        records = []
+        statuses = []
+        for i, hotspot in enumerate(hotspots):
+            hotspot_id = hotspot.get('id')
+            if i >= len(item_results):
+                statuses.append({'hotspot_id': hotspot_id, 'saved': False, 'error': missing_error})
+                continue
+            if hotspot_id is None:
+                statuses.append({'hotspot_id': None, 'saved': False, 'error': 'Missing hotspot id'})
+                continue
+            try:
+                records.append(build(hotspot, item_results[i]))
+            except Exception as e:
+                logger.warning(f"热点{hotspot_id}的数据无效，跳过保存: {repr(e)}")
+                statuses.append({'hotspot_id': hotspot_id, 'saved': False, 'error': f'Invalid data: {repr(e)}'})
+                continue
+            statuses.append(None)
+        return records, statuses
     
-    def get_analysis_result(self, hotspot_id: str) -> Optional[Dict[str, Any]]:
+    def _finish_batch(self, hotspots: List[Dict[str, Any]], statuses: List[Optional[Dict[str, Any]]],
+                      saved_ids, error: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        获取指定热点的分析结果
+        根据写入结果填充待写入条目的保存状态，写入失败时这些条目都记录为失败
+        """
+        for i, status in enumerate(statuses):
+            if status is None:
+                hotspot_id = hotspots[i].get('id')
+                if error is not None:
+                    statuses[i] = {'hotspot_id': hotspot_id, 'saved': False, 'error': error}
+                else:
+                    statuses[i] = self._save_status(hotspot_id, saved_ids)
+        return statuses
+    
+    @staticmethod
+    def _save_status(hotspot_id: str, saved_ids) -> Dict[str, Any]:
+        """
+        根据RETURNING返回的热点ID生成单条保存状态
+        """
+        if hotspot_id in saved_ids:
+            return {'hotspot_id': hotspot_id, 'saved': True}
+        return {'hotspot_id': hotspot_id, 'saved': False, 'error': 'Not written'}
+    
+    async def get_analysis_result(self, hotspot_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取指定热点的分析结果（优先读取缓存）
         
         Args:
             hotspot_id: 热点ID
@@ -309,11 +581,17 @@ class AnalysisStorage:
         Returns:
             分析结果字典
         """
+        return await self._cached_get(self._analysis_cache, 'analysis', hotspot_id, self._load_analysis_result)
+    
+    async def _load_analysis_result(self, hotspot_id: str) -> Optional[Dict[str, Any]]:
+        """
+        从数据库加载指定热点的分析结果
+        """
         try:
-            db = self._get_db_session()
-            result = db.query(HotspotAnalysisResult).filter(
-                HotspotAnalysisResult.hotspot_id == hotspot_id
-            ).first()
+            async with self._sessions()() as db:
+                result = (await db.execute(
+                    select(HotspotAnalysisResult).where(HotspotAnalysisResult.hotspot_id == hotspot_id)
+                )).scalar_one_or_none()
             
             if result:
                 return {
@@ -322,9 +600,9 @@ class AnalysisStorage:
                     'title': result.title,
                     'url': result.url,
                     'raw_content': result.raw_content,
-                    'analysis_result': json.loads(result.analysis_result),
-                    'entities': json.loads(result.entities),
-                    'keywords': json.loads(result.keywords),
+                    'analysis_result': _loads_legacy(result.analysis_result),
+                    'entities': _loads_legacy(result.entities),
+                    'keywords': _loads_legacy(result.keywords),
                     'sentiment_score': result.sentiment_score,
                     'title_attractiveness_score': result.title_attractiveness_score,
                     'processing_time_ms': result.processing_time_ms,
@@ -336,12 +614,32 @@ class AnalysisStorage:
             
         except Exception as e:
             logger.error(f"获取分析结果失败: {str(e)}")
-            self._close_db_session()
             return None
     
-    def get_classification_result(self, hotspot_id: str) -> Optional[Dict[str, Any]]:
+    async def get_analysis_result_id(self, hotspot_id: str) -> Optional[int]:
         """
-        获取指定热点的分类结果
+        仅查询指定热点分析结果的主键，用于存在性检查
+        只取id列，配合hotspot_id唯一索引可走仅索引扫描，不加载整行
+        
+        Args:
+            hotspot_id: 热点ID
+            
+        Returns:
+            分析结果主键，不存在时返回None
+        """
+        try:
+            async with self._sessions()() as db:
+                return (await db.execute(
+                    select(HotspotAnalysisResult.id).where(HotspotAnalysisResult.hotspot_id == hotspot_id)
+                )).scalar_one_or_none()
+        
+        except Exception as e:
+            logger.error(f"查询分析结果ID失败: {str(e)}")
+            return None
+    
+    async def get_classification_result(self, hotspot_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取指定热点的分类结果（优先读取缓存）
         
         Args:
             hotspot_id: 热点ID
@@ -349,11 +647,19 @@ class AnalysisStorage:
         Returns:
             分类结果字典
         """
+        return await self._cached_get(
+            self._classification_cache, 'classification', hotspot_id, self._load_classification_result
+        )
+    
+    async def _load_classification_result(self, hotspot_id: str) -> Optional[Dict[str, Any]]:
+        """
+        从数据库加载指定热点的分类结果
+        """
         try:
-            db = self._get_db_session()
-            result = db.query(HotspotClassification).filter(
-                HotspotClassification.hotspot_id == hotspot_id
-            ).first()
+            async with self._sessions()() as db:
+                result = (await db.execute(
+                    select(HotspotClassification).where(HotspotClassification.hotspot_id == hotspot_id)
+                )).scalar_one_or_none()
             
             if result:
                 return {
@@ -371,10 +677,9 @@ class AnalysisStorage:
             
         except Exception as e:
             logger.error(f"获取分类结果失败: {str(e)}")
-            self._close_db_session()
             return None
     
-    def get_category_statistics(self, days: int = 7) -> Dict[str, Dict[str, int]]:
+    async def get_category_statistics(self, days: int = 7) -> Dict[str, Dict[str, int]]:
         """
         获取分类统计信息
         
@@ -385,43 +690,38 @@ class AnalysisStorage:
             统计字典，按主分类和子分类统计数量
         """
         try:
-            db = self._get_db_session()
-            
             # 计算起始日期
             from datetime import timedelta
             start_date = datetime.now() - timedelta(days=days)
             
-            # 查询统计数据
-            results = db.query(
-                HotspotClassification.primary_category,
-                HotspotClassification.secondary_category,
-                db.func.count(HotspotClassification.id).label('count')
-            ).filter(
-                HotspotClassification.classification_time >= start_date
-            ).group_by(
-                HotspotClassification.primary_category,
-                HotspotClassification.secondary_category
-            ).all()
+            # 单次查询同时得到(主分类, 子分类)与主分类两个粒度的统计，GROUPING()=1的行为主分类合计
+            primary = HotspotClassification.primary_category
+            secondary = HotspotClassification.secondary_category
+            async with self._sessions()() as db:
+                results = (await db.execute(
+                    select(
+                        primary,
+                        secondary,
+                        func.count(HotspotClassification.id).label('count'),
+                        func.grouping(secondary).label('is_total')
+                    ).where(
+                        HotspotClassification.classification_time >= start_date
+                    ).group_by(
+                        func.grouping_sets(tuple_(primary, secondary), tuple_(primary))
+                    )
+                )).all()
             
             # 构建统计结果
             statistics = {}
-            for primary, secondary, count in results:
-                if primary not in statistics:
-                    statistics[primary] = {'total': 0, 'sub_categories': {}}
-                
-                statistics[primary]['total'] += count
-                if secondary:
-                    statistics[primary]['sub_categories'][secondary] = count
+            for primary_category, secondary_category, count, is_total in results:
+                entry = statistics.setdefault(primary_category, {'total': 0, 'sub_categories': {}})
+                if is_total:
+                    entry['total'] = count
+                elif secondary_category:
+                    entry['sub_categories'][secondary_category] = count
             
             return statistics
             
         except Exception as e:
             logger.error(f"获取分类统计失败: {str(e)}")
-            self._close_db_session()
             return {}
-    
-    def __del__(self):
-        """
-        析构函数，确保数据库会话被关闭
-        """
-        self._close_db_session()
\ No newline at end of file
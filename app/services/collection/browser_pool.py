@@ -0,0 +1,136 @@
+"""
+Playwright浏览器池
+进程内共享一个浏览器实例和一个BrowserContext，各站点采集时从中获取页面
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from app.utils.logger import logger
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+
+# 共享浏览器上下文使用的用户代理
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+# 同时打开的最大页面数，超出时等待已有页面释放
+MAX_CONCURRENT_PAGES = 8
+
+
+class BrowserPool:
+    """共享的Chromium浏览器，首次使用时启动"""
+    
+    def __init__(self, launch_args: Optional[List[str]] = None, max_failures: int = 3,
+                 max_pages: int = MAX_CONCURRENT_PAGES):
+        self._launch_args = launch_args or ['--no-sandbox', '--disable-dev-shm-usage']
+        # 连续失败达到该次数时重启浏览器
+        self._max_failures = max_failures
+        self._failures = 0
+        self._max_pages = max_pages
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._page_semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def get_browser(self):
+        """获取共享浏览器，未启动、已断开或事件循环变化时重新启动"""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("未安装playwright")
+        
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 浏览器连接绑定在事件循环上，循环变化后旧实例不可再用
+            self._playwright = None
+            self._browser = None
+            self._context = None
+            self._lock = asyncio.Lock()
+            self._page_semaphore = asyncio.Semaphore(self._max_pages)
+            self._loop = loop
+        
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(
+                    headless=True,  # 无头模式
+                    args=self._launch_args
+                )
+                self._context = None
+                logger.info("Playwright浏览器已启动")
+        return self._browser
+    
+    async def get_context(self):
+        """获取共享浏览器上下文，各站点共用cookie和缓存"""
+        browser = await self.get_browser()
+        if self._context is None:
+            async with self._lock:
+                if self._context is None:
+                    self._context = await browser.new_context(user_agent=DEFAULT_USER_AGENT)
+        return self._context
+    
+    @asynccontextmanager
+    async def acquire_page(self):
+        """从共享上下文获取一个页面，用完自动关闭；页面数达到上限时等待"""
+        context = await self.get_context()
+        async with self._page_semaphore:
+            page = await context.new_page()
+            try:
+                yield page
+            finally:
+                # 关闭本身也限时，避免超时取消后卡在这里
+                try:
+                    await asyncio.wait_for(page.close(), timeout=5)
+                except Exception as e:
+                    logger.warning(f"关闭浏览器页面失败: {str(e)}")
+    
+    def report_success(self):
+        """记录一次成功的浏览器采集，清零连续失败计数"""
+        self._failures = 0
+    
+    async def report_failure(self):
+        """记录一次失败的浏览器采集，连续失败过多时重启浏览器"""
+        self._failures += 1
+        if self._failures >= self._max_failures:
+            logger.warning(f"浏览器采集连续失败{self._failures}次，重启浏览器")
+            await self.recycle()
+    
+    async def recycle(self):
+        """关闭当前浏览器进程（保留Playwright），下次获取时重新启动"""
+        browser = self._browser
+        self._browser = None
+        self._context = None
+        self._failures = 0
+        try:
+            if browser is not None and browser.is_connected():
+                await asyncio.wait_for(browser.close(), timeout=10)
+        except Exception as e:
+            logger.warning(f"关闭Playwright浏览器失败: {str(e)}")
+    
+    async def close(self):
+        """关闭浏览器和Playwright，在应用关闭时调用"""
+        browser, playwright = self._browser, self._playwright
+        self._browser = None
+        self._context = None
+        self._playwright = None
+        self._loop = None
+        try:
+            if browser is not None and browser.is_connected():
+                await browser.close()
+            if playwright is not None:
+                await playwright.stop()
+        except Exception as e:
+            logger.warning(f"关闭Playwright浏览器失败: {str(e)}")
+
+
+# 全局实例
+browser_pool = BrowserPool()
@@ -4,14 +4,23 @@
 """
 
 import asyncio
-import importlib.util
+import importlib
+import time
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
 from app.utils.logger import logger
 from app.utils.yaml_loader import load_yaml_config
 from .robots_checker import robots_checker
+from .sites.base import CollectionError
+
+
+# 已加载的站点类（进程级共享）：站点模块作为普通模块导入并注册到sys.modules，
+# 每个进程只加载一次，站点类上的缓存在多个CollectionEngine实例之间保持有效
+_SITE_CLASSES: Dict[str, Any] = {}
+_site_modules_preloaded = False
 
 
 class CollectionEngine:
@@ -21,8 +30,21 @@ class CollectionEngine:
         self.site_factory = SiteFactory()
         self.plugin_manager = PluginManager()
         self.sites_config = self._load_sites_config()
+        # 已启用站点（保持配置顺序），以及用于O(1)成员判断的集合
+        self._enabled_site_list = tuple(
+            code for code, cfg in self.sites_config.items() if cfg.get("enabled", True)
+        )
+        self._enabled_sites = frozenset(self._enabled_site_list)
         self.rate_limiters = self._init_rate_limiters()
+        self._site_defaults = self._init_site_defaults()
         
+    def _init_site_defaults(self) -> Dict[str, MappingProxyType]:
+        """预先构建各站点的只读特定参数，避免每次采集时复制合并"""
+        return {
+            site_code: MappingProxyType(dict(site_config.get("params") or {}))
+            for site_code, site_config in self.sites_config.items()
+        }
+    
     def _init_rate_limiters(self) -> Dict[str, Any]:
         """初始化站点级限流器"""
         limiters = {}
@@ -64,7 +86,7 @@ class CollectionEngine:
             结构化的采集结果
         """
         # 1. 解析采集参数
-        target_date = params.get("date") or self._get_default_date()
+        target_date = params.get("date") or time.strftime("%Y-%m-%d")
         target_sites = self._get_target_sites(params.get("site_code"))
         logger.debug(f"目标站点列表: {target_sites}")
         
@@ -75,12 +97,7 @@ class CollectionEngine:
         for site_code in target_sites:
             site_config = self.sites_config.get(site_code, {})
             
-            # 检查速率限制
-            rate_limiter = self.rate_limiters.get(site_code)
-            if rate_limiter:
-                await rate_limiter.acquire()
-                
-            # 创建采集任务
+            # 创建采集任务（速率限制在各任务内部获取，不阻塞其他站点）
             tasks.append(self._collect_single_site(site_code, target_date, params, site_config))
         
         # 3. 等待所有任务完成
@@ -98,7 +115,13 @@ class CollectionEngine:
     async def _collect_single_site(self, site_code: str, date: str, params: Dict[str, Any], site_config: Dict[str, Any]) -> Dict[str, Any]:
         """采集单个站点数据"""
         site = None
+        loop = asyncio.get_running_loop()
         try:
+            # 检查速率限制
+            rate_limiter = self.rate_limiters.get(site_code)
+            if rate_limiter:
+                await rate_limiter.acquire()
+            
             # 获取站点实例
             site = self.site_factory.create_site(site_code, site_config)
             if not site:
@@ -116,25 +139,37 @@ class CollectionEngine:
             
             # 执行采集
             logger.info(f"开始采集站点: {site_code}, 日期: {date}")
-            start_time = asyncio.get_event_loop().time()
+            start_time = loop.time()
             
             site_params = self._prepare_site_params(params, site_code, site_config)
-            data = await site.collect(site_params)
+            try:
+                data = await site.collect(site_params)
+            except CollectionError as e:
+                # 是否以模拟数据替代由站点配置决定，默认直接失败以便调用方感知并退避重试
+                if not site_config.get("mock_on_failure", False) or not hasattr(site, "_get_mock_data"):
+                    raise
+                logger.warning(f"站点采集失败，使用模拟数据: {site_code}, 错误: {str(e)}")
+                data = site._get_mock_data()
             
             # 执行后置插件
             processed_data = await self.plugin_manager.apply_post_plugins(data, context)
             
             # 记录性能指标
-            cost_time = asyncio.get_event_loop().time() - start_time
+            cost_time = loop.time() - start_time
+            # 采集完成时间（采集和后置插件处理完成后取，不含限流等待）
+            collect_time = time.strftime("%Y-%m-%d %H:%M:%S")
             logger.info(f"站点采集完成: {site_code}, 耗时: {cost_time:.2f}s, 数据量: {len(processed_data)}")
             
             return {
                 "site_code": site_code,
-                "collect_time": self._get_current_time(),
+                "collect_time": collect_time,
                 "data_count": len(processed_data),
                 "news": processed_data
             }
             
+        except CollectionError as e:
+            logger.error(f"站点采集失败: {site_code}, 错误: {str(e)}")
+            return None
         except Exception as e:
             logger.error(f"站点采集失败: {site_code}, 错误: {str(e)}", exc_info=True)
             return None
@@ -145,10 +180,8 @@ class CollectionEngine:
     
     def _get_target_sites(self, site_code_input = None) -> List[str]:
         """获取目标站点列表"""
-        all_sites = [code for code, cfg in self.sites_config.items() if cfg.get("enabled", True)]
-        
         if not site_code_input:
-            return all_sites
+            return list(self._enabled_site_list)
         
         # 处理不同类型的输入
         if isinstance(site_code_input, str):
@@ -161,24 +194,15 @@ class CollectionEngine:
             # 其他类型转换为字符串处理
             target_sites = [str(site_code_input).strip()]
             
-        return [code for code in target_sites if code in all_sites]
+        # 去重并保持输入顺序，集合成员判断为O(1)
+        return [code for code in dict.fromkeys(target_sites) if code in self._enabled_sites]
     
     def _prepare_site_params(self, base_params: Dict[str, Any], site_code: str, site_config: Dict[str, Any]) -> Dict[str, Any]:
         """准备站点特定参数"""
-        site_params = base_params.copy()
-        site_specific_params = site_config.get("params", {})
-        site_params.update(site_specific_params)
-        return site_params
-    
-    def _get_default_date(self) -> str:
-        """获取默认日期（当天）"""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d")
-    
-    def _get_current_time(self) -> str:
-        """获取当前时间字符串"""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        site_defaults = self._site_defaults.get(site_code)
+        if site_defaults is None:
+            return {**base_params, **(site_config.get("params") or {})}
+        return {**base_params, **site_defaults}
     
     def get_available_sites(self) -> List[Dict[str, Any]]:
         """获取可用站点列表"""
@@ -199,15 +223,26 @@ class CollectionEngine:
 class SiteFactory:
     """站点工厂类"""
     
+    # 非站点实现的模块
+    EXCLUDED_MODULES = {"__init__", "base"}
+    
     def __init__(self):
         self.sites_dir = Path(__file__).parent / "sites"
-        self._loaded_sites = {}
+        self._loaded_sites = _SITE_CLASSES
+        self._preload_site_modules()
+    
+    def _preload_site_modules(self):
+        """进程内首次创建工厂时一次性加载所有站点模块，避免在请求路径上动态导入"""
+        global _site_modules_preloaded
+        if _site_modules_preloaded:
+            return
+        for site_file in sorted(self.sites_dir.glob("*.py")):
+            if site_file.stem not in self.EXCLUDED_MODULES:
+                self._load_site_module(site_file.stem)
+        _site_modules_preloaded = True
         
     def create_site(self, site_code: str, site_config: Dict[str, Any]):
         """创建站点实例"""
-        if site_code not in self._loaded_sites:
-            self._load_site_module(site_code)
-        
         site_class = self._loaded_sites.get(site_code)
         if site_class:
             return site_class(site_code, site_config)
@@ -223,18 +258,13 @@ class SiteFactory:
             return
         
         try:
-            spec = importlib.util.spec_from_file_location(f"app.services.collection.sites.{site_code}", site_file)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            # 按普通模块导入（已导入时直接取sys.modules中的模块），不重复执行模块代码
+            module = importlib.import_module(f"{__package__}.sites.{site_code}")
             
             # 查找站点类（约定类名为 {SiteCode}Site）
-            # 处理下划线命名，将下划线后的首字母大写
+            # 处理下划线命名，将下划线后的首字母大写，如weibo_advanced -> WeiboAdvancedSite
             site_class_name = "".join(word.capitalize() for word in site_code.split("_")) + "Site"
             
-            # 处理特殊命名规则
-            if site_code == "weibo_advanced":
-                site_class_name = "WeiboAdvancedSite"
-            
             site_class = getattr(module, site_class_name, None)
             
             if site_class:
@@ -264,15 +294,39 @@ class PluginManager:
 
 
 class AsyncRateLimiter:
-    """异步速率限制器"""
+    """异步速率限制器（令牌桶）"""
     
     def __init__(self, max_calls: int, period: int):
         self.max_calls = max_calls
         self.period = period
-        self.semaphore = asyncio.Semaphore(max_calls)
+        # 令牌桶：初始满桶，允许突发max_calls次调用，长期平均速率为max_calls/period
+        self.rate = max_calls / period
+        self.tokens = float(max_calls)
+        self.last_refill = None
+        # 锁绑定首次使用它的事件循环，按当前运行的事件循环延迟创建
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_lock(self) -> asyncio.Lock:
+        """获取当前事件循环的锁，事件循环变化时（如多次asyncio.run）重建"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
         
     async def acquire(self):
-        """获取许可"""
-        await self.semaphore.acquire()
-        # 简化实现，实际应该使用令牌桶算法
-        await asyncio.sleep(self.period / self.max_calls)
\ No newline at end of file
+        """获取许可，令牌不足时等待补充"""
+        async with self._get_lock():
+            # 使用单调时钟，令牌数在不同事件循环之间保持连续
+            now = time.monotonic()
+            if self.last_refill is not None:
+                self.tokens = min(self.max_calls, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1.0
+                self.last_refill = time.monotonic()
+            
+            self.tokens -= 1
\ No newline at end of file
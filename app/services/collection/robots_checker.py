@@ -2,19 +2,59 @@
 robots.txt协议检查器
 """
 
-import re
-from typing import Dict, List, Optional, Set
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple, Any
 from urllib.parse import urlparse
 import aiohttp
+from app.core.config import settings
 from app.utils.logger import logger
 
+try:
+    # google-re2基于DFA匹配，最坏情况下也是线性时间
+    import re2 as re
+except ImportError:
+    import re
+
+
+# 允许抓取所有路径的规则，用于没有robots.txt或获取失败的站点
+_ALLOW_ALL_RULES = {"allow": [], "disallow": [], "allow_any": None, "disallow_any": None}
+
 
 class RobotsTxtChecker:
     """robots.txt协议检查器"""
     
-    def __init__(self):
-        self._cache = {}  # 缓存robots.txt内容
+    def __init__(self, cache_ttl: Optional[int] = None, negative_cache_ttl: Optional[int] = None):
+        # 缓存解析后的规则：(域名, 用户代理) -> (过期时间, 规则)
+        self._rules_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
         self._user_agent = "IntelligentAgentAPI/1.0"
+        self.cache_ttl = cache_ttl if cache_ttl is not None else settings.ROBOTS_CACHE_TTL
+        self.negative_cache_ttl = (
+            negative_cache_ttl if negative_cache_ttl is not None else settings.ROBOTS_NEGATIVE_CACHE_TTL
+        )
+        # 复用的HTTP会话，首次请求或事件循环变化时创建
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """获取共享的HTTP会话，连接池在多次robots.txt请求间复用，事件循环变化时重建"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=100, limit_per_host=4, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=5)
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def close(self):
+        """关闭HTTP会话，在应用关闭时调用"""
+        session = self._session
+        self._session = None
+        self._session_loop = None
+        if session and not session.closed:
+            await session.close()
     
     async def can_fetch(self, url: str, user_agent: Optional[str] = None) -> bool:
         """
@@ -38,121 +78,199 @@ class RobotsTxtChecker:
             logger.warning(f"无法解析URL的域名: {url}")
             return True  # 默认允许
         
-        # 获取robots.txt内容
-        robots_url = f"https://{domain}/robots.txt"
-        robots_content = await self._get_robots_content(robots_url)
-        
-        if not robots_content:
-            # 如果无法获取robots.txt，默认允许抓取
-            return True
-        
-        # 解析robots.txt规则
-        rules = self._parse_robots_txt(robots_content, user_agent)
+        # 获取解析后的robots.txt规则
+        rules = await self._get_rules(domain, user_agent)
         
         # 检查路径是否允许
         path = parsed_url.path or "/"
         return self._check_path_allowed(path, rules)
     
-    async def _get_robots_content(self, robots_url: str) -> Optional[str]:
-        """获取robots.txt内容"""
-        # 检查缓存
-        if robots_url in self._cache:
-            return self._cache[robots_url]
+    async def _get_rules(self, domain: str, user_agent: str) -> Dict[str, Any]:
+        """获取域名对应用户代理的规则，优先使用未过期的缓存"""
+        cache_key = (domain, user_agent)
+        now = time.monotonic()
+        cached = self._rules_cache.get(cache_key)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        robots_url = f"https://{domain}/robots.txt"
+        rules = await self._fetch_rules(robots_url, user_agent)
+        
+        if rules is None:
+            # 获取失败，默认允许抓取，短时间内不再重复请求
+            rules, ttl = _ALLOW_ALL_RULES, self.negative_cache_ttl
+        else:
+            ttl = self.cache_ttl
+        
+        self._rules_cache[cache_key] = (now + ttl, rules)
+        return rules
+    
+    async def _fetch_rules(self, robots_url: str, user_agent: str) -> Optional[Dict[str, Any]]:
+        """
+        流式获取并解析robots.txt，读完通配符组和本用户代理的规则组后即停止读取
         
+        Returns:
+            编译后的规则，没有robots.txt时为允许全部，获取失败时返回None
+        """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(robots_url, timeout=5) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        self._cache[robots_url] = content
-                        return content
-                    elif response.status == 404:
-                        # 没有robots.txt文件，缓存空结果
-                        self._cache[robots_url] = ""
-                        return ""
-                    else:
-                        logger.warning(f"获取robots.txt失败: {robots_url}, 状态码: {response.status}")
-                        return None
+            session = await self._ensure_session()
+            async with session.get(robots_url) as response:
+                if response.status == 404:
+                    # 没有robots.txt文件，允许抓取
+                    return _ALLOW_ALL_RULES
+                if response.status != 200:
+                    logger.warning(f"获取robots.txt失败: {robots_url}, 状态码: {response.status}")
+                    return None
+                
+                rules = {"allow": [], "disallow": []}
+                parser = self._rules_parser(user_agent, rules)
+                next(parser)
+                encoding = response.charset or 'utf-8'
+                buffer = b''
+                try:
+                    async for chunk in response.content.iter_chunked(4096):
+                        buffer += chunk
+                        *lines, buffer = buffer.split(b'\n')
+                        for line in lines:
+                            parser.send(line.decode(encoding, errors='replace'))
+                    if buffer:
+                        parser.send(buffer.decode(encoding, errors='replace'))
+                except StopIteration:
+                    # 已读完相关规则组，不再读取剩余内容
+                    response.release()
+                
+                return self._compile_rules(rules)
         except Exception as e:
             logger.warning(f"获取robots.txt异常: {robots_url}, 错误: {str(e)}")
             return None
     
-    def _parse_robots_txt(self, content: str, user_agent: str) -> Dict[str, List[str]]:
-        """解析robots.txt内容"""
+    def _parse_robots_txt(self, content: str, user_agent: str) -> Dict[str, Any]:
+        """解析完整的robots.txt内容，规则在解析时预编译"""
         rules = {"allow": [], "disallow": []}
         
-        if not content:
-            return rules
+        if content:
+            # 完整解析时读完全部内容，合并所有匹配组的规则
+            parser = self._rules_parser(user_agent, rules, stop_early=False)
+            next(parser)
+            for line in content.splitlines():
+                parser.send(line)
+        
+        return self._compile_rules(rules)
+    
+    def _rules_parser(self, user_agent: str, rules: Dict[str, List[str]], stop_early: bool = True):
+        """
+        逐行解析robots.txt的生成器，通过send()输入行，将所有匹配组的规则追加到rules
         
-        lines = content.split('\n')
-        current_ua = None
+        stop_early为True时，通配符(*)组和指名本用户代理的组都已读完（其后出现新的User-agent行）
+        生成器即结束，调用方据此停止读取；两者缺一时读完全部内容
+        """
+        user_agent_lower = user_agent.lower()
+        ua_matched = False
+        group_has_rules = False
+        seen_wildcard = False
+        seen_specific = False
         
-        for line in lines:
-            line = line.strip()
+        while True:
+            line = (yield).strip()
             
             # 跳过空行和注释
-            if not line or line.startswith('#'):
+            if not line or line[0] == '#':
                 continue
             
-            # 解析User-agent
-            if line.lower().startswith('user-agent:'):
-                current_ua = line.split(':', 1)[1].strip()
+            field, sep, value = line.partition(':')
+            if not sep:
                 continue
+            field = field.rstrip().lower()
             
+            # 解析User-agent
+            if field == 'user-agent':
+                if stop_early and group_has_rules and seen_wildcard and seen_specific:
+                    return
+                group_has_rules = False
+                current_ua = value.strip().lower()
+                ua_matched = bool(current_ua) and (current_ua == '*' or current_ua in user_agent_lower)
+                if ua_matched:
+                    if current_ua == '*':
+                        seen_wildcard = True
+                    else:
+                        seen_specific = True
             # 解析Allow/Disallow规则
-            if current_ua and (current_ua == '*' or current_ua.lower() in user_agent.lower()):
-                if line.lower().startswith('allow:'):
-                    path = line.split(':', 1)[1].strip()
-                    rules["allow"].append(path)
-                elif line.lower().startswith('disallow:'):
-                    path = line.split(':', 1)[1].strip()
-                    rules["disallow"].append(path)
+            elif field == 'allow' or field == 'disallow':
+                group_has_rules = True
+                if ua_matched:
+                    rules[field].append(value.strip())
+    
+    def _compile_rules(self, rules: Dict[str, List[str]]) -> Dict[str, Any]:
+        """
+        将原始规则编译为正则
         
-        return rules
+        每类规则保存(compiled, original)列表，并合并为一个交替正则，每个路径只需匹配一次
+        """
+        compiled_rules = {}
+        for kind in ("allow", "disallow"):
+            patterns = [pattern for pattern in rules[kind] if pattern]
+            compiled_rules[kind] = []
+            for pattern in patterns:
+                compiled = self._compile_pattern(pattern)
+                if compiled is not None:
+                    compiled_rules[kind].append((compiled, pattern))
+            compiled_rules[f"{kind}_any"] = self._compile_union(
+                [self._pattern_to_regex(pattern) for _, pattern in compiled_rules[kind]]
+            )
+        return compiled_rules
+    
+    def _pattern_to_regex(self, pattern: str) -> str:
+        """将robots.txt路径模式转换为正则表达式（不含^锚点）"""
+        # 处理通配符
+        regex_pattern = re.escape(pattern)
+        regex_pattern = regex_pattern.replace(r'\*', '.*')
+        regex_pattern = regex_pattern.replace(r'\$', '$')
+        return regex_pattern
+    
+    def _compile_pattern(self, pattern: str):
+        """编译单个路径模式"""
+        try:
+            return re.compile(f"^{self._pattern_to_regex(pattern)}")
+        except re.error:
+            logger.warning(f"正则表达式错误: {pattern}")
+            return None
+    
+    def _compile_union(self, regex_patterns: List[str]):
+        """将多个正则合并为一个交替正则"""
+        if not regex_patterns:
+            return None
+        try:
+            return re.compile("^(?:" + "|".join(regex_patterns) + ")")
+        except re.error:
+            logger.warning(f"合并正则表达式失败，共{len(regex_patterns)}条规则")
+            return None
     
-    def _check_path_allowed(self, path: str, rules: Dict[str, List[str]]) -> bool:
+    def _check_path_allowed(self, path: str, rules: Dict[str, Any]) -> bool:
         """检查路径是否允许抓取"""
         # 默认允许
         if not rules["disallow"]:
             return True
         
         # 检查disallow规则
-        for disallow_pattern in rules["disallow"]:
-            if disallow_pattern and self._path_matches_pattern(path, disallow_pattern):
-                # 检查是否有更具体的allow规则覆盖
-                for allow_pattern in rules["allow"]:
-                    if self._path_matches_pattern(path, allow_pattern):
-                        # allow规则优先级更高
-                        return True
-                return False
+        if self._matches_any(path, rules["disallow_any"], rules["disallow"]):
+            # allow规则优先级更高
+            return self._matches_any(path, rules["allow_any"], rules["allow"])
         
         return True
     
-    def _path_matches_pattern(self, path: str, pattern: str) -> bool:
-        """检查路径是否匹配模式"""
-        if not pattern:
-            return False
-        
-        # 处理通配符
-        regex_pattern = re.escape(pattern)
-        regex_pattern = regex_pattern.replace(r'\*', '.*')
-        regex_pattern = regex_pattern.replace(r'\$', '$')
-        
-        # 确保以^开头，以$结尾（如果pattern以$结尾）
-        if pattern.endswith('$'):
-            regex_pattern = f"^{regex_pattern}$"
-        else:
-            regex_pattern = f"^{regex_pattern}"
-        
-        try:
-            return bool(re.match(regex_pattern, path))
-        except re.error:
-            logger.warning(f"正则表达式错误: {regex_pattern}")
-            return False
+    def _matches_any(self, path: str, union, compiled_patterns: List[Tuple[Any, str]]) -> bool:
+        """检查路径是否匹配任一规则，优先使用合并后的正则"""
+        if union is not None:
+            return union.match(path) is not None
+        return any(self._path_matches_pattern(path, compiled) for compiled, _ in compiled_patterns)
+    
+    def _path_matches_pattern(self, path: str, compiled) -> bool:
+        """检查路径是否匹配预编译的模式"""
+        return compiled.match(path) is not None
     
     def clear_cache(self):
         """清空缓存"""
-        self._cache.clear()
+        self._rules_cache.clear()
 
 
 # 全局实例
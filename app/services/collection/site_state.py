@@ -0,0 +1,58 @@
+"""
+站点运行状态
+按站点代码保存结果缓存、后台刷新任务和失败计数，在进程内所有站点实例和采集引擎之间共享
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class SiteState:
+    """单个站点的运行状态"""
+
+    def __init__(self):
+        # 结果缓存：(写入时间, 结果)，写入时间取自单调时钟
+        self.cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        # HTTP方式连续未取到数据的次数
+        self.http_fail_streak = 0
+        # 进行中的刷新任务及其所属的事件循环，任务不能跨事件循环复用
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def cache_age(self) -> Optional[float]:
+        """缓存写入至今的秒数，没有缓存时返回None"""
+        if self.cache is None:
+            return None
+        return time.monotonic() - self.cache[0]
+
+    def store(self, results: List[Dict[str, Any]]):
+        """写入缓存"""
+        self.cache = (time.monotonic(), results)
+
+    def start_refresh(self, refresh: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> asyncio.Task:
+        """
+        启动刷新任务，当前事件循环中已有进行中的刷新时直接复用
+
+        Args:
+            refresh: 返回刷新协程的函数，只在需要新建任务时调用
+        """
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is None or task.done() or self._refresh_loop is not loop:
+            task = loop.create_task(refresh())
+            self._refresh_task = task
+            self._refresh_loop = loop
+        return task
+
+
+# 各站点的运行状态：站点代码 -> SiteState
+_site_states: Dict[str, SiteState] = {}
+
+
+def get_site_state(site_code: str) -> SiteState:
+    """获取站点的运行状态，首次使用时创建"""
+    state = _site_states.get(site_code)
+    if state is None:
+        state = _site_states[site_code] = SiteState()
+    return state
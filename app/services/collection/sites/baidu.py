@@ -4,12 +4,41 @@
 
 import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
-from .base import BaseSite
-from bs4 import BeautifulSoup
+from .base import BaseSite, CollectionError, RANK_STR
+from selectolax.lexbor import LexborHTMLParser
 # 使用新的ID生成工具
-from ....utils.id_generator import generate_content_id
+from ....utils.id_generator import generate_content_ids
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# 页面内嵌热搜数据的匹配正则，模块加载时编译一次
+_BAIDU_HOT_RE = re.compile(r'"word":"([^"]+)","hotScore":"([^"]+)","url":"([^"]+)"')
+
+
+# 模拟数据模板，仅id、collected_at、site_code在生成时填充
+_MOCK_TEMPLATES: Tuple[Dict[str, str], ...] = (
+    {
+        'title': '百度热点新闻示例',
+        'url': 'https://www.baidu.com',
+        'hot': '500000',
+        'rank': '1',
+        'published_at': '2024-01-01 09:00:00'
+    },
+    {
+        'title': '百度热搜话题示例',
+        'url': 'https://www.baidu.com',
+        'hot': '300000',
+        'rank': '2',
+        'published_at': '2024-01-01 08:30:00'
+    },
+)
 
 
 class BaiduSite(BaseSite):
@@ -28,131 +57,143 @@ class BaiduSite(BaseSite):
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
                 'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
-                'Accept-Encoding': 'gzip, deflate',
+                'Accept-Encoding': 'gzip, deflate, br',
                 'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1',
             }
             
+            # 内容未变化时服务端返回304，复用上次的解析结果
+            self._add_conditional_headers(url, headers)
+            
             # 发送请求
             session = await self.get_session()
             async with session.get(url, headers=headers, timeout=10) as response:
-                if response.status == 200:
-                    # 获取响应内容
-                    text = await response.text()
+                if response.status == 304:
+                    # 内容未变化，直接返回上次解析的结果
+                    results = self._get_not_modified_results(url)
+                    if results is None:
+                        # 没有可复用的结果（如进程重启后），不能把模拟数据当作真实数据返回
+                        raise CollectionError(self.site_code, "响应304但没有缓存的解析结果")
+                elif response.status == 200:
+                    # 获取响应内容（字节直接交给解析器，不预先解码）
+                    body = await response.read()
                     # 解析数据
-                    results = self._parse_baidu_data(text)
+                    results = self._parse_baidu_data(body, response.charset or 'utf-8')
+                    self._store_conditional(url, response, results)
                 else:
-                    # 请求失败时返回模拟数据
-                    results = self._get_mock_data()
+                    raise CollectionError(self.site_code, f"请求失败，状态码: {response.status}")
                     
+        except CollectionError:
+            raise
         except Exception as e:
-            # 发生错误时返回模拟数据
-            results = self._get_mock_data()
+            raise CollectionError(self.site_code, f"请求异常: {str(e)}") from e
             
         return results
     
-    def _parse_baidu_data(self, html_text: str) -> List[Dict[str, Any]]:
-        """解析百度热点数据"""
-        hot_data = []
+    def _parse_baidu_data(self, body: bytes, encoding: str = 'utf-8') -> List[Dict[str, Any]]:
+        """解析百度热点数据，页面只解析一次，内嵌JSON、正则和CSS选择器依次作为数据来源"""
+        # 直接构建包含fields键的标准格式
+        results = []
+        # 整批数据共用同一时间戳，只取一次时间
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        collected_str = self._get_current_time()
         
         try:
-            # 尝试使用正则表达式提取数据
-            pattern = r'"word":"([^"]+)","hotScore":"([^"]+)","url":"([^"]+)"'
-            matches = re.findall(pattern, html_text)
+            tree = LexborHTMLParser(body)
             
-            for i, match in enumerate(matches[:50]):  # 限制最多50条
-                # 使用统一的ID生成函数
-                content_id = generate_content_id()
-                
-                title, hot_score, url = match
-                if hot_score:  # 只有hot_score不为空才添加
-                    hot_data.append({
-                        'id': content_id,
+            # 页面包含新版热搜榜容器时正则必然不命中，直接使用CSS选择器
+            use_css = b'category-wrap_' in body
+            
+            # 优先解析<script>中内嵌的JSON数据，其次正则匹配原始HTML（此时才解码），最后在同一棵树上使用CSS选择器
+            entries = (
+                self._extract_script_entries(tree)
+                or (not use_css and _BAIDU_HOT_RE.findall(body.decode(encoding, 'replace')))
+                or self._extract_css_entries(tree)
+            )
+            
+            entries = entries[:50]  # 限制最多50条
+            ids = generate_content_ids(len(entries))  # 使用统一的ID生成函数，整批生成
+            
+            for i, (title, hot, url) in enumerate(entries):
+                if title and hot:  # 只有标题和热度都不为空才添加
+                    results.append({"fields": {
+                        'id': ids[i],
                         'title': title,
                         'url': url,
-                        'hot': hot_score,
-                        'rank': str(i+1),
-                        'published_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        'collected_at': self._get_current_time(),
+                        'hot': hot,
+                        'rank': RANK_STR[i],
+                        'published_at': now_str,
+                        'collected_at': collected_str,
                         'site_code': self.site_code
-                    })
-            
-            # 如果正则没有匹配到，尝试使用BeautifulSoup
-            if not hot_data:
-                soup = BeautifulSoup(html_text, 'html.parser')
-                # 百度热搜榜的条目容器
-                items = soup.find_all('div', class_='category-wrap_iQLoo')[:50]
-                
-                for i, item in enumerate(items):
-                    try:
-                        # 使用统一的ID生成函数
-                        content_id = generate_content_id()
-                        
-                        # 提取标题
-                        title_elem = item.find('div', class_='c-single-text-ellipsis')
-                        title = title_elem.get_text().strip() if title_elem else ''
-                        
-                        # 提取热度
-                        hot_elem = item.find('div', class_='hot-index_1Bl1a')
-                        hot = hot_elem.get_text().strip() if hot_elem else ''
-                        
-                        # 提取链接
-                        link_elem = item.find('a')
-                        url = link_elem.get('href', '') if link_elem else ''
-                        
-                        if title and hot:  # 只有标题和热度都不为空才添加
-                            hot_data.append({
-                                'id': content_id,
-                                'title': title,
-                                'url': url,
-                                'hot': hot,
-                                'rank': str(i+1),
-                                'published_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                'collected_at': self._get_current_time(),
-                                'site_code': self.site_code
-                            })
-                    except Exception:
-                        continue
+                    }})
                         
         except Exception as e:
             # 解析失败时返回空列表
             pass
             
-        # 将数据格式转换为包含fields键的标准格式
-        formatted_results = []
-        for item in hot_data:
-            formatted_results.append({"fields": item})
+        return results
+    
+    def _extract_script_entries(self, tree: LexborHTMLParser) -> List[Tuple[str, str, str]]:
+        """从<script>内嵌的JSON数据（如__PRELOADED_STATE__）中提取(标题, 热度, 链接)"""
+        for script in tree.css('script'):
+            text = script.text()
+            if '"hotScore"' not in text:
+                continue
             
-        return formatted_results
+            start, end = text.find('{'), text.rfind('}')
+            if start < 0 or end <= start:
+                continue
+            try:
+                blob = text[start:end + 1]
+                payload = orjson.loads(blob) if ORJSON_AVAILABLE else json.loads(blob)
+            except ValueError:
+                continue
+            
+            entries = [
+                (str(item.get('word') or ''), str(item.get('hotScore') or ''), str(item.get('url') or ''))
+                for item in self._iter_hot_items(payload)
+            ]
+            if entries:
+                return entries
+        return []
+    
+    def _iter_hot_items(self, node: Any):
+        """递归遍历JSON，产出包含word和hotScore的热搜条目"""
+        if isinstance(node, dict):
+            if 'word' in node and 'hotScore' in node:
+                yield node
+                return
+            for value in node.values():
+                yield from self._iter_hot_items(value)
+        elif isinstance(node, list):
+            for value in node:
+                yield from self._iter_hot_items(value)
+    
+    def _extract_css_entries(self, tree: LexborHTMLParser) -> List[Tuple[str, str, str]]:
+        """使用CSS选择器从热搜榜条目中提取(标题, 热度, 链接)"""
+        entries = []
+        # 百度热搜榜的条目容器
+        for item in tree.css('div.category-wrap_iQLoo')[:50]:
+            # 提取标题
+            title_elem = item.css_first('div.c-single-text-ellipsis')
+            title = title_elem.text().strip() if title_elem else ''
+            
+            # 提取热度
+            hot_elem = item.css_first('div.hot-index_1Bl1a')
+            hot = hot_elem.text().strip() if hot_elem else ''
+            
+            # 提取链接
+            link_elem = item.css_first('a')
+            url = (link_elem.attributes.get('href') or '') if link_elem else ''
+            
+            entries.append((title, hot, url))
+        return entries
     
     def _get_mock_data(self) -> List[Dict[str, Any]]:
         """获取模拟数据（用于演示或备用）"""
-        mock_data = [
-            {
-                'id': generate_content_id(),  # 使用统一的ID生成函数
-                'title': '百度热点新闻示例',
-                'url': 'https://www.baidu.com',
-                'hot': '500000',
-                'rank': '1',
-                'published_at': '2024-01-01 09:00:00',
-                'collected_at': self._get_current_time(),
-                'site_code': self.site_code
-            },
-            {
-                'id': generate_content_id(),  # 使用统一的ID生成函数
-                'title': '百度热搜话题示例',
-                'url': 'https://www.baidu.com',
-                'hot': '300000',
-                'rank': '2',
-                'published_at': '2024-01-01 08:30:00',
-                'collected_at': self._get_current_time(),
-                'site_code': self.site_code
-            }
+        ids = generate_content_ids(len(_MOCK_TEMPLATES))  # 使用统一的ID生成函数
+        collected_str = self._get_current_time()
+        return [
+            {"fields": {**template, 'id': ids[i], 'collected_at': collected_str, 'site_code': self.site_code}}
+            for i, template in enumerate(_MOCK_TEMPLATES)
         ]
-        
-        # 将数据格式转换为包含fields键的标准格式
-        formatted_results = []
-        for item in mock_data:
-            formatted_results.append({"fields": item})
-            
-        return formatted_results
\ No newline at end of file
@@ -4,19 +4,49 @@
 """
 
 import asyncio
-from typing import List, Dict, Any
-from datetime import datetime
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+import time
 import aiohttp
 from abc import ABC, abstractmethod
+from ..browser_pool import browser_pool
+from ....utils.id_generator import generate_content_ids
+
+
+# HTML/XML解析线程池：解析在线程中执行，不阻塞事件循环；线程数限制同时解析的数量
+_PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="site-parse")
+
+# 排名1-100的字符串，RANK_STR[i]即第i+1名，解析循环中直接取用
+RANK_STR = tuple(str(i) for i in range(1, 101))
+
+
+class CollectionError(Exception):
+    """站点采集失败（请求异常或非200响应），由调用方决定重试、退避或使用模拟数据"""
+    
+    def __init__(self, site_code: str, message: str):
+        super().__init__(f"{site_code}: {message}")
+        self.site_code = site_code
 
 
 class BaseSite(ABC):
     """采集站点基类"""
     
+    # 所有站点实例共享的HTTP会话，连接池和DNS缓存在站点与采集周期之间复用
+    _shared_session: Optional[aiohttp.ClientSession] = None
+    _shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    # 条件请求缓存：URL -> (ETag, Last-Modified, 解析结果)
+    # 站点实例每次采集时新建，因此缓存放在类上共享
+    _conditional_cache: Dict[str, Tuple[Optional[str], Optional[str], List[Dict[str, Any]]]] = {}
+    
+    # 最近一次格式化的时间（秒级），同一秒内的多次调用直接复用
+    _last_time_sec: int = 0
+    _last_time_str: str = ''
+    
     def __init__(self, site_code: str, config: Dict[str, Any]):
         self.site_code = site_code
         self.config = config
-        self._session = None
     
     @abstractmethod
     async def collect(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -24,24 +54,130 @@ class BaseSite(ABC):
         pass
     
     async def get_session(self) -> aiohttp.ClientSession:
-        """获取HTTP会话"""
-        if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=self.config.get("timeout", 10))
-            connector = aiohttp.TCPConnector(limit=10, ttl_dns_cache=300)
-            self._session = aiohttp.ClientSession(timeout=timeout, connector=connector)
-        return self._session
+        """获取HTTP会话（进程内共享，各站点请求时自行传入超时）"""
+        return BaseSite.get_shared_session()
+    
+    @classmethod
+    def get_shared_session(cls) -> aiohttp.ClientSession:
+        """获取共享HTTP会话，首次使用或事件循环变化时创建"""
+        loop = asyncio.get_running_loop()
+        session = BaseSite._shared_session
+        if session is None or session.closed or BaseSite._shared_session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=8,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            )
+            BaseSite._shared_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15),
+                connector=connector
+            )
+            BaseSite._shared_session_loop = loop
+        return BaseSite._shared_session
+    
+    @classmethod
+    async def close_shared(cls):
+        """关闭共享HTTP会话，在应用关闭时调用"""
+        session = BaseSite._shared_session
+        BaseSite._shared_session = None
+        BaseSite._shared_session_loop = None
+        if session and not session.closed:
+            await session.close()
+    
+    @staticmethod
+    def acquire_page():
+        """
+        从共享浏览器上下文获取页面，用法：async with self.acquire_page() as page
+        
+        所有站点共用一个浏览器进程和上下文，同时打开的页面数达到上限时等待
+        """
+        return browser_pool.acquire_page()
     
     async def cleanup(self):
-        """清理资源"""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """清理资源（共享会话不在单次采集后关闭，由close_shared统一关闭）"""
+        pass
+    
+    async def _parse_in_thread(self, parse_func, *args):
+        """在解析线程池中执行同步解析函数，解析期间其他采集可以继续进行"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_PARSE_EXECUTOR, parse_func, *args)
+    
+    def _add_conditional_headers(self, url: str, headers: Dict[str, str]) -> Dict[str, str]:
+        """根据上次响应的ETag/Last-Modified添加条件请求头"""
+        cached = BaseSite._conditional_cache.get(url)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+    
+    def _get_not_modified_results(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        响应304时返回上次解析的结果副本，没有缓存时返回None
+        
+        复用的结果重新生成id和采集时间，与新采集的数据一样作为新的一批入库
+        """
+        cached = BaseSite._conditional_cache.get(url)
+        return self._renew_results(cached[2]) if cached else None
+    
+    def _renew_results(self, cached_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """复制缓存的结果，并为副本重新生成id和采集时间"""
+        results = copy.deepcopy(cached_results)
+        # 结果可能是{"fields": {...}}包装格式，也可能直接是字段字典
+        rows = [item.get('fields', item) for item in results]
+        ids = generate_content_ids(len(rows))
+        collected_str = self._get_current_time()
+        for row, content_id in zip(rows, ids):
+            if 'id' in row:
+                row['id'] = content_id
+            if 'collected_at' in row:
+                row['collected_at'] = collected_str
+        return results
+    
+    def _store_conditional(self, url: str, response: aiohttp.ClientResponse, results: List[Dict[str, Any]]):
+        """保存响应的ETag/Last-Modified及解析结果，供下次条件请求使用"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if results and (etag or last_modified):
+            BaseSite._conditional_cache[url] = (etag, last_modified, copy.deepcopy(results))
+        else:
+            BaseSite._conditional_cache.pop(url, None)
     
     def _get_current_time(self) -> str:
-        """获取当前时间字符串"""
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        """获取当前时间字符串，同一秒内复用已格式化的结果"""
+        sec = int(time.time())
+        if sec != BaseSite._last_time_sec:
+            BaseSite._last_time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+            BaseSite._last_time_sec = sec
+        return BaseSite._last_time_str
     
     def _validate_result(self, result: Dict[str, Any]) -> bool:
         """验证采集结果"""
         # 检查必要字段
         required_fields = ['title', 'url']
-        return all(result.get(field) for field in required_fields)
\ No newline at end of file
+        return all(result.get(field) for field in required_fields)
+
+
+async def collect_all(sites: List[BaseSite], params: Dict[str, Any], concurrency: int = 8) -> List[Any]:
+    """
+    并发执行多个站点的采集，总耗时取决于最慢的站点而非各站点之和
+    
+    Args:
+        sites: 站点实例列表
+        params: 采集参数
+        concurrency: 同时进行的最大采集数
+        
+    Returns:
+        与sites顺序一致的结果列表，采集异常的站点对应位置为异常对象
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def _collect_one(site: BaseSite) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await site.collect(params)
+    
+    return await asyncio.gather(*[_collect_one(site) for site in sites], return_exceptions=True)
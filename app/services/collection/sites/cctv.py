@@ -2,12 +2,40 @@
 央视新闻热点采集脚本
 """
 
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
-from .base import BaseSite
+from selectolax.lexbor import LexborHTMLParser
+from .base import BaseSite, CollectionError, RANK_STR
 # 导入统一的ID生成函数
-from ....utils.id_generator import generate_content_id
+from ....utils.id_generator import generate_content_ids
+from app.utils.logger import logger
+
+
+# 模拟数据模板，仅id、collected_at、site_code在生成时填充
+_MOCK_TEMPLATES: Tuple[Dict[str, str], ...] = (
+    {
+        'title': '央视新闻热点示例',
+        'url': 'https://news.cctv.com',
+        'hot': '500000',
+        'rank': '1',
+        'published_at': '2024-01-01 09:00:00',
+        'category': '示例分类',
+        'content': '这是央视新闻的示例内容',
+        'author': '央视新闻',
+        'status': 'collected'
+    },
+    {
+        'title': '央视时政要闻示例',
+        'url': 'https://news.cctv.com',
+        'hot': '300000',
+        'rank': '2',
+        'published_at': '2024-01-01 08:30:00',
+        'category': '时政',
+        'content': '这是央视时政新闻的示例内容',
+        'author': '央视新闻',
+        'status': 'collected'
+    },
+)
 
 
 class CctvSite(BaseSite):
@@ -29,22 +57,31 @@ class CctvSite(BaseSite):
                 'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
             }
             
+            # 内容未变化时服务端返回304，复用上次的解析结果
+            self._add_conditional_headers(url, headers)
+            
             # 发送请求
             session = await self.get_session()
             async with session.get(url, headers=headers, timeout=15) as response:
-                if response.status == 200:
-                    # 获取响应内容
-                    text = await response.text()
+                if response.status == 304:
+                    # 内容未变化，直接返回上次解析的结果
+                    results = self._get_not_modified_results(url)
+                    if results is None:
+                        # 没有可复用的结果（如进程重启后），不能把模拟数据当作真实数据返回
+                        raise CollectionError(self.site_code, "响应304但没有缓存的解析结果")
+                elif response.status == 200:
+                    # 获取响应内容（字节直接交给解析器，不预先解码）
+                    body = await response.read()
                     # 解析数据
-                    results = self._parse_cctv_homepage_data(text)
+                    results = self._parse_cctv_homepage_data(body)
+                    self._store_conditional(url, response, results)
                 else:
-                    # 请求失败时返回模拟数据
-                    raise Exception(f"请求失败，状态码: {response.status}")
+                    raise CollectionError(self.site_code, f"请求失败，状态码: {response.status}")
                     
+        except CollectionError:
+            raise
         except Exception as e:
-            print(f"央视新闻采集脚本出错: {e}")
-            # 发生错误时返回模拟数据
-            results = self._get_mock_data()
+            raise CollectionError(self.site_code, f"请求异常: {str(e)}") from e
             
         # 根据参数决定返回格式
         format_type = params.get("format", "raw")
@@ -57,47 +94,53 @@ class CctvSite(BaseSite):
             
         return results
     
-    def _parse_cctv_homepage_data(self, html_text: str) -> List[Dict[str, Any]]:
+    def _parse_cctv_homepage_data(self, body: bytes) -> List[Dict[str, Any]]:
         """解析央视新闻主页数据"""
-        from bs4 import BeautifulSoup
-        import re
-        
         hot_data = []
+        # 整批数据共用同一时间戳，只取一次时间
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        collected_str = self._get_current_time()
         
         try:
-            soup = BeautifulSoup(html_text, 'html.parser')
+            tree = LexborHTMLParser(body)
             
             # 查找新闻条目，使用更精确的选择器
             # 查找包含新闻链接的元素
-            news_items = soup.find_all(['a'], href=re.compile(r'.*\.shtml'))
+            news_items = tree.css('a[href$=".shtml"]')
+            ids = generate_content_ids(min(len(news_items), 50))  # 使用统一的ID生成函数，整批生成
+            # 基于标题去重，最多保留50条不重复的条目
+            seen_titles = set()
             
-            for i, item in enumerate(news_items[:50]):  # 限制最多50条
+            for item in news_items:
+                if len(hot_data) >= 50:  # 限制最多50条
+                    break
                 try:
                     # 提取标题
-                    title = item.get_text().strip()
+                    title = item.text(strip=True)
                     
                     # 提取链接
-                    url = item.get('href', '')
+                    url = item.attributes.get('href') or ''
                     
                     # 过滤无效标题
                     if not title or len(title) < 4 or 'href' in title:
                         continue
                     
+                    if title in seen_titles:
+                        continue
+                    seen_titles.add(title)
+                    
                     # 简单热度计算（基于标题长度）
                     hot_score = str(len(title) * 10)
                     
-                    # 使用统一的ID生成函数
-                    content_id = generate_content_id()
-                    
                     # 添加所有必需字段以匹配飞书表格字段要求
                     hot_data.append({
-                        'id': content_id,
+                        'id': ids[len(hot_data)],
                         'title': title,
                         'url': url,
                         'hot': hot_score,
-                        'rank': str(i+1),
-                        'published_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        'collected_at': self._get_current_time(),
+                        'rank': RANK_STR[len(hot_data)],
+                        'published_at': now_str,
+                        'collected_at': collected_str,
                         'site_code': self.site_code,
                         'category': '新闻',  # 添加category字段
                         'content': '',       # 添加content字段
@@ -109,54 +152,16 @@ class CctvSite(BaseSite):
                     continue
                         
         except Exception as e:
-            # 解析失败时返回空列表
-            print(f"解析央视新闻主页数据出错: {e}")
-            pass
-            
-        # 如果没有解析到数据，返回模拟数据
-        if not hot_data:
-            hot_data = self._get_mock_data()
-        else:
-            # 去重，基于标题
-            seen_titles = set()
-            unique_data = []
-            for item in hot_data:
-                if item['title'] not in seen_titles:
-                    seen_titles.add(item['title'])
-                    unique_data.append(item)
-            hot_data = unique_data[:50]  # 限制最多50条
+            # 解析失败时返回已解析的数据（可能为空），不使用模拟数据
+            logger.exception("解析央视新闻主页数据出错: %s", e)
             
         return hot_data
     
     def _get_mock_data(self) -> List[Dict[str, Any]]:
         """获取模拟数据（用于演示或备用）"""
+        ids = generate_content_ids(len(_MOCK_TEMPLATES))  # 使用统一的ID生成函数
+        collected_str = self._get_current_time()
         return [
-            {
-                'id': generate_content_id(),  # 使用统一的ID生成函数
-                'title': '央视新闻热点示例',
-                'url': 'https://news.cctv.com',
-                'hot': '500000',
-                'rank': '1',
-                'published_at': '2024-01-01 09:00:00',
-                'collected_at': self._get_current_time(),
-                'site_code': self.site_code,
-                'category': '示例分类',
-                'content': '这是央视新闻的示例内容',
-                'author': '央视新闻',
-                'status': 'collected'
-            },
-            {
-                'id': generate_content_id(),  # 使用统一的ID生成函数
-                'title': '央视时政要闻示例',
-                'url': 'https://news.cctv.com',
-                'hot': '300000',
-                'rank': '2',
-                'published_at': '2024-01-01 08:30:00',
-                'collected_at': self._get_current_time(),
-                'site_code': self.site_code,
-                'category': '时政',
-                'content': '这是央视时政新闻的示例内容',
-                'author': '央视新闻',
-                'status': 'collected'
-            }
-        ]
\ No newline at end of file
+            {**template, 'id': ids[i], 'collected_at': collected_str, 'site_code': self.site_code}
+            for i, template in enumerate(_MOCK_TEMPLATES)
+        ]
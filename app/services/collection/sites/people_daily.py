@@ -2,12 +2,32 @@
 人民网热点采集脚本
 """
 
-import json
-from typing import List, Dict, Any
+from io import BytesIO
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
-from .base import BaseSite
+from lxml import etree
+from .base import BaseSite, CollectionError, RANK_STR
 # 导入统一的ID生成函数
-from ....utils.id_generator import generate_content_id
+from ....utils.id_generator import generate_content_ids
+
+
+# 模拟数据模板，仅id、collected_at、site_code在生成时填充
+_MOCK_TEMPLATES: Tuple[Dict[str, str], ...] = (
+    {
+        'title': '人民网热点新闻示例',
+        'url': 'http://www.people.com.cn',
+        'hot': '500000',
+        'rank': '1',
+        'published_at': '2024-01-01 09:00:00'
+    },
+    {
+        'title': '人民网时政要闻示例',
+        'url': 'http://www.people.com.cn',
+        'hot': '300000',
+        'rank': '2',
+        'published_at': '2024-01-01 08:30:00'
+    },
+)
 
 
 class PeopleDailySite(BaseSite):
@@ -29,118 +49,89 @@ class PeopleDailySite(BaseSite):
                 'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
             }
             
+            # 内容未变化时服务端返回304，复用上次的解析结果
+            self._add_conditional_headers(url, headers)
+            
             # 发送请求
             session = await self.get_session()
             async with session.get(url, headers=headers, timeout=15) as response:
-                if response.status == 200:
-                    # 获取响应内容
-                    text = await response.text()
+                if response.status == 304:
+                    # 内容未变化，直接返回上次解析的结果
+                    results = self._get_not_modified_results(url)
+                    if results is None:
+                        # 没有可复用的结果（如进程重启后），不能把模拟数据当作真实数据返回
+                        raise CollectionError(self.site_code, "响应304但没有缓存的解析结果")
+                elif response.status == 200:
+                    # 获取响应内容（字节交给XML解析器，按XML声明的编码解码）
+                    body = await response.read()
                     # 解析数据
-                    results = self._parse_people_daily_data(text)
+                    results = self._parse_people_daily_data(body)
+                    self._store_conditional(url, response, results)
                 else:
-                    # 请求失败时返回模拟数据
-                    results = self._get_mock_data()
+                    raise CollectionError(self.site_code, f"请求失败，状态码: {response.status}")
                     
+        except CollectionError:
+            raise
         except Exception as e:
-            # 发生错误时返回模拟数据
-            results = self._get_mock_data()
+            raise CollectionError(self.site_code, f"请求异常: {str(e)}") from e
             
         return results
     
-    def _parse_people_daily_data(self, xml_text: str) -> List[Dict[str, Any]]:
-        """解析人民网热点数据"""
-        from bs4 import BeautifulSoup
-        import re
-        
-        hot_data = []
+    def _parse_people_daily_data(self, xml_bytes: bytes) -> List[Dict[str, Any]]:
+        """解析人民网热点数据，流式遍历RSS中的item，处理完即释放元素"""
+        # 直接构建包含fields键的标准格式，确保与weibo.py格式一致
+        results = []
+        # 整批数据共用同一时间戳，只取一次时间
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        collected_str = self._get_current_time()
+        ids = generate_content_ids(50)  # 使用统一的ID生成函数，按上限整批生成
         
         try:
-            soup = BeautifulSoup(xml_text, 'xml')
-            items = soup.find_all('item')[:50]  # 限制最多50条
-            
-            for i, item in enumerate(items):
+            # recover=True：容忍未定义实体等格式错误，单处错误不会截断整个订阅源
+            items = etree.iterparse(BytesIO(xml_bytes), tag='item', recover=True)
+            for i, (_, elem) in enumerate(items):
+                if i >= 50:  # 限制最多50条
+                    break
                 try:
-                    # 使用统一的ID生成函数
-                    content_id = generate_content_id()
-                    
-                    # 提取标题
-                    title_elem = item.find('title')
-                    title = title_elem.get_text().strip() if title_elem else ''
-                    
-                    # 提取链接
-                    link_elem = item.find('link')
-                    url = link_elem.get_text().strip() if link_elem else ''
-                    
-                    # 提取描述
-                    desc_elem = item.find('description')
-                    description = desc_elem.get_text().strip() if desc_elem else ''
+                    # 提取标题、链接、描述
+                    title = (elem.findtext('title') or '').strip()
+                    url = (elem.findtext('link') or '').strip()
+                    description = (elem.findtext('description') or '').strip()
                     
                     # 提取发布时间
-                    pubdate_elem = item.find('pubDate')
-                    pubdate = pubdate_elem.get_text().strip() if pubdate_elem else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    pubdate = (elem.findtext('pubDate') or '').strip() or now_str
                     
                     # 简单热度计算（基于标题和描述长度）
                     hot_score = str(len(title) + len(description))
                     
-                    if title:  # 只有标题不为空才添加
-                        hot_data.append({
-                            'id': content_id,
+                    # 数据清洗和验证：标题和链接都不为空才添加（与_validate_result的必要字段一致）
+                    if title and url:
+                        results.append({"fields": {
+                            'id': ids[i],
                             'title': title,
                             'url': url,
                             'hot': hot_score,
-                            'rank': str(i+1),
+                            'rank': RANK_STR[i],
                             'published_at': pubdate,
-                            'collected_at': self._get_current_time(),
+                            'collected_at': collected_str,
                             'site_code': self.site_code
-                        })
+                        }})
                 except Exception:
                     continue
+                finally:
+                    elem.clear()
                         
         except Exception as e:
-            # 解析失败时返回空列表
+            # 解析失败时返回已解析的数据
             pass
             
-        # 格式化数据，确保与weibo.py格式一致
-        results = []
-        for item in hot_data:
-            result = {
-                'id': item['id'],
-                'title': item['title'],
-                'url': item['url'],
-                'hot': item['hot'],
-                'rank': item['rank'],
-                'published_at': item['published_at'],
-                'collected_at': item['collected_at'],
-                'site_code': item['site_code']
-            }
-            
-            # 数据清洗和验证
-            if self._validate_result(result):
-                results.append({"fields": result})
-                
         return results
     
     def _get_mock_data(self) -> List[Dict[str, Any]]:
         """获取模拟数据（用于演示或备用）"""
+        ids = generate_content_ids(len(_MOCK_TEMPLATES))  # 使用统一的ID生成函数
+        collected_str = self._get_current_time()
         return [
-            {
-                'id': generate_content_id(),  # 使用统一的ID生成函数
-                'title': '人民网热点新闻示例',
-                'url': 'http://www.people.com.cn',
-                'hot': '500000',
-                'rank': '1',
-                'published_at': '2024-01-01 09:00:00',
-                'collected_at': self._get_current_time(),
-                'site_code': self.site_code
-            },
-            {
-                'id': generate_content_id(),  # 使用统一的ID生成函数
-                'title': '人民网时政要闻示例',
-                'url': 'http://www.people.com.cn',
-                'hot': '300000',
-                'rank': '2',
-                'published_at': '2024-01-01 08:30:00',
-                'collected_at': self._get_current_time(),
-                'site_code': self.site_code
-            }
-        ]
\ No newline at end of file
+            {**template, 'id': ids[i], 'collected_at': collected_str, 'site_code': self.site_code}
+            for i, template in enumerate(_MOCK_TEMPLATES)
+        ]
@@ -3,250 +3,316 @@
 结合基础HTTP请求和浏览器自动化技术
 """
 
+import asyncio
 import json
-from typing import List, Dict, Any
+import re
+from urllib.parse import quote
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+from selectolax.lexbor import LexborHTMLParser
 from .base import BaseSite
+from ..browser_pool import browser_pool, PLAYWRIGHT_AVAILABLE
+from ..site_state import get_site_state
+from app.utils.logger import logger
 # 导入统一的ID生成函数
-from ....utils.id_generator import generate_content_id
+from ....utils.id_generator import generate_content_id, generate_content_ids
 
 try:
-    from playwright.async_api import async_playwright
-    PLAYWRIGHT_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+
+# 热搜结果缓存的默认时间（秒）：新鲜期内直接返回；过期但未超过最长保留时间时先返回旧数据，后台刷新
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_STALE_TTL = 300
+
+# HTTP方式连续失败达到该次数后才启用浏览器兜底
+DEFAULT_BROWSER_AFTER_FAILURES = 3
+# 浏览器采集（启动、打开页面、提取数据）的总超时（秒）
+DEFAULT_BROWSER_TIMEOUT = 30
+
+# 热度值清理：去掉所有非数字字符
+_RE_NON_DIGITS = re.compile(r'\D')
+
+# 请求头常量，模块加载时构建一次，各次请求共用
+_UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+_HEADERS_JSON = {
+    'User-Agent': _UA,
+    'Accept': 'application/json',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Referer': 'https://weibo.com/',
+}
+_HEADERS_HTML = {
+    'User-Agent': _UA,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
+    'Referer': 'https://weibo.com/',
+}
+
+# 话题搜索链接前缀（关键词两侧加#，即%23）
+_WEIBO_Q_PREFIX = 'https://s.weibo.com/weibo?q=%23'
+
+# 浏览器渲染时拦截的静态资源
+_BLOCKED_RESOURCES = "**/*.{png,jpg,jpeg,gif,webp,svg,ico,woff,woff2,ttf,mp4,webm}"
+
+# 浏览器内提取热搜列表的脚本
+_HOT_LIST_JS = '''() => [...document.querySelectorAll('tbody tr')].slice(0, 50).map((tr, i) => {
+    const a = tr.querySelector('td:nth-child(2) a');
+    if (!a) return null;
+    const title = a.textContent.trim();
+    if (!title) return null;
+    const tds = tr.children;
+    return {
+        title: title,
+        url: a.href,
+        hot: (tds[2] ? tds[2].textContent : '0').replace(/\\D/g, ''),  // 只保留数字
+        rank: (tds[0] ? tds[0].textContent : '').replace(/\\D/g, '') || String(i + 1)  // 只保留数字
+    };
+}).filter(Boolean)'''
 
 
 class WeiboSite(BaseSite):
     """微博热搜采集（整合版）"""
     
-    async def collect(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """采集微博热搜数据"""
-        results = []
+    @property
+    def _state(self):
+        """
+        站点运行状态（热搜结果缓存、进行中的刷新任务、HTTP方式连续失败次数）
         
-        # 优先尝试使用浏览器自动化技术
-        if PLAYWRIGHT_AVAILABLE:
-            try:
-                async with async_playwright() as p:
-                    # 启动浏览器
-                    browser = await p.chromium.launch(
-                        headless=True,  # 无头模式
-                        args=['--no-sandbox', '--disable-dev-shm-usage']
-                    )
-                    
-                    # 创建页面
-                    page = await browser.new_page()
-                    
-                    # 设置用户代理
-                    await page.set_extra_http_headers({
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                    })
-                    
-                    # 访问微博热搜页面
-                    await page.goto("https://s.weibo.com/top/summary", {
-                        'wait_until': 'networkidle',
-                        'timeout': 30000
-                    })
-                    
-                    # 等待页面加载完成
-                    await page.wait_for_selector('tbody tr', timeout=30000)
-                    
-                    # 提取热搜数据
-                    hot_data = await page.evaluate('''() => {
-                        const items = document.querySelectorAll('tbody tr');
-                        const results = [];
-                        
-                        items.forEach((item, index) => {
-                            try {
-                                const td = item.querySelectorAll('td');
-                                if (td.length >= 2) {
-                                    const rank = td[0].textContent.trim();
-                                    const link = td[1].querySelector('a');
-                                    const title = link ? link.textContent.trim() : '';
-                                    const hot = td[2] ? td[2].textContent.trim() : '0';
-                                    
-                                    if (title) {
-                                        results.push({
-                                            title: title,
-                                            url: link ? link.href : '',
-                                            hot: hot.replace(/\\D/g, ''), // 只保留数字
-                                            rank: rank.replace(/\\D/g, '') // 只保留数字
-                                        });
-                                    }
-                                }
-                            } catch (e) {
-                                console.error('解析单项数据出错:', e);
-                            }
-                        });
-                        
-                        return results;
-                    }''')
-                    
-                    # 关闭浏览器
-                    await browser.close()
-                    
-                    # 格式化数据
-                    for i, item in enumerate(hot_data):
-                        result = {
-                            'id': generate_content_id(),  # 使用统一的ID生成函数
-                            'title': item.get('title', '').strip(),
-                            'url': item.get('url', ''),
-                            'hot': item.get('hot', '0'),
-                            'rank': str(item.get('rank', i + 1)),
-                            'published_at': self._get_current_time(),
-                            'collected_at': self._get_current_time(),
-                            'site_code': self.site_code
-                        }
-                        
-                        # 数据清洗和验证
-                        if self._validate_result(result):
-                            results.append({"fields": result})
-                            
-                    # 限制返回数量
-                    results = results[:50]
-                    
-                    if results:
-                        return results
-                        
-            except Exception as e:
-                print(f"微博浏览器自动化采集出错: {e}")
-                # 继续尝试基础HTTP请求方式
+        站点实例每次采集时新建，状态保存在进程级的site_state模块中
+        """
+        return get_site_state(self.site_code)
+    
+    async def collect(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """采集微博热搜数据，优先使用缓存（stale-while-revalidate），返回的数据每次重新生成id"""
+        cache_ttl = self.config.get("cache_ttl", DEFAULT_CACHE_TTL)
+        stale_ttl = self.config.get("cache_stale_ttl", DEFAULT_CACHE_STALE_TTL)
         
-        # 如果浏览器自动化失败，尝试基础HTTP请求方式
-        session = None
+        state = self._state
+        age = state.cache_age()
+        if age is not None:
+            if age < cache_ttl:
+                return self._renew_results(state.cache[1])
+            if age < stale_ttl:
+                # 返回旧数据，同时在后台刷新
+                self._start_refresh(params)
+                return self._renew_results(state.cache[1])
         
+        # 并发的采集请求共用同一次刷新，各自拿到带新id的副本
+        results = await asyncio.shield(self._start_refresh(params))
+        return self._renew_results(results) if results else self._get_mock_data()
+    
+    def _start_refresh(self, params: Dict[str, Any]) -> asyncio.Task:
+        """启动刷新任务，当前事件循环中已有进行中的刷新时直接复用"""
+        return self._state.start_refresh(lambda: self._refresh(params))
+    
+    async def _refresh(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从上游采集热搜并写入缓存，采集失败时不覆盖已有缓存"""
         try:
-            # 微博热搜API
-            url = "https://weibo.com/ajax/side/hotSearch"
-            
-            # 设置请求头
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'application/json',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Referer': 'https://weibo.com/',
-            }
-            
-            # 发送请求
-            session = await self.get_session()
-            async with session.get(url, headers=headers, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # 解析热搜数据
-                    hot_data = []
-                    if 'data' in data and 'realtime' in data['data']:
-                        realtime = data['data']['realtime']
-                        for i, item in enumerate(realtime):
-                            try:
-                                title = item.get('word', '').strip()
-                                if title:  # 只有标题不为空才添加
-                                    hot_data.append({
-                                        'title': title,
-                                        'url': f"https://s.weibo.com/weibo?q=%23{item.get('word', '')}%23",
-                                        'hot': str(item.get('num', 0)),  # 热度值
-                                        'rank': str(i + 1)
-                                    })
-                            except Exception:
-                                continue
-                    
-                    # 格式化数据
-                    for i, item in enumerate(hot_data):
-                        result = {
-                            'id': generate_content_id(),  # 使用统一的ID生成函数
-                            'title': item.get('title', '').strip(),
-                            'url': item.get('url', ''),
-                            'hot': item.get('hot', '0'),
-                            'rank': str(item.get('rank', i + 1)),
-                            'published_at': self._get_current_time(),
-                            'collected_at': self._get_current_time(),
-                            'site_code': self.site_code
-                        }
-                        
-                        # 数据清洗和验证
-                        if self._validate_result(result):
-                            results.append({"fields": result})
-                            
-                    # 限制返回数量
-                    results = results[:50]
-                    
-                    # 如果没有获取到数据，使用备用方案
-                    if not results:
-                        results = self._get_backup_data(session)
-                        
-                else:
-                    # 请求失败时使用备用方案
-                    results = self._get_backup_data(session)
-                    
+            results = await self._collect_uncached(params)
         except Exception as e:
-            print(f"微博采集脚本出错: {e}")
-            # 发生错误时返回模拟数据
-            results = self._get_mock_data()
-        finally:
-            # 确保session被正确关闭
-            if session:
-                await session.close()
-            
+            logger.warning("微博热搜刷新失败: %s", e)
+            return []
+        if results:
+            self._state.store(results)
         return results
     
-    async def _get_backup_data(self, session):
-        """备用数据获取方案"""
+    async def _collect_uncached(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        采集微博热搜数据（不使用缓存），全部方式失败时返回空列表
+        
+        JSON接口与热搜页面HTML并发请求；只有HTTP方式连续失败达到阈值（browser_after_failures）
+        时才使用浏览器渲染兜底。配置force_browser或参数use_browser可直接使用浏览器，便于排查
+        """
+        if self.config.get("force_browser") or params.get("use_browser"):
+            return await self._try_fetch(self._fetch_via_browser)
+        
+        # JSON接口和热搜页面同时请求，取最先返回有效数据的一个，其余请求取消
+        tasks = [
+            asyncio.create_task(self._try_fetch(fetch))
+            for fetch in (self._fetch_json, self._fetch_html_backup)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                results = await next_done
+                if results:
+                    self._state.http_fail_streak = 0
+                    return results
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        # 两种HTTP方式都没有数据，连续失败达到阈值时才启动浏览器
+        state = self._state
+        state.http_fail_streak += 1
+        threshold = self.config.get("browser_after_failures", DEFAULT_BROWSER_AFTER_FAILURES)
+        if state.http_fail_streak < threshold:
+            return []
+        return await self._try_fetch(self._fetch_via_browser)
+    
+    async def _try_fetch(self, fetch) -> List[Dict[str, Any]]:
+        """执行一种采集方式，出错时返回空列表"""
         try:
-            # 尝试访问微博热搜页面
-            url = "https://s.weibo.com/top/summary"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
-                'Referer': 'https://weibo.com/',
-            }
-            
-            async with session.get(url, headers=headers, timeout=10) as response:
-                if response.status == 200:
-                    text = await response.text()
-                    # 解析HTML内容
-                    return self._parse_weibo_html_data(text)
+            return await fetch()
         except Exception as e:
-            print(f"微博备用方案失败: {e}")
-            pass
+            logger.warning("微博采集方式%s出错: %s", fetch.__name__, e)
+            return []
+    
+    async def _fetch_json(self) -> List[Dict[str, Any]]:
+        """通过微博热搜JSON接口采集"""
+        # 微博热搜API
+        url = "https://weibo.com/ajax/side/hotSearch"
+        
+        # 发送请求
+        session = await self.get_session()
+        async with session.get(url, headers=_HEADERS_JSON, timeout=5) as response:
+            body = await self._read_body(response)
+        if body is None:
+            return []
+        data = orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+        
+        # 解析热搜数据
+        hot_data = []
+        if 'data' in data and 'realtime' in data['data']:
+            realtime = data['data']['realtime']
+            for i, item in enumerate(realtime):
+                try:
+                    word = item.get('word', '')
+                    title = word.strip()
+                    if title:  # 只有标题不为空才添加
+                        hot_data.append({
+                            'title': title,
+                            'url': _WEIBO_Q_PREFIX + quote(word, safe='') + '%23',
+                            'hot': str(item.get('num', 0)),  # 热度值
+                            'rank': str(i + 1)
+                        })
+                except Exception:
+                    continue
+        
+        return self._format_results(hot_data)
+    
+    async def _fetch_html_backup(self) -> List[Dict[str, Any]]:
+        """备用方案：请求热搜页面HTML并解析"""
+        # 尝试访问微博热搜页面
+        url = "https://s.weibo.com/top/summary"
+        
+        session = await self.get_session()
+        async with session.get(url, headers=_HEADERS_HTML, timeout=10) as response:
+            body = await self._read_body(response)
+        if body is None:
+            return []
+        
+        # 解析HTML内容（直接交给解析器，不先解码为字符串），在线程中执行，不阻塞事件循环
+        hot_data = await self._parse_in_thread(self._parse_weibo_html_data, body)
+        return self._format_results(hot_data)
+    
+    async def _read_body(self, response) -> Optional[bytes]:
+        """
+        读取响应体，状态码不是200时返回None
+        
+        错误响应也读完：未读完响应体的连接会被关闭而不是放回连接池；错误内容截取一段记入日志
+        """
+        body = await response.read()
+        if response.status != 200:
+            logger.warning("微博请求%s返回状态码%s: %s", response.url, response.status,
+                           body[:200].decode('utf-8', 'replace'))
+            return None
+        return body
+    
+    async def _fetch_via_browser(self) -> List[Dict[str, Any]]:
+        """最后手段：使用浏览器渲染热搜页面（接口和页面需要登录态时）"""
+        if not PLAYWRIGHT_AVAILABLE:
+            return []
+        
+        # 整个浏览器采集过程限时，超时或出错计入浏览器池的连续失败次数
+        timeout = self.config.get("browser_timeout", DEFAULT_BROWSER_TIMEOUT)
+        try:
+            hot_data = await asyncio.wait_for(self._render_hot_list(), timeout=timeout)
+        except Exception:
+            await browser_pool.report_failure()
+            raise
+        browser_pool.report_success()
+        
+        return self._format_results(hot_data)
+    
+    async def _render_hot_list(self) -> List[Dict[str, Any]]:
+        """在共享浏览器中打开热搜页面并提取热搜条目"""
+        # 从共享浏览器上下文获取页面，用完即关闭
+        async with self.acquire_page() as page:
+            # 不加载图片、字体和视频，只需要页面结构
+            await page.route(_BLOCKED_RESOURCES, lambda route: route.abort())
             
-        # 如果备用方案也失败，返回模拟数据
-        return self._get_mock_data()
+            # 访问微博热搜页面，DOM就绪即可，页面上的长轮询连接会让networkidle一直等到超时
+            await page.goto("https://s.weibo.com/top/summary", wait_until='domcontentloaded', timeout=15000)
+            
+            # 等待热搜条目出现
+            await page.wait_for_selector('tbody tr a', timeout=5000)
+            
+            # 提取热搜数据
+            return await page.evaluate(_HOT_LIST_JS)
     
-    def _parse_weibo_html_data(self, html_text: str) -> List[Dict[str, Any]]:
-        """解析微博HTML页面数据"""
-        from bs4 import BeautifulSoup
-        import re
+    def _format_results(self, hot_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """将热搜条目格式化为包含fields键的标准格式"""
+        # 先在原始条目上验证并限制返回数量，只为保留的条目构建结果
+        valid = [(i, item) for i, item in enumerate(hot_data) if self._is_valid_raw(item)][:50]
         
+        # 整批共用同一采集时间
+        now = self._get_current_time()
+        site_code = self.site_code
+        ids = generate_content_ids(len(valid))  # 使用统一的ID生成函数，整批生成
+        return [
+            {"fields": {
+                'id': content_id,
+                'title': item['title'].strip(),
+                'url': item['url'],
+                'hot': item.get('hot', '0'),
+                'rank': str(item.get('rank', i + 1)),
+                'published_at': now,
+                'collected_at': now,
+                'site_code': site_code
+            }}
+            for content_id, (i, item) in zip(ids, valid)
+        ]
+    
+    @staticmethod
+    def _is_valid_raw(item: Dict[str, Any]) -> bool:
+        """验证原始热搜条目：标题（去除空白后）和链接不能为空，与_validate_result的必要字段一致"""
+        title = item.get('title')
+        return bool(title and title.strip() and item.get('url'))
+    
+    def _parse_weibo_html_data(self, html_body: bytes) -> List[Dict[str, Any]]:
+        """解析微博HTML页面数据"""
         hot_data = []
         
         try:
-            soup = BeautifulSoup(html_text, 'html.parser')
+            tree = LexborHTMLParser(html_body)
             
             # 查找热搜表格
-            hot_table = soup.find('table', class_='list-table')
+            hot_table = tree.css_first('table.list-table')
             if hot_table:
-                # 查找所有热搜条目
-                rows = hot_table.find_all('tr')[1:]  # 跳过表头
+                # 查找所有热搜条目，跳过表头，限制最多50条
+                rows = hot_table.css('tr')[1:51]
                 
-                for i, row in enumerate(rows[:50]):  # 限制最多50条
+                for i, row in enumerate(rows):
                     try:
                         # 提取标题
-                        title_link = row.find('a')
+                        title_link = row.css_first('a')
                         if title_link:
-                            title = title_link.get_text().strip()
-                            url = title_link.get('href', '')
+                            title = title_link.text(strip=True)
+                            url = title_link.attributes.get('href') or ''
                             
                             # 处理相对链接
                             if url and not url.startswith('http'):
                                 url = 'https://s.weibo.com' + url
                             
                             # 提取热度
-                            hot_span = row.find('span')
-                            hot_score = hot_span.get_text().strip() if hot_span else '0'
+                            hot_span = row.css_first('span')
+                            hot_score = hot_span.text(strip=True) if hot_span else '0'
                             
                             # 清理热度值，只保留数字
-                            hot_score = re.sub(r'[^\d]', '', hot_score)
+                            hot_score = _RE_NON_DIGITS.sub('', hot_score)
                             if not hot_score:
                                 hot_score = str(len(title) * 1000)  # 基于标题长度计算热度
                             
@@ -261,11 +327,11 @@ class WeiboSite(BaseSite):
                         continue
             else:
                 # 如果找不到表格，尝试其他方式
-                links = soup.find_all('a', href=re.compile(r'/weibo\?q='))
+                links = tree.css('a[href*="/weibo?q="]')
                 for i, link in enumerate(links[:50]):
                     try:
-                        title = link.get_text().strip()
-                        url = link.get('href', '')
+                        title = link.text(strip=True)
+                        url = link.attributes.get('href') or ''
                         
                         # 处理相对链接
                         if url and not url.startswith('http'):
@@ -282,18 +348,14 @@ class WeiboSite(BaseSite):
                         continue
                         
         except Exception as e:
-            print(f"解析微博HTML数据出错: {e}")
-            pass
+            logger.warning("解析微博HTML数据出错: %s", e)
             
-        # 去重
-        seen_titles = set()
-        unique_data = []
+        # 按标题去重，保留首次出现的条目（字典保持插入顺序）
+        unique = {}
         for item in hot_data:
-            if item['title'] not in seen_titles:
-                seen_titles.add(item['title'])
-                unique_data.append({"fields": item})
+            unique.setdefault(item['title'], item)
                 
-        return unique_data[:50]
+        return list(unique.values())
     
     def _get_mock_data(self) -> List[Dict[str, Any]]:
         """获取模拟数据（用于演示或备用）"""
@@ -4,32 +4,204 @@
 """
 
 import json
+import logging
+import os
 import re
-import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
-from urllib.parse import urlparse, urlunparse
 import yaml
 from .base import BaseSite
 # 导入统一的ID生成函数
 from ....utils.id_generator import generate_content_id
+from app.utils.logger import logger
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 多关键词匹配优先使用RE2（DFA，线性时间），未安装时回退到标准库re
+try:
+    import re2 as _re_multi
+    RE2_AVAILABLE = True
+except ImportError:
+    _re_multi = re
+    RE2_AVAILABLE = False
+
+
+# 优先使用libyaml实现的安全加载器
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# JSON清理用的正则，模块加载时编译一次
+_RE_LINE_COMMENT = re.compile(r'//.*?$', re.MULTILINE)
+_RE_BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_RE_DOUBLE_BACKSLASH = re.compile(r'\\\\')
+_RE_INVALID_ESCAPE = re.compile(r'\\([^"\\/bfnrtu])')
+_RE_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_RE_TRAILING_GARBAGE = re.compile(r'}\s*[^\s}]*$')
+_RE_UNDEFINED = re.compile(r'\bundefined\b')
+
+# 页面中以\u00XX形式转义的字符，按十六进制码位映射到替换结果
+_ESCAPED_ENTITIES = {'2F': '/', '3C': '<', '3E': '>', '26': '&'}
+_RE_ESCAPED_ENTITY = re.compile(r'\\u00(2F|3C|3E|26)')
+
+# 扫描__INITIAL_STATE__对象时关心的字节：括号、字符串引号和转义符
+_RE_JSON_STRUCT = re.compile(rb'[{}"\\]')
+
+
+def _slice_initial_state(html_body: bytes):
+    """
+    截取window.__INITIAL_STATE__赋值的对象字面量（字节）
+    
+    从第一个{开始单次扫描并计数括号，跳过字符串内的内容和转义字符，找不到完整对象时返回None
+    """
+    start = html_body.find(b'window.__INITIAL_STATE__')
+    if start < 0:
+        return None
+    start = html_body.find(b'{', start)
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_str = False
+    skip_to = 0
+    for match in _RE_JSON_STRUCT.finditer(html_body, start):
+        pos = match.start()
+        if pos < skip_to:
+            continue
+        ch = match.group()
+        if in_str:
+            if ch == b'\\':
+                skip_to = pos + 2
+            elif ch == b'"':
+                in_str = False
+        elif ch == b'"':
+            in_str = True
+        elif ch == b'{':
+            depth += 1
+        elif ch == b'}':
+            depth -= 1
+            if depth == 0:
+                return html_body[start:pos + 1]
+    return None
+
+
+# HTML解析用的选择器（Lexbor在C层完成类名子串匹配）
+_NOTE_LINK_SELECTOR = 'a[href*="/discovery/item/"]'
+_NOTE_CARD_SELECTOR = '[class*="note-item"], [class*="noteCard"], [class*="feed-item"]'
+# 笔记链接、笔记卡片和带data-note-id的元素合并为一次查询
+_NOTE_ITEM_SELECTOR = f'{_NOTE_LINK_SELECTOR}, {_NOTE_CARD_SELECTOR}, [data-note-id]'
+_TITLE_SELECTOR = '[class*="title" i], [class*="note-desc" i]'
+# Lexbor选择器不接受非ASCII字符，"收藏"和"赞"使用CSS转义写法
+_HOT_SELECTOR = r'[class*="like" i], [class*="hot" i], [class*="count" i], [class*="\6536\85cf"], [class*="\8d5e"]'
+_AUTHOR_SELECTOR = '[class*="user" i], [class*="author" i], [class*="name" i]'
+
+# HTML解析用的正则
+_RE_CARD_CLASS = re.compile(r'note|card|item', re.I)
+_RE_WINDOW_OPEN = re.compile(r"window\.open\('(/discovery/item/[^']*)'")
+_RE_NOTE_ID = re.compile(r'^[a-f0-9]{24}$')
+_RE_HOT_NUMBER = re.compile(r'\d+(?:\.\d+)?[万千kK]?')
+
+# 标题中出现即视为无意义内容（导航、登录、备案信息等）的关键词
+_INVALID_TITLE_KEYWORDS = ('首页', '关注', '发现', '商城', '登录', '注册', '下载', 'APP', '消息', '我',
+                           'ICP', '沪公网安备', '营业执照', '沪ICP备', '网络文化经营许可证')
+_RE_INVALID_TITLE = _re_multi.compile('|'.join(map(_re_multi.escape, _INVALID_TITLE_KEYWORDS)))
+
+# 热度文本解析：数字加可选单位（万、千、k）和可选的+号
+_RE_HOT_VALUE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([万千kK]?)\+?\s*$')
+# 单位倍数表：下标0为无单位，其余按_HOT_UNIT_CHARS中的位置+1
+_HOT_UNIT_CHARS = '万千kK'
+_HOT_UNITS = (1, 10000, 1000, 1000, 1000)
+
+
+def _parse_hot(hot_text: str) -> int:
+    """将热度文本（如"5.1万"、"1千+"、"2.3k"、"530"）换算为整数，无法解析时返回0"""
+    match = _RE_HOT_VALUE.match(hot_text)
+    if not match:
+        return 0
+    number, unit = match.groups()
+    return int(float(number) * _HOT_UNITS[_HOT_UNIT_CHARS.find(unit) + 1 if unit else 0])
+
+
+# 模拟数据标题中的关键词
+_RE_MOCK_TITLE = re.compile('示例|Example|模拟')
+
+# selectolax只在JSON解析失败的回退路径中使用，首次用到时再导入
+_LEXBOR_PARSER = None
+
+
+def _get_lexbor_parser():
+    """获取LexborHTMLParser类，首次调用时导入并缓存"""
+    global _LEXBOR_PARSER
+    if _LEXBOR_PARSER is None:
+        from selectolax.lexbor import LexborHTMLParser
+        _LEXBOR_PARSER = LexborHTMLParser
+    return _LEXBOR_PARSER
+
+
+def _find_parent(node, predicate):
+    """向上查找第一个满足条件的祖先元素，找不到时返回None"""
+    parent = node.parent
+    # 到文档节点为止（Lexbor文档节点不能读取attributes）
+    while parent is not None and parent.tag != '#document':
+        if predicate(parent):
+            return parent
+        parent = parent.parent
+    return None
+
+
+def _select_first(node, selector):
+    """在节点的后代中查找第一个匹配的元素（Lexbor的css结果包含节点自身，这里排除）"""
+    mem_id = node.mem_id
+    for match in node.css(selector):
+        if match.mem_id != mem_id:
+            return match
+    return None
+
+
+def _select_title(node):
+    """在节点的后代中查找标题元素，一次选择器查询，优先返回div"""
+    mem_id = node.mem_id
+    first = None
+    for match in node.css(_TITLE_SELECTOR):
+        if match.mem_id == mem_id:
+            continue
+        if match.tag == 'div':
+            return match
+        if first is None:
+            first = match
+    return first
+
+
+def _find_card_parent(node):
+    """查找类名包含note/card/item的祖先节点（笔记卡片）"""
+    return _find_parent(node, lambda parent: bool(_RE_CARD_CLASS.search(parent.attributes.get('class') or '')))
 
 
 class XiaohongshuSite(BaseSite):
     """小红书热门话题采集"""
     
+    # 已解析的配置文件：(路径, 修改时间) -> 配置，站点实例每次采集时新建，因此放在类上共享
+    _config_cache: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    
     def __init__(self, site_code: str, config: Dict[str, Any]):
         super().__init__(site_code, config)
         self.load_xiaohongshu_config()
     
     def load_xiaohongshu_config(self):
-        """加载小红书专用配置"""
+        """加载小红书专用配置，文件未修改时复用已解析的结果"""
         try:
             config_path = "/root/apiserver/config/xiaohongshu.yaml"
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self.xhs_config = yaml.safe_load(f)
+            key = (config_path, os.stat(config_path).st_mtime_ns)
+            cached = XiaohongshuSite._config_cache.get(key)
+            if cached is None:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    cached = yaml.load(f, Loader=_YAML_LOADER) or {}
+                XiaohongshuSite._config_cache = {key: cached}
+            self.xhs_config = cached
         except Exception as e:
-            print(f"加载小红书配置文件失败: {e}")
+            logger.warning("加载小红书配置文件失败: %s", e)
             self.xhs_config = {}
     
     async def collect(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -42,7 +214,6 @@ class XiaohongshuSite(BaseSite):
             if web_results and len(web_results) > 0:
                 # 检查是否为模拟数据
                 if not self._is_mock_data(web_results):
-                    #print("返回真实采集数据")
                     # 格式化为统一的数据结构
                     formatted_results = []
                     for item in web_results:
@@ -51,41 +222,28 @@ class XiaohongshuSite(BaseSite):
                         })
                     return formatted_results
                 else:
-                    print("网页采集结果为模拟数据")
+                    logger.info("小红书网页采集结果为模拟数据")
             else:
-                print("网页采集结果为空")
+                logger.info("小红书网页采集结果为空")
             
             # 如果网页解析方式失败，返回模拟数据
-            print("返回模拟数据")
-            mock_data = self._get_mock_data()
-            formatted_results = []
-            for item in mock_data:
-                formatted_results.append({
-                    "fields": item
-                })
-            return formatted_results
+            logger.info("小红书返回模拟数据")
+            return [{"fields": item} for item in self._get_mock_data()]
                     
         except Exception as e:
-            print(f"小红书采集脚本出错: {e}")
+            logger.exception("小红书采集脚本出错: %s", e)
             # 发生错误时返回模拟数据
-            mock_data = self._get_mock_data()
-            formatted_results = []
-            for item in mock_data:
-                formatted_results.append({
-                    "fields": item
-                })
-            return formatted_results
+            return [{"fields": item} for item in self._get_mock_data()]
     
     async def _collect_via_web(self) -> List[Dict[str, Any]]:
         """通过网页方式采集小红书热门话题"""
         results = []
-        session = None
         
         try:
             # 获取配置中的cookie
             cookie = self.xhs_config.get('cookie', {}).get('auth', '')
             if not cookie:
-                print("未配置小红书Cookie")
+                logger.warning("未配置小红书Cookie")
                 return []
             
             # 尝试访问小红书探索页面
@@ -101,118 +259,85 @@ class XiaohongshuSite(BaseSite):
                 'Cookie': cookie
             }
             
-            # 发送请求
+            # 内容未变化时服务端返回304，复用上次的解析结果
+            self._add_conditional_headers(url, headers)
+            
+            # 发送请求（进程内共享的HTTP会话，连接在采集之间复用，不在这里关闭）
             session = await self.get_session()
             async with session.get(url, headers=headers, timeout=15) as response:
-                if response.status == 200:
-                    text = await response.text()
-                    # print(f"成功获取页面内容，长度: {len(text)}")
+                if response.status == 304:
+                    # 内容未变化，直接返回上次解析的结果，不下载也不解析页面
+                    results = self._get_not_modified_results(url) or []
+                elif response.status == 200:
+                    # 直接读取字节，不解码整个页面
+                    body = await response.read()
                     # 解析HTML内容，提取话题数据
-                    results = self._parse_xiaohongshu_html_data(text)
+                    results = self._parse_xiaohongshu_html_data(body)
+                    self._store_conditional(url, response, results)
                         
         except Exception as e:
-            # print(f"小红书网页采集方式出错: {e}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            # 确保session被正确关闭
-            if session:
-                await session.close()
+            logger.exception("小红书网页采集方式出错: %s", e)
                 
         return results
     
     def _clean_json_string(self, json_str):
         """清理并修复JSON字符串"""
         # 移除注释
-        json_str = re.sub(r'//.*?$', '', json_str, flags=re.MULTILINE)
-        json_str = re.sub(r'/\*.*?\*/', '', json_str, flags=re.DOTALL)
+        json_str = _RE_LINE_COMMENT.sub('', json_str)
+        json_str = _RE_BLOCK_COMMENT.sub('', json_str)
         
-        # 替换HTML实体
-        json_str = json_str.replace('\\u002F', '/').replace('\\u003C', '<').replace('\\u003E', '>').replace('\\u0026', '&')
+        # 替换HTML实体（一次扫描完成全部替换）
+        json_str = _RE_ESCAPED_ENTITY.sub(lambda m: _ESCAPED_ENTITIES[m.group(1)], json_str)
         
         # 修复转义字符
-        json_str = re.sub(r'\\\\', r'\\', json_str)
-        json_str = re.sub(r'\\([^"\\/bfnrtu])', r'\1', json_str)
+        json_str = _RE_DOUBLE_BACKSLASH.sub(r'\\', json_str)
+        json_str = _RE_INVALID_ESCAPE.sub(r'\1', json_str)
         
         # 修复多余的逗号
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+        json_str = _RE_TRAILING_COMMA.sub(r'\1', json_str)
         
         # 移除可能的BOM
         if json_str.startswith('\ufeff'):
             json_str = json_str[1:]
             
         # 移除末尾可能的无效字符
-        json_str = re.sub(r'}\s*[^\s}]*$', '}', json_str)
+        json_str = _RE_TRAILING_GARBAGE.sub('}', json_str)
             
         return json_str.strip()
     
-    def _extract_json_with_multiple_methods(self, html_text):
-        """使用多种方法尝试提取和解析JSON数据"""
-        # 方法1: 标准的__INITIAL_STATE__提取
-        json_pattern1 = r'window\.__INITIAL_STATE__\s*=\s*({.*?})\s*<'
-        match1 = re.search(json_pattern1, html_text, re.DOTALL)
-        
-        if match1:
-            try:
-                json_str = self._clean_json_string(match1.group(1))
-                # 替换undefined为null
-                json_str = re.sub(r'\bundefined\b', 'null', json_str)
-                return json.loads(json_str)
-            except Exception as e1:
-                pass
+    def _extract_json_with_multiple_methods(self, html_body: bytes):
+        """提取并解析页面中的__INITIAL_STATE__数据，失败时返回None"""
+        json_bytes = _slice_initial_state(html_body)
+        if json_bytes is None:
+            return None
         
-        # 方法2: 更宽松的匹配
-        json_pattern2 = r'window\.__INITIAL_STATE__\s*=\s*({.*?})(?:\s*;|\s*<)'
-        match2 = re.search(json_pattern2, html_text, re.DOTALL)
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
         
-        if match2:
-            try:
-                json_str = self._clean_json_string(match2.group(1))
-                # 替换undefined为null
-                json_str = re.sub(r'\bundefined\b', 'null', json_str)
-                return json.loads(json_str)
-            except Exception as e2:
-                pass
-                
-        # 方法3: 匹配到脚本结束
-        json_pattern3 = r'window\.__INITIAL_STATE__\s*=\s*({.*?});?\s*</script>'
-        match3 = re.search(json_pattern3, html_text, re.DOTALL)
-        
-        if match3:
-            try:
-                json_str = self._clean_json_string(match3.group(1))
-                # 替换undefined为null
-                json_str = re.sub(r'\bundefined\b', 'null', json_str)
-                return json.loads(json_str)
-            except Exception as e3:
-                pass
-                
-        # 方法4: 匹配整个对象
-        json_pattern4 = r'window\.__INITIAL_STATE__\s*=\s*(\{(?:[^{}]|(?1))*\})'
-        match4 = re.search(json_pattern4, html_text, re.DOTALL)
+        # 截取的内容通常已是合法JSON，直接解析字节，失败时再解码为字符串清理修复
+        try:
+            return loads(json_bytes)
+        except ValueError:
+            pass
         
-        if match4:
-            try:
-                json_str = self._clean_json_string(match4.group(1))
-                # 替换undefined为null
-                json_str = re.sub(r'\bundefined\b', 'null', json_str)
-                return json.loads(json_str)
-            except Exception as e4:
-                pass
-                
-        return None
+        try:
+            json_str = self._clean_json_string(json_bytes.decode('utf-8', 'replace'))
+            # 替换undefined为null
+            json_str = _RE_UNDEFINED.sub('null', json_str)
+            return loads(json_str)
+        except Exception:
+            return None
     
-    def _parse_xiaohongshu_html_data(self, html_text: str) -> List[Dict[str, Any]]:
+    def _parse_xiaohongshu_html_data(self, html_body: bytes) -> List[Dict[str, Any]]:
         """解析小红书页面数据，专门提取热门话题"""
-        hot_data = []
+        now_str = self._get_current_time()  # 整批共用同一采集时间
         results = []
+        seen_titles = set()
         
         try:
             # 尝试解析JSON数据
-            json_data = self._extract_json_with_multiple_methods(html_text)
+            json_data = self._extract_json_with_multiple_methods(html_body)
             
             if json_data:
-                # print("JSON解析成功")
                 # 提取推荐笔记数据
                 feeds = []
                 
@@ -235,32 +360,21 @@ class XiaohongshuSite(BaseSite):
                             feeds = value['recommendFeeds']
                             break
                 
-                # print(f"找到 {len(feeds)} 条笔记数据")
-                
                 # 处理推荐笔记数据
                 for i, feed in enumerate(feeds[:30]):  # 限制最多30条
                     try:
                         # 获取笔记卡片信息
                         note_card = feed.get('noteCard') or feed.get('note_card') or feed
                         
-                        # 获取标题
-                        title = note_card.get('displayTitle', '').strip()
-                        if not title:
-                            title = note_card.get('title', '').strip()
-                        
-                        # 获取作者信息
-                        user_info = note_card.get('user', {})
-                        user_name = user_info.get('nickname', '').strip()
+                        # 先按点赞数过滤，低热度笔记不做后续的字符串处理
+                        interact_info = note_card.get('interactInfo') or note_card.get('interact_info') or {}
+                        liked_count = str(interact_info.get('likedCount') or interact_info.get('liked_count', '0'))
                         
-                        # 构造完整标题
-                        if user_name and title:
-                            full_title = f"{title} by {user_name}"
-                        elif title:
-                            full_title = title
-                        else:
+                        # 处理热度值，如"5.1万"、"5.1千"；只保留热度大于100的帖子（为了测试能获取到一些数据）
+                        if _parse_hot(liked_count) < 100:
                             continue
                         
-                        # 获取笔记ID和链接
+                        # 获取笔记ID，没有note_id时跳过该条目
                         note_id = (note_card.get('noteId') or 
                                  note_card.get('note_id') or 
                                  note_card.get('id') or
@@ -268,220 +382,122 @@ class XiaohongshuSite(BaseSite):
                                  feed.get('note_id') or
                                  feed.get('id') or
                                  '')
-                        
-                        xsec_token = (feed.get('xsecToken') or
-                                    feed.get('xsec_token') or
-                                    note_card.get('xsecToken') or
-                                    note_card.get('xsec_token') or
-                                    '')
-                        
-                        if note_id and xsec_token:
-                            url = f'https://www.xiaohongshu.com/discovery/item/{note_id}?xsec_token={xsec_token}&xsec_source='
-                        elif note_id:
-                            url = f'https://www.xiaohongshu.com/discovery/item/{note_id}'
-                        else:
-                            # 如果没有note_id，则跳过该条目
+                        if not note_id:
                             continue
                         
-                        # 获取点赞数
-                        interact_info = note_card.get('interactInfo') or note_card.get('interact_info') or {}
-                        liked_count = str(interact_info.get('likedCount') or interact_info.get('liked_count', '0'))
-                        
-                        # 处理热度值
-                        hot_text = liked_count
-                        hot_value = 0
+                        # 获取标题
+                        title = note_card.get('displayTitle', '').strip()
+                        if not title:
+                            title = note_card.get('title', '').strip()
+                        if not title:
+                            continue
                         
-                        if isinstance(hot_text, str):
-                            # 处理包含"万"的热度值，如"5.1万"或"1.7万"或"2.4万"
-                            if '万' in hot_text:
-                                try:
-                                    # 先移除"万"字，然后转换为浮点数，再乘以10000
-                                    hot_value = int(float(hot_text.replace('万', '')) * 10000)
-                                except ValueError:
-                                    hot_value = 0
-                            elif '千' in hot_text:
-                                # 处理包含"千"的热度值，如"5.1千"
-                                try:
-                                    # 先移除"千"字，然后转换为浮点数，再乘以1000
-                                    hot_value = int(float(hot_text.replace('千', '')) * 1000)
-                                except ValueError:
-                                    hot_value = 0
-                            else:
-                                # 尝试直接转换为整数
-                                try:
-                                    hot_value = int(hot_text)
-                                except ValueError:
-                                    hot_value = 0
-                        elif isinstance(hot_text, (int, float)):
-                            hot_value = int(hot_text)
+                        # 获取作者信息
+                        user_info = note_card.get('user', {})
+                        user_name = user_info.get('nickname', '').strip()
                         
-                        # 只保留热度大于100的帖子（为了测试能获取到一些数据）
-                        if hot_value < 100:
-                            continue
+                        # 构造完整标题
+                        full_title = f"{title} by {user_name}" if user_name else title
                         
                         # 过滤无效标题
-                        if not full_title or len(full_title) < 2 or len(full_title) > 100:
+                        if len(full_title) < 2 or len(full_title) > 100:
                             continue
                         
                         # 过滤常见无意义内容
-                        invalid_keywords = ['首页', '关注', '发现', '商城', '登录', '注册', '下载', 'APP', '消息', '我',
-                                          'ICP', '沪公网安备', '营业执照', '沪ICP备', '网络文化经营许可证']
-                        if any(keyword in full_title for keyword in invalid_keywords):
+                        if _RE_INVALID_TITLE.search(full_title):
                             continue
                         
-                        # 只采集高热度帖子 - 热度大于100或包含"万"
-                        hot_value = 0
-                        hot_text = liked_count
-                        if '万' in hot_text:
-                            # 处理"万"单位
-                            try:
-                                hot_value = float(hot_text.replace('万+', '').replace('万', '')) * 10000
-                            except ValueError:
-                                hot_value = 10000  # 如果无法解析，默认为10000
-                        elif hot_text.isdigit():
-                            hot_value = int(hot_text)
-                        else:
-                            # 处理"1千+"这类情况
-                            if '千+' in hot_text:
-                                hot_value = 1000
-                            elif '万+' in hot_text:
-                                hot_value = 10000
-                            # 处理"1千"到"9千"的情况
-                            elif '千' in hot_text:
-                                try:
-                                    hot_value = int(hot_text.replace('千', '')) * 1000
-                                except ValueError:
-                                    hot_value = 1000
-                            else:
-                                # 尝试直接转换为整数
-                                try:
-                                    hot_value = int(hot_text)
-                                except ValueError:
-                                    hot_value = 0
+                        # 构造链接
+                        xsec_token = (feed.get('xsecToken') or
+                                    feed.get('xsec_token') or
+                                    note_card.get('xsecToken') or
+                                    note_card.get('xsec_token') or
+                                    '')
                         
-                        # 只保留热度大于100的帖子（为了测试能获取到一些数据）
-                        if hot_value < 100:
-                            continue
+                        if xsec_token:
+                            url = f'https://www.xiaohongshu.com/discovery/item/{note_id}?xsec_token={xsec_token}&xsec_source='
+                        else:
+                            url = f'https://www.xiaohongshu.com/discovery/item/{note_id}'
                         
-                        # 标题去重检查
-                        if full_title in [item['title'] for item in hot_data]:
+                        # 标题去重检查，通过后直接生成最终结果
+                        if len(full_title) <= 2 or full_title in seen_titles:
                             continue
+                        seen_titles.add(full_title)
                         
-                        hot_data.append({
+                        results.append({
+                            'id': generate_content_id(),  # 使用统一的ID生成函数
                             'title': full_title,
                             'url': url,
                             'hot': liked_count,
-                            'rank': str(i + 1)
+                            'rank': str(i + 1),
+                            'published_at': now_str,
+                            'collected_at': now_str,
+                            'site_code': self.site_code
                         })
+                        if len(results) >= 30:  # 限制最多30条
+                            break
                         
                     except Exception as inner_e:
-                        continue
+                        logger.debug("处理小红书单条笔记数据出错: %s", inner_e)
             else:
-                print("JSON解析失败，尝试使用BeautifulSoup解析HTML")
-                # 如果JSON解析失败，尝试使用BeautifulSoup解析HTML
-                results = self._parse_with_beautifulsoup(html_text)
+                logger.info("小红书JSON解析失败，尝试直接解析HTML")
+                # 如果JSON解析失败，尝试直接解析HTML元素
+                results = self._parse_with_selectolax(html_body)
                 return results
                         
         except Exception as e:
-            print(f"解析小红书JSON数据出错: {e}")
-            # 如果JSON解析失败，尝试使用BeautifulSoup解析HTML
-            results = self._parse_with_beautifulsoup(html_text)
+            logger.warning("解析小红书JSON数据出错: %s", e)
+            # 如果JSON解析失败，尝试直接解析HTML元素
+            results = self._parse_with_selectolax(html_body)
             return results
             
-        # 去重
-        seen_titles = set()
-        unique_data = []
-        for item in hot_data:
-            if item['title'] not in seen_titles and len(item['title']) > 2:
-                seen_titles.add(item['title'])
-                unique_data.append(item)
-                
-        hot_data = unique_data[:30]  # 限制最多30条
-        
-        # 格式化数据
-        for i, item in enumerate(hot_data):
-            result = {
-                'id': generate_content_id(),  # 使用统一的ID生成函数
-                'title': item.get('title', '').strip(),
-                'url': item.get('url', ''),
-                'hot': item.get('hot', '0'),
-                'rank': str(item.get('rank', i + 1)),
-                'published_at': self._get_current_time(),
-                'collected_at': self._get_current_time(),
-                'site_code': self.site_code
-            }
-            
-            # 不再使用_validate_result，直接添加到结果中
-            results.append(result)
-                
-        #print(f"最终返回 {len(results)} 条结果")
         return results
     
-    def _parse_with_beautifulsoup(self, html_text: str) -> List[Dict[str, Any]]:
-        """使用BeautifulSoup解析HTML内容"""
-        hot_data = []
+    def _parse_with_selectolax(self, html_body: bytes) -> List[Dict[str, Any]]:
+        """使用selectolax（Lexbor）解析HTML内容"""
+        now_str = self._get_current_time()  # 整批共用同一采集时间
         results = []
+        seen_titles = set()
         
         try:
-            from bs4 import BeautifulSoup
+            # 使用Lexbor解析HTML
+            tree = _get_lexbor_parser()(html_body)
             
-            # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(html_text, 'html.parser')
+            # 一次遍历查找所有可能的笔记元素（按文档顺序），
+            # 同时命中多个选择器的节点按mem_id去重
+            note_items = list({node.mem_id: node for node in tree.css(_NOTE_ITEM_SELECTOR)}.values())
             
-            # 查找所有可能的笔记元素
-            note_items = []
-            
-            # 方法1: 查找包含/discovery/item/链接的a标签
-            note_items.extend(soup.find_all('a', href=re.compile(r'/discovery/item/')))
-            
-            # 方法2: 查找包含note-item类的元素
-            note_items.extend(soup.find_all(class_=re.compile(r'note-item|noteCard|feed-item')))
-            
-            # 方法3: 查找包含data-note-id属性的元素
-            note_items.extend(soup.find_all(attrs={"data-note-id": True}))
-            
-            # 方法4: 查找所有a标签并检查href属性
-            all_links = soup.find_all('a', href=True)
-            for link in all_links:
-                href = link.get('href', '')
-                if '/discovery/item/' in href and link not in note_items:
-                    note_items.append(link)
-            
-            print(f"BeautifulSoup找到 {len(note_items)} 个可能的笔记元素")
+            logger.debug("小红书HTML解析找到 %d 个可能的笔记元素", len(note_items))
             
             # 提取笔记数据
             for i, item in enumerate(note_items[:30]):  # 限制最多30条
                 try:
+                    attrs = item.attributes
+                    # 笔记卡片祖先节点只查找一次，标题、热度、作者的回退查找共用
+                    card = _find_card_parent(item)
+                    
                     # 获取标题
                     title = ''
                     
-                    # 尝试多种方式获取标题
-                    title_elem = item.find('div', class_=re.compile(r'title|note-title|note-desc', re.I))
-                    if not title_elem:
-                        title_elem = item.find(class_=re.compile(r'title|note-title|note-desc', re.I))
-                    if not title_elem:
-                        title_elem = item.find('span', class_=re.compile(r'title|note-title|note-desc', re.I))
-                    if not title_elem:
-                        title_elem = item.find('p', class_=re.compile(r'title|note-title|note-desc', re.I))
+                    # 获取标题元素，优先div
+                    title_elem = _select_title(item)
                     
                     # 如果在item中找不到标题，尝试在其父元素中查找
-                    if not title_elem:
-                        parent = item.find_parent(class_=re.compile(r'note|card|item', re.I))
-                        if parent:
-                            title_elem = parent.find(class_=re.compile(r'title|note-title|note-desc', re.I))
+                    if not title_elem and card:
+                        title_elem = _select_first(card, _TITLE_SELECTOR)
                     
                     if title_elem:
-                        title = title_elem.get_text(strip=True)
+                        title = title_elem.text(strip=True)
                     else:
                         # 尝试从title属性获取
-                        title = item.get('title', '').strip()
+                        title = (attrs.get('title') or '').strip()
                         if not title:
                             # 尝试从data-title属性获取
-                            title = item.get('data-title', '').strip()
+                            title = (attrs.get('data-title') or '').strip()
                     
                     # 如果还获取不到标题，尝试获取元素内的文本
                     if not title:
-                        text_content = item.get_text(strip=True)
+                        text_content = item.text(strip=True)
                         if text_content and len(text_content) > 2 and len(text_content) < 100:
                             title = text_content
                     
@@ -490,52 +506,53 @@ class XiaohongshuSite(BaseSite):
                         continue
                     
                     # 获取链接
-                    href = item.get('href', '')
+                    href = attrs.get('href') or ''
                     if not href:
                         # 尝试从data-href属性获取
-                        href = item.get('data-href', '')
+                        href = attrs.get('data-href') or ''
                     
                     # 如果href为空，尝试从父元素获取
                     if not href:
-                        parent_link = item.find_parent('a', href=re.compile(r'/discovery/item/'))
+                        parent_link = _find_parent(
+                            item, lambda node: node.tag == 'a' and '/discovery/item/' in (node.attributes.get('href') or '')
+                        )
                         if parent_link:
-                            href = parent_link.get('href', '')
+                            href = parent_link.attributes.get('href') or ''
                     
                     # 如果还是没有链接，尝试从data-note-id构造
                     if not href:
-                        note_id = item.get('data-note-id', '')
+                        note_id = attrs.get('data-note-id') or ''
                         if note_id:
                             href = f'/discovery/item/{note_id}'
                     
                     # 特殊处理：尝试从onclick属性中提取链接
                     if not href:
-                        onclick = item.get('onclick', '')
+                        onclick = attrs.get('onclick') or ''
                         # 匹配类似 "window.open('/discovery/item/xxx')" 的模式
-                        match = re.search(r"window\.open\('(/discovery/item/[^']*)'", onclick)
+                        match = _RE_WINDOW_OPEN.search(onclick)
                         if match:
                             href = match.group(1)
                     
                     # 特殊处理：尝试从data属性中提取笔记ID
                     if not href:
-                        for attr_name, attr_value in item.attrs.items():
-                            if attr_name.startswith('data-') and isinstance(attr_value, str) and re.match(r'^[a-f0-9]{24}$', attr_value):
+                        for attr_name, attr_value in attrs.items():
+                            if attr_name.startswith('data-') and isinstance(attr_value, str) and _RE_NOTE_ID.match(attr_value):
                                 href = f'/discovery/item/{attr_value}'
                                 break
                     
                     # 特殊处理：尝试从笔记卡片的ID属性构造链接
                     if not href:
-                        item_id = item.get('id', '')
-                        if item_id and re.match(r'^[a-f0-9]{24}$', item_id):
+                        item_id = attrs.get('id') or ''
+                        if item_id and _RE_NOTE_ID.match(item_id):
                             href = f'/discovery/item/{item_id}'
                     
                     # 如果仍然没有链接，尝试从父元素中查找
                     if not href:
-                        parent = item.find_parent()
-                        while parent and not href:
-                            if parent.name == 'a' and parent.get('href', ''):
-                                href = parent.get('href', '')
-                                break
-                            parent = parent.find_parent()
+                        parent_link = _find_parent(
+                            item, lambda node: node.tag == 'a' and bool(node.attributes.get('href'))
+                        )
+                        if parent_link:
+                            href = parent_link.attributes.get('href') or ''
                     
                     url = ''
                     if href:
@@ -553,71 +570,34 @@ class XiaohongshuSite(BaseSite):
                     
                     # 获取热度信息
                     hot = '0'
-                    hot_elem = item.find(class_=re.compile(r'like|hot|count|收藏|赞', re.I))
-                    if not hot_elem:
+                    hot_elem = _select_first(item, _HOT_SELECTOR)
+                    if not hot_elem and card:
                         # 在父元素中查找
-                        parent = item.find_parent(class_=re.compile(r'note|card|item', re.I))
-                        if parent:
-                            hot_elem = parent.find(class_=re.compile(r'like|hot|count|收藏|赞', re.I))
+                        hot_elem = _select_first(card, _HOT_SELECTOR)
                     
-                    if hot_elem:
-                        hot_text = hot_elem.get_text(strip=True)
-                        # 提取数字
-                        hot_numbers = re.findall(r'(\d+\.?\d*[万kK]?)', hot_text)
-                        if hot_numbers:
-                            hot = hot_numbers[0]
-                            # 处理万、k等单位
-                            if '万' in hot:
-                                try:
-                                    hot = str(int(float(hot.replace('万', '')) * 10000))
-                                except ValueError:
-                                    hot = '10000'
-                            elif 'k' in hot.lower():
-                                try:
-                                    hot = str(int(float(hot.lower().replace('k', '')) * 1000))
-                                except ValueError:
-                                    hot = '1000'
-                    
-                    # 只采集高热度帖子 - 热度大于1000或包含"万"
+                    # 提取热度文本中的第一个数字（可带万、千、k单位）并换算
                     hot_value = 0
-                    hot_text = hot
-                    if '万' in hot_text:
-                        # 处理"万"单位
-                        try:
-                            hot_value = int(float(hot_text.replace('万+', '').replace('万', '')) * 10000)
-                        except ValueError:
-                            hot_value = 10000  # 如果无法解析，默认为10000
-                    elif 'k' in hot_text.lower():
-                        # 处理"k"单位
-                        try:
-                            hot_value = int(float(hot_text.lower().replace('k+', '').replace('k', '')) * 1000)
-                        except ValueError:
-                            hot_value = 1000  # 如果无法解析，默认为1000
-                    elif hot_text.isdigit():
-                        hot_value = int(hot_text)
-                    else:
-                        # 尝试转换为浮点数
-                        try:
-                            hot_value = int(float(hot_text))
-                        except ValueError:
-                            hot_value = 0
+                    if hot_elem:
+                        hot_match = _RE_HOT_NUMBER.search(hot_elem.text(strip=True))
+                        if hot_match:
+                            hot_value = _parse_hot(hot_match.group())
+                            hot = str(hot_value)
                     
                     # 只保留热度大于1000的帖子
                     if hot_value < 1000:
-                        print(f"过滤低热度帖子: {title} (热度: {hot})")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("过滤低热度帖子: %s (热度: %s)", title, hot)
                         continue
                     
                     # 获取作者信息
-                    author_elem = item.find(class_=re.compile(r'user|author|nickname|name', re.I))
-                    if not author_elem:
+                    author_elem = _select_first(item, _AUTHOR_SELECTOR)
+                    if not author_elem and card:
                         # 在父元素中查找
-                        parent = item.find_parent(class_=re.compile(r'note|card|item', re.I))
-                        if parent:
-                            author_elem = parent.find(class_=re.compile(r'user|author|nickname|name', re.I))
+                        author_elem = _select_first(card, _AUTHOR_SELECTOR)
                     
                     author = ''
                     if author_elem:
-                        author = author_elem.get_text(strip=True)
+                        author = author_elem.text(strip=True)
                     
                     # 构造完整标题
                     if author and title:
@@ -632,61 +612,37 @@ class XiaohongshuSite(BaseSite):
                         continue
                     
                     # 过滤常见无意义内容
-                    invalid_keywords = ['首页', '关注', '发现', '商城', '登录', '注册', '下载', 'APP', '消息', '我',
-                                      'ICP', '沪公网安备', '营业执照', '沪ICP备', '网络文化经营许可证']
-                    if any(keyword in full_title for keyword in invalid_keywords):
+                    if _RE_INVALID_TITLE.search(full_title):
                         continue
                         
-                    # 标题去重检查
-                    if full_title in [item['title'] for item in hot_data]:
+                    # 标题去重检查，通过后直接生成最终结果
+                    if len(full_title) <= 2 or full_title in seen_titles:
                         continue
+                    seen_titles.add(full_title)
                     
-                    hot_data.append({
+                    results.append({
+                        'id': generate_content_id(),  # 使用统一的ID生成函数
                         'title': full_title,
                         'url': url,
                         'hot': hot,
-                        'rank': str(i + 1)
+                        'rank': str(i + 1),
+                        'published_at': now_str,
+                        'collected_at': now_str,
+                        'site_code': self.site_code
                     })
+                    if len(results) >= 30:  # 限制最多30条
+                        break
                     
                 except Exception as inner_e:
-                    print(f"处理单个item数据出错: {inner_e}")
+                    logger.debug("处理小红书单个item数据出错: %s", inner_e)
                     continue
             
-            print(f"BeautifulSoup提取到 {len(hot_data)} 条有效数据")
+            logger.debug("小红书HTML解析提取到 %d 条有效数据", len(results))
                         
         except Exception as e:
-            print(f"解析小红书HTML数据出错: {e}")
-            import traceback
-            traceback.print_exc()
-            pass
+            logger.exception("解析小红书HTML数据出错: %s", e)
             
-        # 去重
-        seen_titles = set()
-        unique_data = []
-        for item in hot_data:
-            if item['title'] not in seen_titles and len(item['title']) > 2:
-                seen_titles.add(item['title'])
-                unique_data.append(item)
-                
-        hot_data = unique_data[:30]  # 限制最多30条
-        
-        # 格式化数据
-        for i, item in enumerate(hot_data):
-            result = {
-                'id': generate_content_id(),  # 使用统一的ID生成函数
-                'title': item.get('title', '').strip(),
-                'url': item.get('url', ''),
-                'hot': item.get('hot', '0'),
-                'rank': str(item.get('rank', i + 1)),
-                'published_at': self._get_current_time(),
-                'collected_at': self._get_current_time(),
-                'site_code': self.site_code
-            }
-            
-            # 不再使用_validate_result，直接添加到结果中
-            results.append(result)
-                
-        print(f"BeautifulSoup最终返回 {len(results)} 条结果")
+        logger.debug("小红书HTML解析最终返回 %d 条结果", len(results))
         return results
     
     def _is_mock_data(self, data: List[Dict[str, Any]]) -> bool:
@@ -694,19 +650,14 @@ class XiaohongshuSite(BaseSite):
         if not data:
             return True
         
-        # 检查数据条数
-        if len(data) < 1:  # 改为1条即可，更宽松的判断
-            return True
-            
         first_item = data[0]
         title = first_item.get('title', '') if isinstance(first_item, dict) else ''
-        # 检查是否包含示例相关的关键词
-        is_mock = '示例' in title or 'Example' in title or '模拟' in title
-        #print(f"检查是否为模拟数据: {is_mock}, 标题: {title}")
-        return is_mock
+        # 检查是否包含示例相关的关键词（一次扫描）
+        return _RE_MOCK_TITLE.search(title) is not None
     
     def _get_mock_data(self) -> List[Dict[str, Any]]:
         """获取模拟数据（用于演示或备用）"""
+        now_str = self._get_current_time()
         return [
             {
                 'id': generate_content_id(),  # 使用统一的ID生成函数
@@ -715,7 +666,7 @@ class XiaohongshuSite(BaseSite):
                 'hot': '50000',
                 'rank': '1',
                 'published_at': '2024-01-01 09:00:00',
-                'collected_at': self._get_current_time(),
+                'collected_at': now_str,
                 'site_code': self.site_code
             },
             {
@@ -725,7 +676,7 @@ class XiaohongshuSite(BaseSite):
                 'hot': '30000',
                 'rank': '2',
                 'published_at': '2024-01-01 08:30:00',
-                'collected_at': self._get_current_time(),
+                'collected_at': now_str,
                 'site_code': self.site_code
             }
         ]
\ No newline at end of file
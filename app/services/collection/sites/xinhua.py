@@ -9,6 +9,15 @@ from .base import BaseSite
 # 导入统一的ID生成函数
 from ....utils.id_generator import generate_content_id
 
+# BeautifulSoup优先使用C实现的lxml解析器，未安装时回退到纯Python的html.parser
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+_BS4_PARSER = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
 
 class XinhuaSite(BaseSite):
     """新华网热点采集"""
@@ -56,7 +65,7 @@ class XinhuaSite(BaseSite):
         hot_data = []
         
         try:
-            soup = BeautifulSoup(html_text, 'html.parser')
+            soup = BeautifulSoup(html_text, _BS4_PARSER)
             
             # 尝试多种选择器来获取新闻条目
             # 1. 查找可能的新闻列表容器
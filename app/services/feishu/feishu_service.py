@@ -4,6 +4,12 @@ from functools import lru_cache
 from typing import Dict, Any, Optional, Set, Tuple
 import lark_oapi as lark
 from lark_oapi.api.bitable.v1 import *
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 from ...core.config import config_manager
 from .field_rules import FIELD_DEFINITIONS, REQUIRED_FIELDS
 
@@ -217,7 +223,8 @@ class FeishuService:
         async with httpx.AsyncClient() as client:
             response = await client.get(url, headers=headers, params=params, timeout=30)
             response.raise_for_status()
-            result = response.json()
+            # 记录较多时响应体较大，优先使用orjson直接解析字节
+            result = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
             
             if result.get("code") == 0:
                 # 返回完整的响应数据，包括分页信息
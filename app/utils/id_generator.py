@@ -8,6 +8,11 @@ ID生成工具
 import string
 import random
 from datetime import datetime
+from typing import List
+
+
+# ID随机部分使用的字符集
+_ID_CHARACTERS = string.digits + string.ascii_letters
 
 
 def generate_content_id():
@@ -17,10 +22,8 @@ def generate_content_id():
     Returns:
         str: 生成的内容ID
     """
-    # 生成5位随机字符
-    all_characters = string.digits + string.ascii_letters
     # 随机选择5个字符
-    random_characters = random.sample(all_characters, 5)
+    random_characters = random.sample(_ID_CHARACTERS, 5)
     # 将它们组合成一个字符串
     random_string = ''.join(random_characters)
     
@@ -32,6 +35,21 @@ def generate_content_id():
     return content_id
 
 
+def generate_content_ids(n: int) -> List[str]:
+    """
+    批量生成n个内容ID，格式与generate_content_id一致，整批只取一次时间戳
+    
+    Args:
+        n: 生成数量
+    
+    Returns:
+        List[str]: 生成的内容ID列表
+    """
+    current_date = datetime.now().strftime("%Y%m%d%H%M%S")
+    sample = random.sample
+    return [current_date + ''.join(sample(_ID_CHARACTERS, 5)) for _ in range(n)]
+
+
 if __name__ == "__main__":
     print("生成的内容ID示例:")
     print(generate_content_id())
\ No newline at end of file
@@ -3,10 +3,12 @@
 提供统一的日志记录功能
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from app.core.config import settings
 
 
@@ -24,7 +26,7 @@ logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
 # 控制台处理器
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+output_handlers = [console_handler]
 
 
 # 文件处理器（如果配置了日志文件）
@@ -41,10 +43,35 @@ if settings.LOG_FILE:
             backupCount=5
         )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        output_handlers.append(file_handler)
     except Exception as e:
         print(f"无法创建文件日志处理器: {e}")
 
 
+# 日志记录先放入队列，由后台线程写入控制台和文件，避免在事件循环中同步写出
+queue_handler = QueueHandler(queue.SimpleQueue())
+logger.addHandler(queue_handler)
+log_listener = None
+
+
+def _start_log_listener():
+    """启动写日志的后台线程（fork出的子进程没有父进程的线程，需要重新启动）"""
+    global log_listener
+    queue_handler.queue = queue.SimpleQueue()
+    log_listener = QueueListener(queue_handler.queue, *output_handlers, respect_handler_level=True)
+    log_listener.start()
+
+
+def _stop_log_listener():
+    """进程退出前写完队列中剩余的日志"""
+    if log_listener:
+        log_listener.stop()
+
+
+_start_log_listener()
+os.register_at_fork(after_in_child=_start_log_listener)
+atexit.register(_stop_log_listener)
+
+
 # 防止日志传播到根日志记录器
 logger.propagate = False
\ No newline at end of file
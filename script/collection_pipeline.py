@@ -13,6 +13,12 @@ from datetime import datetime
 import httpx
 from collections import defaultdict
 
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # 添加项目根目录到Python路径，使得可以导入项目内的模块
 # sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 sys.path.append("..")
@@ -286,6 +292,9 @@ async def test_collection_pipeline():
 
 # 程序入口点
 if __name__ == "__main__":
+    # 优先使用uvloop事件循环以提高协程调度和网络IO吞吐
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
     # 运行异步测试函数并获取结果
     success = asyncio.run(test_collection_pipeline())
     # 根据测试结果退出程序（成功退出码0，失败退出码1）
@@ -1,2 +1,2 @@
 #!/bin/bash
-cd /root/apiserver && uvicorn app.main:app --host 0.0.0.0 --port 8000
+cd /root/apiserver && uvicorn app.main:app --host 0.0.0.0 --port 8000 --loop uvloop
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析结果存储批量保存测试（不连接数据库）
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+analysis_storage = pytest.importorskip("app.services.analysis.storage.analysis_storage")
+
+
+class _Transaction:
+    async def __aenter__(self):
+        return object()
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _SessionFactory:
+    def begin(self):
+        return _Transaction()
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """写入时只记录记录内容的存储管理器"""
+    monkeypatch.setattr(analysis_storage, "get_feature_analysis_config", lambda: {})
+    instance = analysis_storage.AnalysisStorage()
+    instance.session_factory = _SessionFactory()
+    instance.written = []
+
+    async def bulk_upsert(db, model, records, columns):
+        instance.written.extend(records)
+        return {record['hotspot_id'] for record in records}
+
+    async def update_categories(records):
+        instance.updated_categories = records
+
+    instance._bulk_upsert = bulk_upsert
+    instance._update_hotspot_categories = update_categories
+    return instance
+
+
+def test_batch_analysis_skips_invalid_rows(storage):
+    """缺少analysis_result或热点ID的条目单独记录失败，其余条目正常写入"""
+    hotspots = [{'id': 'h1', 'title': 'a'}, {'id': 'h2', 'title': 'b'}, {'title': 'c'}, {'id': 'h4'}]
+    results = [{'analysis_result': {'x': 1}}, {'keywords': []}, {'analysis_result': {}}]
+
+    statuses = asyncio.run(storage.batch_save_analysis_results(hotspots, results))
+
+    assert [s['hotspot_id'] for s in statuses] == ['h1', 'h2', None, 'h4']
+    assert [s['saved'] for s in statuses] == [True, False, False, False]
+    assert 'analysis_result' in statuses[1]['error']
+    assert statuses[2]['error'] == 'Missing hotspot id'
+    assert statuses[3]['error'] == 'No analysis result provided'
+    assert [r['hotspot_id'] for r in storage.written] == ['h1']
+
+
+def test_batch_analysis_reports_write_failure_per_item(storage):
+    """整批写入失败时每个待写入条目都记录失败，不抛出异常"""
+    async def failing_upsert(db, model, records, columns):
+        raise RuntimeError("connection lost")
+
+    storage._bulk_upsert = failing_upsert
+    statuses = asyncio.run(storage.batch_save_analysis_results(
+        [{'id': 'h1'}, {'id': 'h2'}], [{'analysis_result': {}}]
+    ))
+
+    assert statuses == [
+        {'hotspot_id': 'h1', 'saved': False, 'error': 'connection lost'},
+        {'hotspot_id': 'h2', 'saved': False, 'error': 'No analysis result provided'},
+    ]
+
+
+def test_batch_classification_skips_invalid_rows(storage):
+    """分类时间格式错误的条目单独记录失败，只为写入成功的条目更新热点表分类"""
+    hotspots = [{'id': 'h1'}, {'id': 'h2'}, {'id': 'h3'}]
+    results = [
+        {'primary_category': '科技'},
+        {'primary_category': '财经', 'classification_time': 'not-a-date'},
+        {'primary_category': '体育', 'classification_time': '2024-03-01T08:00:00'},
+    ]
+
+    statuses = asyncio.run(storage.batch_save_classification_results(hotspots, results))
+
+    assert [s['saved'] for s in statuses] == [True, False, True]
+    assert 'Invalid data' in statuses[1]['error']
+    assert [r['hotspot_id'] for r in storage.updated_categories] == ['h1', 'h3']
+
+
+class _Row:
+    def __init__(self, hotspot_id):
+        self.hotspot_id = hotspot_id
+
+
+class _CopyDb:
+    """记录执行的SQL和COPY写入内容的会话"""
+
+    def __init__(self):
+        self.statements = []
+        self.copied = None
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.statements.append(str(stmt))
+        if self.copied is not None and 'RETURNING' in str(stmt):
+            return [_Row(record[0]) for record in self.copied['records']]
+        return []
+
+    async def connection(self):
+        db = self
+
+        class _Driver:
+            async def copy_records_to_table(self, table, records, columns):
+                db.copied = {'table': table, 'records': records, 'columns': columns}
+
+        class _Raw:
+            driver_connection = _Driver()
+
+        class _Connection:
+            async def get_raw_connection(self):
+                return _Raw()
+
+        return _Connection()
+
+
+def _analysis_record(hotspot_id, **extra):
+    record = {column: None for column in analysis_storage._ANALYSIS_COLUMNS}
+    record.update(hotspot_id=hotspot_id, analysis_result={'标签': ['科技']}, entities=[], keywords=['a'])
+    record.update(extra)
+    return record
+
+
+def test_upsert_statement_conflicts_on_hotspot_id(monkeypatch):
+    """单条/多行upsert按hotspot_id冲突更新，并刷新update_time"""
+    from sqlalchemy.dialects import postgresql
+
+    monkeypatch.setattr(analysis_storage, "get_feature_analysis_config", lambda: {})
+    instance = analysis_storage.AnalysisStorage()
+    stmt = instance._build_upsert(
+        analysis_storage.HotspotAnalysisResult,
+        [_analysis_record('h1'), _analysis_record('h2')],
+        analysis_storage._ANALYSIS_COLUMNS
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert 'ON CONFLICT (hotspot_id) DO UPDATE SET' in sql
+    assert 'update_time = now()' in sql
+    assert 'title = excluded.title' in sql
+    assert 'hotspot_id = excluded.hotspot_id' not in sql
+
+
+def test_bulk_upsert_dedupes_and_uses_copy_for_large_batches(monkeypatch):
+    """同一热点只写入最后一条；达到阈值时COPY到临时表再合并，JSON列预先序列化"""
+    monkeypatch.setattr(analysis_storage, "get_feature_analysis_config", lambda: {})
+    monkeypatch.setattr(analysis_storage, "COPY_THRESHOLD", 3)
+    instance = analysis_storage.AnalysisStorage()
+    db = _CopyDb()
+    records = [
+        _analysis_record('h1', title='old'),
+        _analysis_record('h2'),
+        _analysis_record('h1', title='new'),
+        _analysis_record('h3'),
+    ]
+
+    saved = asyncio.run(instance._bulk_upsert(
+        db, analysis_storage.HotspotAnalysisResult, records, analysis_storage._ANALYSIS_COLUMNS
+    ))
+
+    assert saved == {'h1', 'h2', 'h3'}
+    table = analysis_storage.HotspotAnalysisResult.__tablename__
+    assert db.statements[0].startswith(f"CREATE TEMP TABLE {table}_staging")
+    assert 'ON COMMIT DROP' in db.statements[0]
+    assert db.copied['table'] == f"{table}_staging"
+    assert db.copied['columns'] == analysis_storage._ANALYSIS_COLUMNS
+
+    copied = {row[0]: dict(zip(analysis_storage._ANALYSIS_COLUMNS, row)) for row in db.copied['records']}
+    assert len(db.copied['records']) == 3
+    assert copied['h1']['title'] == 'new'
+    assert isinstance(copied['h1']['analysis_result'], str)
+    assert json.loads(copied['h1']['analysis_result']) == {'标签': ['科技']}
+    assert 'ON CONFLICT (hotspot_id) DO UPDATE SET' in db.statements[-1]
+    assert 'RETURNING id, hotspot_id' in db.statements[-1]
+
+
+def test_bulk_upsert_small_batch_uses_multirow_insert(monkeypatch):
+    """小批量不走COPY，直接执行多行upsert"""
+    monkeypatch.setattr(analysis_storage, "get_feature_analysis_config", lambda: {})
+    instance = analysis_storage.AnalysisStorage()
+    db = _CopyDb()
+
+    async def execute(stmt, *args, **kwargs):
+        db.statements.append(stmt)
+        return [_Row('h1'), _Row('h2')]
+
+    db.execute = execute
+    saved = asyncio.run(instance._bulk_upsert(
+        db, analysis_storage.HotspotAnalysisResult,
+        [_analysis_record('h1'), _analysis_record('h2')], analysis_storage._ANALYSIS_COLUMNS
+    ))
+
+    assert saved == {'h1', 'h2'}
+    assert db.copied is None
+    assert len(db.statements) == 1
+
+
+class _StatisticsSession:
+    """返回GROUPING SETS查询结果行的会话"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statement = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, stmt):
+        self.statement = stmt
+        rows = self.rows
+
+        class _Result:
+            def all(self):
+                return rows
+
+        return _Result()
+
+
+def test_category_statistics_from_grouping_sets(monkeypatch):
+    """主分类合计取GROUPING()=1的行，子分类为空的明细不计入sub_categories"""
+    from sqlalchemy.dialects import postgresql
+
+    monkeypatch.setattr(analysis_storage, "get_feature_analysis_config", lambda: {})
+    instance = analysis_storage.AnalysisStorage()
+    session = _StatisticsSession([
+        ('科技', 'AI', 3, 0),
+        ('科技', '芯片', 2, 0),
+        ('科技', None, 1, 0),
+        ('科技', None, 6, 1),
+        ('财经', '股市', 4, 0),
+        ('财经', None, 4, 1),
+    ])
+    instance.session_factory = lambda: session
+
+    statistics = asyncio.run(instance.get_category_statistics(days=3))
+
+    assert statistics == {
+        '科技': {'total': 6, 'sub_categories': {'AI': 3, '芯片': 2}},
+        '财经': {'total': 4, 'sub_categories': {'股市': 4}},
+    }
+    sql = str(session.statement.compile(dialect=postgresql.dialect()))
+    assert 'GROUP BY GROUPING SETS(' in sql
+    assert 'grouping(' in sql
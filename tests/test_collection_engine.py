@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集引擎组件测试（不发起网络请求）
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.collection.engine import AsyncRateLimiter, SiteFactory
+
+
+def test_rate_limiter_allows_burst_then_waits():
+    """满桶时允许max_calls次突发调用，令牌耗尽后按速率等待"""
+    limiter = AsyncRateLimiter(max_calls=2, period=1)
+
+    async def run():
+        start = time.monotonic()
+        await limiter.acquire()
+        await limiter.acquire()
+        burst = time.monotonic() - start
+        await limiter.acquire()
+        return burst, time.monotonic() - start
+
+    burst, total = asyncio.run(run())
+    assert burst < 0.1
+    # 速率为2次/秒，第三次调用需等待约0.5秒
+    assert 0.4 <= total < 1.0
+
+
+def test_rate_limiter_refills_over_time():
+    """空闲期间按速率补充令牌，且不超过桶容量"""
+    limiter = AsyncRateLimiter(max_calls=4, period=1)
+
+    async def drain():
+        for _ in range(4):
+            await limiter.acquire()
+
+    asyncio.run(drain())
+    assert limiter.tokens < 1
+
+    time.sleep(0.55)
+
+    async def refill():
+        start = time.monotonic()
+        await limiter.acquire()
+        await limiter.acquire()
+        return time.monotonic() - start
+
+    # 0.55秒补充约2.2个令牌，两次调用无需等待
+    assert asyncio.run(refill()) < 0.1
+
+    limiter.tokens = 0.0
+    limiter.last_refill = time.monotonic() - 10
+    asyncio.run(limiter.acquire())
+    assert limiter.tokens == 3.0
+
+
+def test_rate_limiter_across_event_loops():
+    """同一限流器在多次asyncio.run中使用，锁按事件循环重建"""
+    limiter = AsyncRateLimiter(max_calls=5, period=1)
+
+    async def acquire_twice():
+        await asyncio.gather(limiter.acquire(), limiter.acquire())
+        return limiter._lock
+
+    first_lock = asyncio.run(acquire_twice())
+    second_lock = asyncio.run(acquire_twice())
+    assert first_lock is not second_lock
+
+
+def test_site_modules_loaded_once_per_process():
+    """多个工厂实例共享已加载的站点类，站点模块只导入一次"""
+    first = SiteFactory()
+    second = SiteFactory()
+    assert first._loaded_sites is second._loaded_sites
+
+    site_class = first._loaded_sites.get("baidu")
+    assert site_class is not None
+    assert sys.modules["app.services.collection.sites.baidu"].BaiduSite is site_class
+    assert type(second.create_site("baidu", {})) is site_class
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置管理测试
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core import config
+
+
+def test_reload_listener_called_after_reload():
+    """配置文件重新加载后调用已注册的回调"""
+    manager = config.ConfigManager()
+    calls = []
+    manager.add_reload_listener(lambda: calls.append(manager.get_sites_config()))
+
+    manager.get_sites_config(force_reload=True)
+    assert len(calls) == 1
+
+    # 文件未变化时不重新加载，也不调用回调
+    manager.get_sites_config()
+    assert len(calls) == 1
+
+
+def test_feature_analysis_config_cleared_on_reload(monkeypatch):
+    """热点特征分析配置缓存在配置重新加载后失效"""
+    current = {'feature_analysis': {'version': 1}}
+    monkeypatch.setattr(config.config_manager, "get_config", lambda: current, raising=False)
+    config.get_feature_analysis_config.cache_clear()
+    try:
+        assert config.get_feature_analysis_config() == {'version': 1}
+
+        current = {'feature_analysis': {'version': 2}}
+        assert config.get_feature_analysis_config() == {'version': 1}
+
+        config.config_manager.get_sites_config(force_reload=True)
+        assert config.get_feature_analysis_config() == {'version': 2}
+    finally:
+        config.get_feature_analysis_config.cache_clear()
+
+
+def test_weak_reload_listener_removed_after_owner_collected():
+    """弱引用注册的回调在所属对象被回收后不再调用并被移除"""
+    import gc
+
+    class Owner:
+        calls = 0
+
+        def on_reload(self):
+            Owner.calls += 1
+
+    manager = config.ConfigManager()
+    owner = Owner()
+    manager.add_reload_listener(owner.on_reload, weak=True)
+
+    manager.get_sites_config(force_reload=True)
+    assert Owner.calls == 1
+
+    del owner
+    gc.collect()
+    manager.get_sites_config(force_reload=True)
+    assert Owner.calls == 1
+    assert manager._reload_listeners == []
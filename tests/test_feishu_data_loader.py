@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+飞书数据加载器日期索引测试
+"""
+
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+feishu_data_loader = pytest.importorskip("app.services.analysis.feature_analysis.feishu_data_loader")
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """不连接飞书、不读取配置文件的加载器"""
+    monkeypatch.setattr(feishu_data_loader, "get_feature_analysis_config", lambda: {})
+    monkeypatch.setattr(feishu_data_loader, "FeishuService", lambda: None)
+    return feishu_data_loader.FeishuDataLoader()
+
+
+def _record(record_id, **fields):
+    return {"record_id": record_id, "fields": fields}
+
+
+def test_date_range_keeps_table_order(loader):
+    """日期范围查询返回表格中的原始顺序"""
+    records = [
+        _record("r1", date="2024-03-02", title="b"),
+        _record("r2", date="2024-03-01", title="a"),
+        _record("r3", date="2024-03-05", title="e"),
+        _record("r4", date="2024-03-02T08:00:00", title="c"),
+        _record("r5", title="无日期"),
+    ]
+
+    selected = loader._select_by_date_range(records, "2024-03-01", "2024-03-02")
+    assert [r["record_id"] for r in selected] == ["r1", "r2", "r4"]
+
+    selected = loader._filter_by_date(records, "2024-03-02")
+    assert [r["record_id"] for r in selected] == ["r1", "r4"]
+
+
+def test_date_index_rebuilt_when_records_change(loader):
+    """记录集合变化后重建索引，未变化时复用排序"""
+    records = [_record("r1", date="2024-03-01"), _record("r2", date="2024-03-02")]
+    assert len(loader._filter_by_date(records, "2024-03-02")) == 1
+    sorted_positions = loader._sorted_positions
+
+    # 内容相同的记录再次查询复用索引
+    loader._filter_by_date([dict(r) for r in records], "2024-03-01")
+    assert loader._sorted_positions is sorted_positions
+
+    records.append(_record("r3", date="2024-03-02"))
+    assert [r["record_id"] for r in loader._filter_by_date(records, "2024-03-02")] == ["r2", "r3"]
+
+
+def test_date_index_picks_up_middle_row_edits(loader):
+    """中间记录的日期或字段被修改后，返回本次获取的最新记录"""
+    def fetch(middle_date, middle_title):
+        return [
+            _record("r1", date="2024-03-01", title="a"),
+            _record("r2", date=middle_date, title=middle_title),
+            _record("r3", date="2024-03-02", title="c"),
+        ]
+
+    assert [r["record_id"] for r in loader._filter_by_date(fetch("2024-03-01", "b"), "2024-03-01")] == ["r1", "r2"]
+
+    # 仅修改标题：复用索引，但返回的是新记录
+    selected = loader._filter_by_date(fetch("2024-03-01", "b2"), "2024-03-01")
+    assert [r["fields"]["title"] for r in selected] == ["a", "b2"]
+
+    # 修改日期：索引重建
+    records = fetch("2024-03-02", "b3")
+    selected = loader._select_by_date_range(records, "2024-03-02", "2024-03-02")
+    assert [r["fields"]["title"] for r in selected] == ["b3", "c"]
+    assert all(any(r is record for record in records) for r in selected)
+
+    # 删除中间记录并追加新记录，条数与首尾不变
+    records = [
+        _record("r1", date="2024-03-01", title="a"),
+        _record("r4", date="2024-03-05", title="d"),
+        _record("r3", date="2024-03-02", title="c"),
+    ]
+    assert [r["record_id"] for r in loader._filter_by_date(records, "2024-03-05")] == ["r4"]
+
+
+def test_feishu_date_object_mixed_with_strings(loader):
+    """飞书日期对象中的非字符串日期不影响排序和查找"""
+    records = [
+        _record("r1", date="2024-03-01"),
+        _record("r2", date={"date": 20240301}),
+        _record("r3", date={"date": "2024-03-01"}),
+    ]
+
+    selected = loader._filter_by_date(records, "2024-03-01")
+    assert [r["record_id"] for r in selected] == ["r1", "r3"]
+
+
+def test_record_date_falls_back_to_other_candidate_fields(loader):
+    """已识别的日期字段无法解析时，继续尝试其他候选日期字段"""
+    records = [
+        _record("r1", date="2024-03-01", 采集时间="2024-03-09"),
+        _record("r2", date="未知", 采集时间="2024-03-02 10:00:00"),
+        _record("r3", date=None, collected_at={"date": "2024-03-02"}),
+    ]
+
+    assert loader._get_record_date(records[0]) == "2024-03-01"
+    assert loader._date_field == "date"
+    assert loader._get_record_date(records[1]) == "2024-03-02"
+    assert loader._get_record_date(records[2]) == "2024-03-02"
+
+
+def test_detected_fields_reset_on_config_reload(loader):
+    """配置重新加载后清除已识别的字段名和日期索引"""
+    records = [_record("r1", 日期="2024-03-01", 标题="a")]
+    loader._filter_by_date(records, "2024-03-01")
+    assert loader._date_field == "日期"
+    assert loader._date_index_signature is not None
+
+    feishu_data_loader.config_manager.get_sites_config(force_reload=True)
+    assert loader._date_field is None
+    assert loader._date_index_signature is None
+
+
+def test_rank_falls_back_to_other_candidate_fields(loader):
+    """已识别的排名字段缺失或无法解析时，继续尝试其他候选排名字段"""
+    records = [
+        _record("r1", rank="3", 排名=9),
+        _record("r2", rank="", 排名="5"),
+        _record("r3", 序号=7),
+        _record("r4", rank="第一", hot_rank=None),
+    ]
+
+    assert [loader._get_rank(r) for r in records] == [3, 5, 7, 999]
+    assert loader._rank_field == "rank"
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大模型处理器结果解析测试（不调用大模型）
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+llm_processor = pytest.importorskip("app.services.analysis.feature_analysis.llm_processor")
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """不读取配置文件的大模型处理器"""
+    monkeypatch.setattr(llm_processor, "get_feature_analysis_config", lambda: {})
+    return llm_processor.LLMProcessor()
+
+
+def test_parse_valid_json_object(processor):
+    """合法的JSON对象直接返回"""
+    assert processor._parse_analysis_result('{"sentiment": "正面", "keywords": []}') == {
+        'sentiment': '正面', 'keywords': []
+    }
+
+
+@pytest.mark.parametrize("response", ['[1, 2]', '"文本"', '42', 'null'])
+def test_parse_non_object_json_returns_default(processor, response):
+    """合法但不是对象的JSON不会作为分析结果返回"""
+    result = processor._parse_analysis_result(response)
+    assert isinstance(result, dict)
+    assert result['summary'] == '无法解析分析结果'
+
+
+def test_parse_extracts_embedded_object(processor):
+    """响应中夹带说明文字时提取其中的JSON对象"""
+    result = processor._parse_analysis_result('分析如下：{"sentiment": "中性"} 以上')
+    assert result['sentiment'] == '中性'
+
+
+class _ScriptedClient:
+    """按顺序返回预设响应并记录调用次数的大模型客户端"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def generate(self, prompt, temperature, max_tokens, schema=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+HOTSPOT = {'id': 'h1', 'title': '热点标题', 'url': 'https://example.com/1', 'summary': '摘要'}
+
+
+def test_unparseable_response_not_cached(processor):
+    """无法解析的响应返回默认结果但不写入缓存，下次重新调用大模型"""
+    processor.llm_client = _ScriptedClient('不是JSON', '{"sentiment": "正面"}')
+
+    first = asyncio.run(processor.analyze_hotspot(HOTSPOT))
+    assert first['analysis_result']['summary'] == '无法解析分析结果'
+    assert not processor._result_cache
+
+    second = asyncio.run(processor.analyze_hotspot(HOTSPOT))
+    assert second['analysis_result'] == {'sentiment': '正面'}
+    assert processor.llm_client.calls == 2
+
+    third = asyncio.run(processor.analyze_hotspot(HOTSPOT))
+    assert third['analysis_result'] == {'sentiment': '正面'}
+    assert processor.llm_client.calls == 2
+
+
+def test_cached_result_isolated_from_callers(processor):
+    """调用方修改返回的分析结果不影响缓存"""
+    processor.llm_client = _ScriptedClient('{"keywords": ["a"]}')
+
+    first = asyncio.run(processor.analyze_hotspot(HOTSPOT))
+    first['analysis_result']['keywords'].append('b')
+
+    second = asyncio.run(processor.analyze_hotspot(HOTSPOT))
+    second['analysis_result']['keywords'].append('c')
+
+    third = asyncio.run(processor.analyze_hotspot(HOTSPOT))
+    assert third['analysis_result'] == {'keywords': ['a']}
+    assert processor.llm_client.calls == 1
+
+
+def test_lru_evicts_least_recently_used(processor):
+    """超出容量时淘汰最久未使用的条目"""
+    processor.result_cache_size = 2
+    keys = [processor._get_cache_key({'title': t}) for t in ('a', 'b', 'c')]
+    processor._store_cached_result(keys[0], {'n': 0})
+    processor._store_cached_result(keys[1], {'n': 1})
+    asyncio.run(processor._get_cached_result(keys[0], {}))
+    processor._store_cached_result(keys[2], {'n': 2})
+
+    assert list(processor._result_cache) == [keys[0], keys[2]]
+
+
+def test_stored_result_used_as_second_level_cache(processor):
+    """进程内缓存未命中时使用已存储的分析结果，并回填进程内缓存"""
+    class _Storage:
+        async def get_analysis_result(self, hotspot_id):
+            return {'analysis_result': {'sentiment': '负面'}} if hotspot_id == 'h1' else None
+
+    processor.analysis_storage = _Storage()
+    processor.llm_client = _ScriptedClient()
+
+    result = asyncio.run(processor.analyze_hotspot(HOTSPOT))
+    assert result['analysis_result'] == {'sentiment': '负面'}
+    assert processor.llm_client.calls == 0
+    assert processor._result_cache[processor._get_cache_key(HOTSPOT)] == {'sentiment': '负面'}
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+人民网RSS解析测试（不发起网络请求）
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.collection.sites.people_daily import PeopleDailySite
+
+
+RSS_WITH_BAD_ENTITY = """<?xml version="1.0" encoding="UTF-8"?>
+<rss><channel>
+<item><title>新闻一 &amp; 要闻</title><link>http://www.people.com.cn/1.html</link></item>
+<item><title>新闻二&nbsp;未定义实体</title><link>http://www.people.com.cn/2.html</link></item>
+<item><title>新闻三</title><link>http://www.people.com.cn/3.html</link><pubDate>2024-03-01 08:00:00</pubDate></item>
+</channel></rss>""".encode("utf-8")
+
+
+def test_malformed_entity_does_not_truncate_feed():
+    """订阅源中的未定义实体不影响其后条目的解析"""
+    site = PeopleDailySite("people_daily", {})
+    results = [item["fields"] for item in site._parse_people_daily_data(RSS_WITH_BAD_ENTITY)]
+
+    assert [r["url"] for r in results] == [
+        "http://www.people.com.cn/1.html",
+        "http://www.people.com.cn/2.html",
+        "http://www.people.com.cn/3.html",
+    ]
+    assert results[0]["title"] == "新闻一 & 要闻"
+    assert results[2]["published_at"] == "2024-03-01 08:00:00"
+    assert [r["rank"] for r in results] == ["1", "2", "3"]
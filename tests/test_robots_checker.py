@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+robots.txt规则解析测试
+"""
+
+import sys
+import os
+import asyncio
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.collection.robots_checker import RobotsTxtChecker
+
+
+USER_AGENT = "IntelligentAgentAPI/1.0"
+
+# 通配符组在前，指名本用户代理的组在后
+ROBOTS_WILDCARD_FIRST = """
+User-agent: *
+Disallow: /private/
+
+User-agent: IntelligentAgentAPI
+Disallow: /search
+Allow: /search/public
+
+User-agent: OtherBot
+Disallow: /
+"""
+
+
+def _feed(checker, content, stop_early=True):
+    """逐行送入解析生成器，返回(规则, 是否提前结束)"""
+    rules = {"allow": [], "disallow": []}
+    parser = checker._rules_parser(USER_AGENT, rules, stop_early=stop_early)
+    next(parser)
+    try:
+        for line in content.splitlines():
+            parser.send(line)
+    except StopIteration:
+        return rules, True
+    return rules, False
+
+
+def test_wildcard_group_before_specific_group():
+    """*组在前时，后面指名本用户代理的组也要被读取并合并"""
+    checker = RobotsTxtChecker(cache_ttl=60, negative_cache_ttl=60)
+    rules = checker._parse_robots_txt(ROBOTS_WILDCARD_FIRST, USER_AGENT)
+
+    assert [p for _, p in rules["disallow"]] == ["/private/", "/search"]
+    assert [p for _, p in rules["allow"]] == ["/search/public"]
+    assert not checker._check_path_allowed("/private/a", rules)
+    assert not checker._check_path_allowed("/search?q=1", rules)
+    assert checker._check_path_allowed("/search/public/x", rules)
+    assert checker._check_path_allowed("/news", rules)
+
+
+def test_stream_stops_after_wildcard_and_specific_groups():
+    """流式解析读完*组和本用户代理组后停止，规则与完整解析一致"""
+    checker = RobotsTxtChecker(cache_ttl=60, negative_cache_ttl=60)
+    rules, stopped = _feed(checker, ROBOTS_WILDCARD_FIRST)
+
+    assert stopped
+    assert rules == {"allow": ["/search/public"], "disallow": ["/private/", "/search"]}
+
+
+def test_stream_reads_to_end_without_specific_group():
+    """没有指名本用户代理的组时读完全部内容"""
+    checker = RobotsTxtChecker(cache_ttl=60, negative_cache_ttl=60)
+    content = "User-agent: *\nDisallow: /a\n\nUser-agent: OtherBot\nDisallow: /\n\nUser-agent: *\nDisallow: /b\n"
+    rules, stopped = _feed(checker, content)
+
+    assert not stopped
+    assert rules == {"allow": [], "disallow": ["/a", "/b"]}
+
+
+def test_full_parse_merges_all_matching_groups():
+    """完整解析不提前结束，合并所有匹配组"""
+    checker = RobotsTxtChecker(cache_ttl=60, negative_cache_ttl=60)
+    content = ROBOTS_WILDCARD_FIRST + "\nUser-agent: *\nDisallow: /tmp\n"
+    rules, stopped = _feed(checker, content, stop_early=False)
+
+    assert not stopped
+    assert rules["disallow"] == ["/private/", "/search", "/tmp"]
+
+
+def test_session_recreated_for_new_event_loop():
+    """全局实例在多次asyncio.run之间使用时，每个事件循环使用自己的会话"""
+    checker = RobotsTxtChecker(cache_ttl=60, negative_cache_ttl=60)
+
+    async def get_session():
+        return await checker._ensure_session()
+
+    first = asyncio.run(get_session())
+    second = asyncio.run(get_session())
+    assert first is not second
+    assert checker._session is second
+
+    asyncio.run(checker.close())
+    assert checker._session is None
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集站点基类测试
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.collection.sites.base import BaseSite
+
+
+class _DummySite(BaseSite):
+    async def collect(self, params):
+        return []
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_not_modified_results_get_new_ids():
+    """304复用的结果重新生成id和采集时间，缓存中的原始数据不被修改"""
+    site = _DummySite("dummy", {})
+    url = "https://example.com/test-not-modified"
+    stored = [
+        {"fields": {"id": "old-1", "title": "a", "collected_at": "2000-01-01 00:00:00"}},
+        {"fields": {"id": "old-2", "title": "b", "collected_at": "2000-01-01 00:00:00"}},
+    ]
+    site._store_conditional(url, _Response({"ETag": '"v1"'}), stored)
+    try:
+        headers = site._add_conditional_headers(url, {})
+        assert headers["If-None-Match"] == '"v1"'
+
+        replayed = site._get_not_modified_results(url)
+        rows = [item["fields"] for item in replayed]
+        assert [row["title"] for row in rows] == ["a", "b"]
+        assert all(row["id"] not in ("old-1", "old-2") for row in rows)
+        assert len({row["id"] for row in rows}) == 2
+        assert all(row["collected_at"] != "2000-01-01 00:00:00" for row in rows)
+        assert stored[0]["fields"]["id"] == "old-1"
+    finally:
+        BaseSite._conditional_cache.pop(url, None)
+
+
+def test_not_modified_without_cache_returns_none():
+    """没有缓存时返回None，由站点决定如何处理"""
+    site = _DummySite("dummy", {})
+    assert site._get_not_modified_results("https://example.com/never-fetched") is None
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+微博热搜缓存测试（不发起网络请求）
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.collection import site_state
+from app.services.collection.sites.weibo import WeiboSite
+
+SITE_CODE = "weibo_cache_test"
+
+
+class _CountingWeiboSite(WeiboSite):
+    """上游采集只计数并返回固定结果的微博站点"""
+
+    calls = 0
+
+    async def _collect_uncached(self, params):
+        type(self).calls += 1
+        await asyncio.sleep(0.01)
+        return [{"fields": {"id": "fixed", "title": "话题A", "collected_at": "2000-01-01 00:00:00"}}]
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    site_state._site_states.pop(SITE_CODE, None)
+    _CountingWeiboSite.calls = 0
+    yield
+    site_state._site_states.pop(SITE_CODE, None)
+
+
+def test_cache_shared_between_instances_with_new_ids():
+    """新建的站点实例共用缓存，每次返回的数据重新生成id"""
+    first = asyncio.run(_CountingWeiboSite(SITE_CODE, {}).collect({}))
+    second = asyncio.run(_CountingWeiboSite(SITE_CODE, {}).collect({}))
+
+    assert _CountingWeiboSite.calls == 1
+    assert first[0]["fields"]["title"] == second[0]["fields"]["title"] == "话题A"
+    assert first[0]["fields"]["id"] != second[0]["fields"]["id"]
+    assert "fixed" not in (first[0]["fields"]["id"], second[0]["fields"]["id"])
+
+
+def test_concurrent_requests_share_one_refresh():
+    """并发的采集请求只触发一次上游采集"""
+    async def run():
+        sites = [_CountingWeiboSite(SITE_CODE, {}) for _ in range(3)]
+        return await asyncio.gather(*(site.collect({}) for site in sites))
+
+    results = asyncio.run(run())
+    assert _CountingWeiboSite.calls == 1
+    assert len({r[0]["fields"]["id"] for r in results}) == 3
+
+
+def test_expired_cache_refreshed_in_new_event_loop():
+    """缓存过期后在新的事件循环中重新采集"""
+    config = {"cache_ttl": 0, "cache_stale_ttl": 0}
+    asyncio.run(_CountingWeiboSite(SITE_CODE, config).collect({}))
+    asyncio.run(_CountingWeiboSite(SITE_CODE, config).collect({}))
+    assert _CountingWeiboSite.calls == 2
+
+
+def test_pending_refresh_from_other_loop_not_reused():
+    """其他事件循环中未完成的刷新任务不会被当前循环复用"""
+    state = site_state.get_site_state(SITE_CODE)
+
+    async def slow_refresh():
+        await asyncio.sleep(10)
+        return []
+
+    async def start():
+        return state.start_refresh(slow_refresh)
+
+    old_loop = asyncio.new_event_loop()
+    try:
+        old_task = old_loop.run_until_complete(start())
+        assert not old_task.done()
+
+        async def start_and_cancel():
+            task = state.start_refresh(slow_refresh)
+            task.cancel()
+            return task
+
+        new_task = asyncio.run(start_and_cancel())
+        assert new_task is not old_task
+    finally:
+        old_task.cancel()
+        old_loop.run_until_complete(asyncio.gather(old_task, return_exceptions=True))
+        old_loop.close()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+小红书页面解析测试（不发起网络请求）
+"""
+
+import sys
+import os
+import json
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.collection.sites.xiaohongshu import _parse_hot, _slice_initial_state
+
+
+def _page(state: str) -> bytes:
+    return f'<script>window.__INITIAL_STATE__={state};var x={{"other":1}}</script>'.encode('utf-8')
+
+
+def test_slice_simple_object():
+    """截取到与第一个{匹配的}为止，不包含其后的脚本"""
+    assert _slice_initial_state(_page('{"a":{"b":1}}')) == b'{"a":{"b":1}}'
+
+
+def test_slice_ignores_braces_inside_strings():
+    """字符串中的括号不参与计数"""
+    state = '{"title":"a}b{c","n":{"d":"}}"}}'
+    sliced = _slice_initial_state(_page(state))
+    assert sliced == state.encode('utf-8')
+    assert json.loads(sliced)['n']['d'] == '}}'
+
+
+def test_slice_handles_escaped_quotes():
+    """字符串中转义的引号不结束字符串"""
+    state = r'{"t":"say \"}\" ok","u":1}'
+    sliced = _slice_initial_state(_page(state))
+    assert sliced == state.encode('utf-8')
+    assert json.loads(sliced)['t'] == 'say "}" ok'
+
+
+def test_slice_handles_escaped_backslash_before_quote():
+    r"""字符串以\\结尾时，其后的引号正常结束字符串"""
+    state = r'{"path":"C:\\","next":{"v":"}"}}'
+    sliced = _slice_initial_state(_page(state))
+    assert sliced == state.encode('utf-8')
+    assert json.loads(sliced) == {"path": "C:\\", "next": {"v": "}"}}
+
+
+def test_slice_non_ascii_content():
+    """中文等多字节内容按字节扫描不受影响"""
+    state = '{"标题":"春天{的}第一杯奶茶"}'
+    assert _slice_initial_state(_page(state)).decode('utf-8') == state
+
+
+def test_slice_missing_closing_brace():
+    """对象没有闭合时返回None"""
+    body = b'<script>window.__INITIAL_STATE__={"a":{"b":1}</script>'
+    assert _slice_initial_state(body) is None
+
+
+def test_slice_unterminated_string():
+    """字符串没有闭合时返回None"""
+    body = b'<script>window.__INITIAL_STATE__={"a":"}}}</script>'
+    assert _slice_initial_state(body) is None
+
+
+def test_slice_without_marker_or_object():
+    """没有__INITIAL_STATE__或其后没有对象时返回None"""
+    assert _slice_initial_state(b'<html>{"a":1}</html>') is None
+    assert _slice_initial_state(b'window.__INITIAL_STATE__=undefined') is None
+
+
+def test_parse_hot_units():
+    """热度文本按单位换算为整数"""
+    assert [_parse_hot(t) for t in ('5.1万', '1千+', '2.3k', '2K', '530', ' 7 ', 'abc', '')] == [
+        51000, 1000, 2300, 2000, 530, 7, 0, 0
+    ]